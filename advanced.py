@@ -33,13 +33,15 @@ from qgis.core import (QgsProcessing,
                        QgsProcessingParameterBoolean,
                        QgsProcessingParameterString,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterFolderDestination
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingOutputFile
                       )
 from processing.core.ProcessingConfig import ProcessingConfig
-from processing.tools import system
 
 from processing_circuitscape.circuitscapeAlgorithm import CircuitscapeAlgorithm
 from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import inputValidation
 
 
 class Advanced(CircuitscapeAlgorithm):
@@ -56,8 +58,19 @@ class Advanced(CircuitscapeAlgorithm):
     WRITE_VOLTAGE_MAP = "WRITE_VOLTAGE_MAP"
     MASK = "MASK"
     SHORT_CIRCUIT = "SHORT_CIRCUIT"
+    SOLVER = "SOLVER"
+    PARALLEL_MODE = "PARALLEL_MODE"
+    MAX_PARALLEL = "MAX_PARALLEL"
     BASENAME = "BASENAME"
     DIRECTORY = "DIRECTORY"
+    LOG_FILE = "LOG_FILE"
+
+    ROI_PARAMETERS = (CURRENT_SOURCE, GROUND_POINT, MASK)
+    ROI_KEEP_ZERO = (GROUND_POINT,)
+    ANCHOR_PARAMETERS = (CURRENT_SOURCE, GROUND_POINT)
+    INPUT_ROLES = {CURRENT_SOURCE: inputValidation.ROLE_SOURCE,
+                   GROUND_POINT: inputValidation.ROLE_GROUND,
+                   SHORT_CIRCUIT: inputValidation.ROLE_REGION}
 
     def name(self):
         return "advanced"
@@ -115,6 +128,21 @@ class Advanced(CircuitscapeAlgorithm):
         self.addParameter(QgsProcessingParameterRasterLayer(self.SHORT_CIRCUIT,
                                                             self.tr("Short-circuit region"),
                                                             optional=True))
+        self.addParameter(QgsProcessingParameterEnum(self.SOLVER,
+                                                     self.tr("Solver"),
+                                                     options=self.solvers(),
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterEnum(self.PARALLEL_MODE,
+                                                     self.tr("Parallel execution"),
+                                                     options=self.parallelModes(),
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterNumber(self.MAX_PARALLEL,
+                                                       self.tr("Maximum number of parallel workers (0 = use provider setting)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       0,
+                                                       minValue=0))
         self.addParameter(QgsProcessingParameterString(self.BASENAME,
                                                        self.tr("Output basename"),
                                                        "csoutput"))
@@ -122,11 +150,13 @@ class Advanced(CircuitscapeAlgorithm):
         self.addParameter(QgsProcessingParameterFolderDestination(self.DIRECTORY,
                                                                   self.tr("Output directory")))
 
+        self.addOutput(QgsProcessingOutputFile(self.LOG_FILE, self.tr("Solver log")))
+
     def processAlgorithm(self, parameters, context, feedback):
         resistance = self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context).source()
         useConductance = str(not self.parameterAsBool(parameters, self.IS_CONDUCTANCES, context))
         currentSources = self.parameterAsRasterLayer(parameters, self.CURRENT_SOURCE, context).source()
-        groundPoints = self.parameterAsRasterLayer(parameters, self.GROUND_POINT, context)
+        groundPoints = self.parameterAsRasterLayer(parameters, self.GROUND_POINT, context).source()
         gpConductance = str(not self.parameterAsBool(parameters, self.GP_CONDUCTANCES, context))
         writeCurrent = str(self.parameterAsBool(parameters, self.WRITE_CURRENT_MAP, context))
         writeVoltage = str(self.parameterAsBool(parameters, self.WRITE_VOLTAGE_MAP, context))
@@ -142,61 +172,67 @@ class Advanced(CircuitscapeAlgorithm):
         directory = self.parameterAsString(parameters, self.DIRECTORY, context)
         basePath = os.path.join(directory, baseName)
 
-        commands = self.prepareInputs(parameters, context)
+        with self.createWorkspace(feedback) as workspace:
+            if not self.prepareInputs(parameters, context, feedback):
+                return {}
+
+            iniPath = circuitscapeUtils.writeConfiguration(workspace.path)
+            cfg = configparser.ConfigParser()
+            cfg.read(iniPath)
+
+            # set parameters
+            cfg["Circuitscape mode"]["scenario"] = "advanced"
 
-        iniPath = circuitscapeUtils.writeConfiguration()
-        cfg = configparser.ConfigParser()
-        cfg.read(iniPath)
+            section = cfg["Habitat raster or graph"]
+            section["habitat_map_is_resistances"] = useConductance
+            if resistance in self.exportedLayers.keys():
+                section["habitat_file"] = self.exportedLayers[resistance]
 
-        # set parameters
-        cfg["Circuitscape mode"]["scenario"] = "advanced"
+            pruned = self.pruneResistance(parameters, context, feedback)
+            if pruned is not None:
+                section["habitat_file"] = pruned
 
-        section = cfg["Habitat raster or graph"]
-        section["habitat_map_is_resistances"] = useConductance
-        if resistance in self.exportedLayers.keys():
-            section["habitat_file"] = self.exportedLayers[resistance]
+            section = cfg["Options for advanced mode"]
+            if currentSources in self.exportedLayers.keys():
+                section["source_file"] = self.exportedLayers[currentSources]
 
-        section = cfg["Options for advanced mode"]
-        if currentSources in self.exportedLayers.keys():
-            section["source_file"] = self.exportedLayers[currentSources]
+            if groundPoints in self.exportedLayers.keys():
+                section["ground_file"] = self.exportedLayers[groundPoints]
 
-        if groundPoints in self.exportedLayers.keys():
-            section["ground_file"] = self.exportedLayers[groundPoints]
+            section["ground_file_is_resistances"] = gpConductance
+            section["remove_src_or_gnd"] = unitCurrents
+            section["use_direct_grounds"] = directConnections
 
-        section["ground_file_is_resistances"] = gpConductance
-        section["remove_src_or_gnd"] = unitCurrents
-        section["use_direct_grounds"] = directConnections
+            if mask is not None:
+                if mask.source() in self.exportedLayers.keys():
+                    section = cfg["Mask file"]
+                    section["mask_file"] = self.exportedLayers[mask.source()]
+                    section["use_mask"] = "True"
 
-        if mask is not None:
-            if mask in self.exportedLayers.keys():
-                section = cfg["Mask file"]
-                section["mask_file"] = self.exportedLayers[mask]
-                section["use_mask"] = "True"
+            if shortCircuit is not None:
+                if shortCircuit.source() in self.exportedLayers.keys():
+                    section = cfg["Short circuit regions (aka polygons)"]
+                    section["polygon_file"] = self.exportedLayers[shortCircuit.source()]
+                    section["use_polygons"] = "True"
 
-        if shortCircuit is not None:
-            if shortCircuit in self.exportedLayers.keys():
-                section = cfg["Short circuit regions (aka polygons)"]
-                section["polygon_file"] = self.exportedLayers[shortCircuit]
-                section["use_polygons"] = "True"
+            cfg["Output options"]["write_cur_maps"] = writeCurrent
+            cfg["Output options"]["write_volt_maps"] = writeVoltage
+            cfg["Output options"]["output_file"] = basePath
 
-        cfg["Output options"]["write_cur_maps"] = writeCurrent
-        cfg["Output options"]["write_volt_maps"] = writeVoltage
-        cfg["Output options"]["output_file"] = basePath
+            self.configureSolver(cfg, parameters, context, feedback, 1)
+            self.configureParallel(cfg, parameters, context, feedback)
+            estimate = self.planRun(cfg, feedback, 1)
 
-        # write configuration back to the file
-        with open(iniPath, "w") as f:
-            cfg.write(f)
+            # write configuration back to the file
+            with open(iniPath, "w") as f:
+                cfg.write(f)
 
-        if system.isWindows():
-            csPath = circuitscapeUtils.circuitscapeDirectory()
-            if csPath == "":
-                csPath = "cs_run.exe"
-            else:
-                csPath = os.path.join(csPath, "cs_run.exe")
+            def run():
+                return circuitscapeUtils.runSolver(iniPath, feedback)
 
-            commands.append('"{}" {}'.format(csPath, iniPath))
-        else:
-            commands.append("csrun.py {}".format(iniPath))
+            results = self.runCached(cfg, basePath, feedback, lambda: self.runQueued(estimate, feedback, run))
+            if results is None:
+                return {}
 
-        circuitscapeUtils.jobFileFromCommands(commands)
-        circuitscapeUtils.execute(feedback)
+            results[self.DIRECTORY] = directory
+            return results
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    exportBenchmark.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Compares time and disk footprint of the input conversions performed before
+a Circuitscape run: legacy ASCII grid export, compact GeoTIFF export and
+native pass-through of a GeoTIFF the solver can read directly.
+
+Usage: python exportBenchmark.py [size] [workdir]
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import numpy
+from osgeo import gdal
+
+
+def createResistance(fileName, size):
+    driver = gdal.GetDriverByName("GTiff")
+    ds = driver.Create(fileName, size, size, 1, gdal.GDT_Float32,
+                       ["TILED=YES", "COMPRESS=LZW"])
+    ds.SetGeoTransform((0, 30, 0, size * 30, 0, -30))
+    band = ds.GetRasterBand(1)
+    band.SetNoDataValue(-9999)
+
+    rng = numpy.random.default_rng(42)
+    rows = 512
+    for yOff in range(0, size, rows):
+        count = min(rows, size - yOff)
+        data = rng.uniform(1, 100, (count, size)).astype(numpy.float32)
+        band.WriteArray(data, 0, yOff)
+    ds = None
+
+
+def benchmark(source, dest, driver, options):
+    start = time.perf_counter()
+    gdal.Translate(dest, source, format=driver, creationOptions=options)
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(os.path.join(os.path.dirname(dest), f))
+               for f in os.listdir(os.path.dirname(dest))
+               if f.startswith(os.path.splitext(os.path.basename(dest))[0]))
+    return elapsed, size
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    workDir = sys.argv[2] if len(sys.argv) > 2 else tempfile.mkdtemp(prefix="csbench_")
+
+    gdal.UseExceptions()
+    source = os.path.join(workDir, "resistance.tif")
+    createResistance(source, size)
+
+    results = [("pass-through", 0.0, 0)]
+    for name, driver, ext, options in (("AAIGrid", "AAIGrid", "asc", []),
+                                       ("GeoTIFF", "GTiff", "tif", ["TILED=YES", "COMPRESS=LZW", "BIGTIFF=IF_SAFER"])):
+        dirName = os.path.join(workDir, name)
+        os.makedirs(dirName, exist_ok=True)
+        elapsed, footprint = benchmark(source, os.path.join(dirName, "export.{}".format(ext)), driver, options)
+        results.append((name, elapsed, footprint))
+
+    print("{} x {} cells, source {:.1f} MB".format(size, size, os.path.getsize(source) / 1048576.0))
+    print("{:<14}{:>12}{:>14}".format("mode", "time, s", "disk, MB"))
+    for name, elapsed, footprint in results:
+        print("{:<14}{:>12.2f}{:>14.1f}".format(name, elapsed, footprint / 1048576.0))
+
+    legacy = results[1]
+    for name, elapsed, footprint in (results[0], results[2]):
+        print("{} avoids {:.2f} s and {:.1f} MB compared to AAIGrid".format(
+            name, legacy[1] - elapsed, (legacy[2] - footprint) / 1048576.0))
+
+    if len(sys.argv) <= 2:
+        shutil.rmtree(workDir)
+
+
+if __name__ == "__main__":
+    main()
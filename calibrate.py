@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    calibrate.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+import configparser
+
+import numpy
+
+from qgis.core import (QgsProcessingParameterString,
+                       QgsProcessingOutputFile,
+                       QgsProcessingException
+                      )
+
+from processing_circuitscape.circuitscapeAlgorithm import CircuitscapeAlgorithm
+from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import rasterTools
+from processing_circuitscape import resourcePlanner
+
+# focal nodes placed on each synthetic grid, giving three pairwise solves
+CALIBRATION_NODES = 3
+
+
+class Calibrate(CircuitscapeAlgorithm):
+
+    SIZES = "SIZES"
+    CALIBRATION_FILE = "CALIBRATION_FILE"
+
+    def name(self):
+        return "calibrate"
+
+    def displayName(self):
+        return self.tr("Calibrate resource estimates")
+
+    def group(self):
+        return self.tr("Tools")
+
+    def groupId(self):
+        return "tools"
+
+    def __init__(self):
+        super().__init__()
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterString(self.SIZES,
+                                                       self.tr("Sizes of synthetic grids (cells per side, comma-separated)"),
+                                                       "100,200,400"))
+
+        self.addOutput(QgsProcessingOutputFile(self.CALIBRATION_FILE, self.tr("Calibration table")))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        try:
+            sizes = sorted(int(s) for s in self.parameterAsString(parameters, self.SIZES, context).split(","))
+        except ValueError:
+            raise QgsProcessingException(self.tr("Grid sizes must be comma-separated integers"))
+        if len(sizes) < 2:
+            raise QgsProcessingException(self.tr("At least two grid sizes are needed to fit the model"))
+
+        fileName = circuitscapeUtils.calibrationFile()
+        table, calibrated = resourcePlanner.readCalibration(fileName)
+
+        with self.createWorkspace(feedback) as workspace:
+            for solver in circuitscapeUtils.supportedSolvers(False):
+                samples = []
+                for size in sizes:
+                    if feedback.isCanceled():
+                        return {}
+
+                    feedback.pushInfo(self.tr("Solving {0}x{0} cells grid with {1}").format(size, solver))
+                    runDirectory = workspace.subdirectory("{}_{}".format(solver.replace("+", "_"), size))
+                    iniPath = self.writeBenchmark(runDirectory, size, solver)
+
+                    # solver peak is only visible in the usage of terminated
+                    # child processes, so neither the warm worker nor the
+                    # in-process engine is used here
+                    start = time.perf_counter()
+                    try:
+                        results = circuitscapeUtils.runSolver(iniPath, feedback, False, False)
+                    except QgsProcessingException as e:
+                        feedback.reportError(self.tr("Calibration of {} failed: {}").format(solver, e))
+                        break
+                    if results is None:
+                        return {}
+
+                    samples.append((size * size, CALIBRATION_NODES * (CALIBRATION_NODES - 1) // 2,
+                                    time.perf_counter() - start, resourcePlanner.peakChildMemory()))
+
+                if len(samples) >= 2:
+                    table[solver] = resourcePlanner.fitModel(samples, resourcePlanner.DEFAULT_CALIBRATION[solver])
+                    feedback.pushInfo(self.tr("{}: {:.0f} MB + {:.0f} bytes per cell, {:.1f} s + {:.3g} s per cell "
+                                              "and solve").format(solver, table[solver]["baseMemory"] / 1048576.0,
+                                                                  table[solver]["bytesPerCell"],
+                                                                  table[solver]["setupSeconds"],
+                                                                  table[solver]["secondsPerCellSolve"]))
+
+        resourcePlanner.writeCalibration(fileName, table)
+        feedback.pushInfo(self.tr("Calibration table written to {}").format(fileName))
+        return {self.CALIBRATION_FILE: fileName}
+
+    def writeBenchmark(self, directory, size, solver):
+        # random resistance surface with focal nodes spread along the diagonal
+        geoTransform = (0.0, 1.0, 0.0, float(size), 0.0, -1.0)
+        rng = numpy.random.default_rng(size)
+        resistance = rng.lognormal(0.0, 1.0, (size, size))
+        focal = numpy.full((size, size), -9999.0)
+        for i in range(CALIBRATION_NODES):
+            position = (i + 1) * size // (CALIBRATION_NODES + 1)
+            focal[position, position] = i + 1
+
+        habitatFile = os.path.join(directory, "resistance.asc")
+        focalFile = os.path.join(directory, "focal.asc")
+        rasterTools.writeGrid(habitatFile, size, size, geoTransform, "", [(0, resistance)], -9999)
+        rasterTools.writeGrid(focalFile, size, size, geoTransform, "", [(0, focal)], -9999)
+
+        iniPath = circuitscapeUtils.writeConfiguration(directory)
+        cfg = configparser.ConfigParser()
+        cfg.read(iniPath)
+
+        cfg["Circuitscape mode"]["scenario"] = "pairwise"
+        cfg["Habitat raster or graph"]["habitat_file"] = habitatFile
+        cfg["Options for pairwise and one-to-all and all-to-one modes"]["point_file"] = focalFile
+        cfg["Calculation options"]["solver"] = solver
+        cfg["Calculation options"]["parallelize"] = "False"
+        cfg["Output options"]["write_cur_maps"] = "False"
+        cfg["Output options"]["write_volt_maps"] = "False"
+        cfg["Output options"]["output_file"] = os.path.join(directory, "calibration")
+
+        with open(iniPath, "w") as f:
+            cfg.write(f)
+        return iniPath
@@ -26,22 +26,54 @@ __copyright__ = '(C) 2014-2018, Alexander Bruy'
 __revision__ = '$Format:%H$'
 
 import os
+import time
+import uuid
+import shutil
 
 from qgis.PyQt.QtCore import QCoreApplication
 from qgis.PyQt.QtGui import QIcon
 
 from qgis.core import (QgsProcessingAlgorithm,
                        QgsProcessingUtils,
-                       QgsProcessingParameterRasterLayer
+                       QgsProcessingParameterRasterLayer,
+                       QgsProcessingException
                       )
+from processing.core.ProcessingConfig import ProcessingConfig
+
+from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import componentPruning
+from processing_circuitscape import diskCache
+from processing_circuitscape import inputValidation
+from processing_circuitscape import outputMerger
+from processing_circuitscape import parallelRuns
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+from processing_circuitscape import resourcePlanner
+from processing_circuitscape import vectorRasterizer
+from processing_circuitscape.progressParser import formatDuration
 
 pluginPath = os.path.dirname(__file__)
 
-sessionExportedLayers = {}
+# cached outputs are stored under this name followed by the output suffix
+RESULT_BASENAME = "result"
 
 
 class CircuitscapeAlgorithm(QgsProcessingAlgorithm):
 
+    # raster parameters whose non-zero cells define region of interest
+    # when cropping inputs
+    ROI_PARAMETERS = ()
+    # among them, parameters where zero is a meaningful value
+    ROI_KEEP_ZERO = ()
+    # raster parameters marking cells where current enters or leaves
+    # the graph, used when pruning disconnected habitat patches
+    ANCHOR_PARAMETERS = ()
+    # validation rules for raster parameters other than resistance map
+    INPUT_ROLES = {}
+    # vector alternatives of raster parameters: raster parameter name
+    # mapped to vector parameter, value field parameter and burn mode
+    VECTOR_INPUTS = {}
+
     def __init__(self):
         super().__init__()
 
@@ -54,12 +86,20 @@ class CircuitscapeAlgorithm(QgsProcessingAlgorithm):
     def tr(self, text):
         return QCoreApplication.translate(self.__class__.__name__, text)
 
-    def exportRasterLayer(self, source):
-        global sessionExportedLayers
+    def isNativeFormat(self, layer):
+        if layer.providerType() != "gdal" or layer.bandCount() != 1:
+            return False
 
-        if source in sessionExportedLayers:
-            self.exportedLayers[source] = sessionExportedLayers[source]
-            return None
+        source = layer.source()
+        if not os.path.isfile(source):
+            return False
+
+        ext = os.path.splitext(source)[1].lstrip(".").lower()
+        return ext in circuitscapeUtils.nativeFormats()
+
+    def exportRasterLayer(self, source, window=None, readFrom=None):
+        # readFrom is an aligned view of the source to read data from
+        driver, ext, options = circuitscapeUtils.exportFormat()
 
         fileName = os.path.basename(source)
         validChars = \
@@ -67,23 +107,524 @@ class CircuitscapeAlgorithm(QgsProcessingAlgorithm):
         fileName = ''.join(c for c in fileName if c in validChars)
         if len(fileName) == 0:
             fileName = 'layer'
+        fileName = "{}.{}".format(fileName, ext)
 
-        destFilename = QgsProcessingUtils.generateTempFilename("{}.asc".format(fileName))
-        self.exportedLayers[source] = destFilename
-        sessionExportedLayers[source] = destFilename
+        cache = circuitscapeUtils.exportCache()
+        if cache is not None and readFrom is None and os.path.isfile(source):
+            key = diskCache.fileKey(source, driver, options, *([window] if window else []))
+            entry = cache.get(key, self.cacheOwner)
+            if entry is not None:
+                self.exportedLayers[source] = os.path.join(entry, fileName)
+                self.cacheHits += 1
+                return None
 
-        return "gdal_translate -of AAIGrid {} {}".format(source, destFilename)
+            self.cacheMisses += 1
+            destFilename = os.path.join(cache.reserve(key, self.cacheOwner), fileName)
+            self.pendingExports[key] = source
+        else:
+            destFilename = self.workspace.fileName("{}_{}".format(len(self.exportedLayers), fileName))
 
-    def prepareInputs(self, parameters, context):
-        commands = []
+        self.exportedLayers[source] = destFilename
+        return rasterExporter.ExportJob(readFrom or source, destFilename, driver, options, window)
+
+    def prepareInputs(self, parameters, context, feedback, skip=()):
+        # skipped raster parameters are validated but not exported, for
+        # inputs the algorithm reads itself
+        jobs = []
         self.exportedLayers = {}
+        self.pendingExports = {}
+        self.cacheHits = 0
+        self.cacheMisses = 0
+        self.rasterizedFiles = {}
+        if not self.rasterizeInputs(parameters, context, feedback):
+            return False
+        aligned = self.validateInputs(parameters, context, feedback)
+        window = self.cropWindow(parameters, context, feedback)
+        # kept for inputs exported later, e.g. additional scenarios
+        self.cropExtent = window
         for param in self.parameterDefinitions():
             if isinstance(param, QgsProcessingParameterRasterLayer):
                 layer = self.parameterAsRasterLayer(parameters, param.name(), context)
+                if layer is None or param.name() in skip or layer.source() in self.exportedLayers:
+                    continue
+                if window is None and layer.source() not in aligned and self.isNativeFormat(layer):
+                    # solver reads this file as is, pass it through
+                    self.exportedLayers[layer.source()] = layer.source()
+                else:
+                    job = self.exportRasterLayer(layer.source(), window, aligned.get(layer.source()))
+                    if job is not None:
+                        width, height = (window[2], window[3]) if window else (layer.width(), layer.height())
+                        job.estimatedSize = rasterExporter.estimateSize(width, height, job.driver)
+                        jobs.append(job)
+
+        # burned vector inputs are written once, in the solver input format
+        driver, ext, options = circuitscapeUtils.exportFormat()
+        for name, dataset in self.rasterizedInputs.items():
+            fileName = self.workspace.fileName("{}_{}.{}".format(len(self.rasterizedFiles), name.lower(), ext))
+            job = rasterExporter.ExportJob(dataset, fileName, driver, options, window)
+            width, height = (window[2], window[3]) if window else (dataset.RasterXSize, dataset.RasterYSize)
+            job.estimatedSize = rasterExporter.estimateSize(width, height, driver)
+            jobs.append(job)
+            self.rasterizedFiles[name] = fileName
+
+        try:
+            self.checkFreeSpace(jobs)
+        except Exception:
+            self.discardExports()
+            raise
+
+        threads = int(ProcessingConfig.getSetting(circuitscapeUtils.EXPORT_THREADS) or 0)
+        try:
+            completed = rasterExporter.exportRasters(jobs, feedback, threads)
+        except Exception:
+            self.discardExports()
+            raise
+
+        if not completed:
+            self.discardExports()
+            return False
+
+        self.commitExports(feedback)
+        self.rasterizedInputs = {}
+        return True
+
+    def rasterizeInputs(self, parameters, context, feedback):
+        # burns vector layers given instead of raster inputs onto the
+        # resistance map grid, in memory
+        self.rasterizedInputs = {}
+        reference = self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context)
+        for name, (vectorName, fieldName, burn) in self.VECTOR_INPUTS.items():
+            source = self.parameterAsSource(parameters, vectorName, context)
+            if source is None:
+                continue
+            if self.parameterAsRasterLayer(parameters, name, context) is not None:
+                raise QgsProcessingException(self.tr("Both raster and vector layer given for {}, use only one").format(
+                    self.parameterDefinition(name).description()))
+
+            fields = self.parameterAsFields(parameters, fieldName, context)
+            dataset, count = vectorRasterizer.rasterizeFeatures(source, fields[0] if fields else None,
+                                                                reference, context, burn, feedback)
+            if dataset is None:
+                return False
+
+            feedback.pushInfo(self.tr("Burned {} feature(s) of {} onto the resistance map grid").format(
+                count, source.sourceName()))
+            self.rasterizedInputs[name] = dataset
+        return True
+
+    def exportedInput(self, parameters, name, context):
+        # file passed to the solver for a raster parameter or for the
+        # vector layer given instead of it
+        if name in self.rasterizedFiles:
+            return self.rasterizedFiles[name]
+        return self.exportedParameter(parameters, name, context)
+
+    def inputRole(self, name, parameters, context):
+        if name == self.RESISTANCE_MAP:
+            if self.parameterAsBool(parameters, self.IS_CONDUCTANCES, context):
+                return inputValidation.ROLE_CONDUCTANCE
+            return inputValidation.ROLE_RESISTANCE
+        return self.INPUT_ROLES.get(name, inputValidation.ROLE_OTHER)
+
+    def validateInputs(self, parameters, context, feedback):
+        # checks grids and values of all raster inputs before anything is
+        # exported, returns aligned views of misaligned inputs by source
+        validate = ProcessingConfig.getSetting(circuitscapeUtils.VALIDATE_INPUTS)
+        autoAlign = ProcessingConfig.getSetting(circuitscapeUtils.AUTO_ALIGN)
+        aligned = {}
+        if not validate and not autoAlign:
+            return aligned
+
+        reference = self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context)
+        errors = []
+        for param in self.parameterDefinitions():
+            if not isinstance(param, QgsProcessingParameterRasterLayer):
+                continue
+            layer = self.parameterAsRasterLayer(parameters, param.name(), context)
+            if layer is None:
+                continue
+
+            source = layer.source()
+            if param.name() != self.RESISTANCE_MAP and source not in aligned:
+                problems = inputValidation.alignmentProblems(layer, reference)
+                if problems and autoAlign and layer.providerType() == "gdal":
+                    fileName = self.workspace.fileName("aligned_{}.vrt".format(len(aligned)))
+                    aligned[source] = inputValidation.warpedView(source, reference, fileName)
+                    feedback.pushInfo(self.tr("{} is resampled on the resistance map grid: {}").format(
+                        layer.name(), "; ".join(problems)))
+                elif problems:
+                    errors.extend("{}: {}".format(layer.name(), p) for p in problems)
+                    continue
+
+            if validate:
+                feedback.pushInfo(self.tr("Validating {}").format(layer.name()))
+                errors.extend(inputValidation.validateValues(aligned.get(source, source),
+                                                             self.inputRole(param.name(), parameters, context),
+                                                             layer.name()))
+            if feedback.isCanceled():
+                break
+
+        if validate:
+            for name, dataset in self.rasterizedInputs.items():
+                description = self.parameterDefinition(self.VECTOR_INPUTS[name][0]).description()
+                errors.extend(inputValidation.validateValues(dataset, self.inputRole(name, parameters, context),
+                                                             description))
+
+        if errors:
+            raise QgsProcessingException(self.tr("Invalid inputs:\n{}").format("\n".join(errors)))
+        return aligned
+
+    def cropWindow(self, parameters, context, feedback):
+        # common window covering region of interest plus buffer, in cells
+        # of the resistance map, or None if inputs are used as is
+        if not self.ROI_PARAMETERS or not ProcessingConfig.getSetting(circuitscapeUtils.CROP_TO_ROI):
+            return None
+
+        resistance = self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context)
+        width = resistance.width()
+        height = resistance.height()
+
+        extent = None
+        for name in self.ROI_PARAMETERS:
+            source = self.rasterizedInputs.get(name)
+            if source is None:
+                layer = self.parameterAsRasterLayer(parameters, name, context)
                 if layer is None:
                     continue
-                if not layer.source().lower().endswith("asc"):
-                    exportCommand = self.exportRasterLayer(layer.source())
-                    if exportCommand is not None:
-                        commands.append(exportCommand)
-        return commands
+                if layer.width() != width or layer.height() != height or layer.extent() != resistance.extent():
+                    feedback.pushInfo(self.tr("{} is not aligned with resistance map, inputs are not cropped").format(
+                        layer.name()))
+                    return None
+                source = layer.source()
+
+            cells = rasterTools.valueExtent(source, name not in self.ROI_KEEP_ZERO)
+            if cells is None:
+                continue
+            if extent is None:
+                extent = cells
+            else:
+                x0 = min(extent[0], cells[0])
+                y0 = min(extent[1], cells[1])
+                x1 = max(extent[0] + extent[2], cells[0] + cells[2])
+                y1 = max(extent[1] + extent[3], cells[1] + cells[3])
+                extent = (x0, y0, x1 - x0, y1 - y0)
+
+        if extent is None:
+            return None
+
+        buffer = int(ProcessingConfig.getSetting(circuitscapeUtils.CROP_BUFFER) or 0)
+        x0 = max(0, extent[0] - buffer)
+        y0 = max(0, extent[1] - buffer)
+        x1 = min(width, extent[0] + extent[2] + buffer)
+        y1 = min(height, extent[1] + extent[3] + buffer)
+        window = (x0, y0, x1 - x0, y1 - y0)
+        if window == (0, 0, width, height):
+            return None
+
+        feedback.pushInfo(self.tr("Cropping inputs to {}x{} cells starting at column {}, row {} "
+                                  "({:.1f}% of the resistance map)").format(
+                          window[2], window[3], x0, y0, 100.0 * window[2] * window[3] / (width * height)))
+        return window
+
+    def exportedParameter(self, parameters, name, context):
+        layer = self.parameterAsRasterLayer(parameters, name, context)
+        if layer is None:
+            return None
+        return self.exportedLayers.get(layer.source())
+
+    def pruneResistance(self, parameters, context, feedback):
+        # returns pruned copy of the exported resistance map or None
+        # if there is nothing to prune
+        if not self.ANCHOR_PARAMETERS or not ProcessingConfig.getSetting(circuitscapeUtils.PRUNE_COMPONENTS):
+            return None
+
+        if not componentPruning.isAvailable():
+            feedback.reportError(self.tr("SciPy is not available, disconnected habitat patches are not removed"))
+            return None
+
+        resistance = self.exportedParameter(parameters, self.RESISTANCE_MAP, context)
+        anchors = []
+        for name in self.ANCHOR_PARAMETERS:
+            fileName = self.exportedInput(parameters, name, context)
+            if fileName is not None:
+                anchors.append((fileName, name in self.ROI_KEEP_ZERO))
+
+        fourNeighbours = bool(ProcessingConfig.getSetting(circuitscapeUtils.FOUR_NEIGHBOURS))
+        mask = self.exportedParameter(parameters, self.MASK, context)
+        polygons = self.exportedInput(parameters, self.SHORT_CIRCUIT, context)
+
+        ext = ".asc" if rasterTools.rasterExtension(resistance) == ".asc" else ".tif"
+        destination = self.workspace.fileName("pruned_resistance{}".format(ext))
+        stats = componentPruning.pruneComponents(resistance, anchors, destination, fourNeighbours, mask, polygons)
+        feedback.pushInfo(self.tr("Removed {} of {} habitat cell(s) in {} of {} patch(es) without focal nodes, "
+                                  "sources or grounds").format(stats.removedCells, stats.cells,
+                                                               stats.removedComponents, stats.components))
+        if stats.removedCells == 0:
+            return None
+        return destination
+
+    def runCached(self, cfg, basePath, feedback, run):
+        # restores outputs of an earlier run with the same effective
+        # configuration and input contents, otherwise calls run() and
+        # stores what it wrote
+        cache = circuitscapeUtils.resultCache()
+        if cache is None:
+            return run()
+
+        key = circuitscapeUtils.resultKey(cfg)
+        directory, baseName = os.path.split(basePath)
+        entry = cache.get(key, self.cacheOwner)
+        if entry is not None:
+            restored = []
+            try:
+                for name in sorted(os.listdir(entry)):
+                    if name.startswith(RESULT_BASENAME):
+                        # copy, solver rewrites existing outputs in place
+                        # and would damage hard-linked cache files
+                        destination = basePath + name[len(RESULT_BASENAME):]
+                        shutil.copy2(os.path.join(entry, name), destination)
+                        restored.append(destination)
+            finally:
+                cache.release(self.cacheOwner)
+
+            feedback.pushInfo(self.tr("Inputs and options are unchanged since an earlier run, "
+                                      "restored {} output file(s) from results cache").format(len(restored)))
+            logFile = "{}_solver.log".format(basePath)
+            return {circuitscapeUtils.TIMINGS: {"cached": True},
+                    circuitscapeUtils.LOG_FILE: logFile if logFile in restored else ""}
+
+        started = time.time()
+        results = run()
+        if results is None:
+            return None
+
+        outputs = [e for e in os.scandir(directory)
+                   if e.name.startswith(baseName) and e.is_file() and e.stat().st_mtime >= started - 1]
+        if outputs:
+            path = cache.reserve(key, self.cacheOwner)
+            try:
+                for e in outputs:
+                    shutil.copy2(e.path, os.path.join(path, RESULT_BASENAME + e.name[len(baseName):]))
+                cache.put(key, {"basename": baseName})
+            except OSError as e:
+                cache.discard(key)
+                feedback.reportError(self.tr("Can not store results in cache: {}").format(e))
+        cache.release(self.cacheOwner)
+
+        stats = cache.statistics()
+        feedback.pushInfo(self.tr("Results cache: {} entries, {:.1f} MB, {} eviction(s) in total").format(
+            stats["entries"], stats["size"] / 1048576.0, stats["evictions"]))
+        return results
+
+    def planRun(self, cfg, feedback, solveCount, validCells=None):
+        # estimates peak memory and run time of the configured job and
+        # turns on low memory mode or refuses jobs which would not fit
+        # once the model is calibrated, returns the estimate or None when
+        # admission control is disabled; validCells must be given when
+        # habitat is not a raster
+        mode = ProcessingConfig.getSetting(circuitscapeUtils.ADMISSION_CONTROL)
+        if mode is None or mode == circuitscapeUtils.ADMISSION_DISABLED:
+            return None
+
+        if validCells is None:
+            validCells = rasterTools.countValid(cfg["Habitat raster or graph"]["habitat_file"])
+        section = cfg["Calculation options"]
+        solver = section["solver"]
+        lowMemory = section.getboolean("low_memory_mode")
+        workers = int(section["max_parallel"]) if section.getboolean("parallelize") else 1
+
+        calibration = circuitscapeUtils.calibrationFile()
+        estimate = resourcePlanner.estimate(calibration, solver, validCells, solveCount, lowMemory)
+        estimate.memory *= max(1, workers)
+
+        budget = ProcessingConfig.getSetting(circuitscapeUtils.PARALLEL_MEMORY)
+        budget = int(budget) * 1024 * 1024 if budget else circuitscapeUtils.availableMemory()
+        feedback.pushInfo(self.tr("Estimated peak memory ~{} MB, run time ~{} for {} cell(s) and {} solve(s) "
+                                  "({} model)").format(estimate.memory // 1048576, formatDuration(estimate.seconds),
+                                                       validCells, solveCount,
+                                                       self.tr("calibrated") if estimate.calibrated else self.tr("default")))
+        if budget is None or estimate.memory <= budget:
+            return estimate
+
+        message = self.tr("Job needs ~{} MB of memory, but only {} MB are available").format(
+            estimate.memory // 1048576, budget // 1048576)
+        if mode == circuitscapeUtils.ADMISSION_WARN:
+            feedback.reportError(message)
+            return estimate
+        if not estimate.calibrated:
+            # default model is too rough to refuse jobs on its own
+            feedback.reportError(self.tr("{}; not enforced until the resource model is calibrated").format(message))
+            return estimate
+
+        if not lowMemory:
+            section["low_memory_mode"] = "True"
+            section["preemptive_memory_release"] = "True"
+            estimate = resourcePlanner.estimate(calibration, solver, validCells, solveCount, True)
+            estimate.memory *= max(1, workers)
+            feedback.pushInfo(self.tr("{}, switching to low memory mode (~{} MB)").format(
+                message, estimate.memory // 1048576))
+            if estimate.memory <= budget:
+                return estimate
+
+        raise QgsProcessingException(self.tr("{}; reduce the input extent or run the job on a bigger machine").format(
+            message))
+
+    def runQueued(self, estimate, feedback, run):
+        # waits until estimated memory of the job fits into the host
+        # budget next to other running jobs
+        queue = circuitscapeUtils.memoryQueue() if estimate is not None else None
+        if queue is None:
+            return run()
+
+        reservation = queue.acquire(estimate.memory, feedback, self.name())
+        if reservation is None:
+            return None
+        try:
+            with queue.heartbeat(reservation):
+                return run()
+        finally:
+            queue.release(reservation)
+
+    def createWorkspace(self, feedback):
+        self.workspace = circuitscapeUtils.createWorkspace()
+        # cached inputs stay pinned until the run is over
+        self.cacheOwner = uuid.uuid4().hex
+        self.workspace.atExit(self.releaseExports)
+        feedback.pushInfo(self.tr("Run workspace: {}").format(self.workspace.path))
+        return self.workspace
+
+    def releaseExports(self):
+        cache = circuitscapeUtils.exportCache()
+        if cache is not None:
+            cache.release(self.cacheOwner)
+
+    def checkFreeSpace(self, jobs):
+        # sum up needs per filesystem, cached and temporary exports may
+        # live on different disks
+        required = {}
+        for job in jobs:
+            directory = os.path.dirname(job.destination)
+            device = os.stat(directory).st_dev
+            required.setdefault(device, [directory, 0])[1] += job.estimatedSize
+
+        for directory, size in required.values():
+            self.workspace.checkFreeSpace(size, directory)
+
+    def discardExports(self):
+        cache = circuitscapeUtils.exportCache()
+        if cache is None:
+            return
+
+        for key in self.pendingExports:
+            cache.discard(key)
+
+    def commitExports(self, feedback):
+        cache = circuitscapeUtils.exportCache()
+        if cache is None:
+            return
+
+        for key, source in self.pendingExports.items():
+            # exports are written to private directories and moved in
+            # place once complete
+            entry = cache.put(key, {"source": source})
+            if entry is not None:
+                self.exportedLayers[source] = os.path.join(entry, os.path.basename(self.exportedLayers[source]))
+
+        stats = cache.statistics()
+        feedback.pushInfo(self.tr("Converted rasters cache: {} hit(s), {} miss(es) in this run; "
+                                  "{} entries, {:.1f} MB, {} eviction(s) in total").format(
+                          self.cacheHits, self.cacheMisses, stats["entries"],
+                          stats["size"] / 1048576.0, stats["evictions"]))
+
+    def parallelModes(self):
+        return [self.tr("Use provider setting"),
+                self.tr("Disabled"),
+                self.tr("Automatic"),
+                self.tr("Fixed number of workers")]
+
+    def solvers(self):
+        return [self.tr("Use provider setting"),
+                self.tr("Automatic"),
+                self.tr("CG+AMG (iterative)"),
+                self.tr("CHOLMOD (direct)")]
+
+    def configureSolver(self, cfg, parameters, context, feedback, solveCount):
+        mode = self.parameterAsEnum(parameters, self.SOLVER, context)
+        if mode == 0:
+            mode = circuitscapeUtils.solverSetting()
+        else:
+            mode -= 1
+
+        layer = self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context)
+        cellCount = layer.width() * layer.height()
+
+        solver, reason = circuitscapeUtils.chooseSolver(mode, cellCount, solveCount)
+        feedback.pushInfo(self.tr("Using {} solver: {}").format(solver, reason))
+        cfg["Calculation options"]["solver"] = solver
+
+    def configureParallel(self, cfg, parameters, context, feedback):
+        mode = self.parameterAsEnum(parameters, self.PARALLEL_MODE, context)
+        if mode == 0:
+            mode = ProcessingConfig.getSetting(circuitscapeUtils.PARALLEL_MODE) or 0
+        else:
+            mode -= 1
+
+        maxWorkers = self.parameterAsInt(parameters, self.MAX_PARALLEL, context)
+        if maxWorkers == 0:
+            maxWorkers = int(ProcessingConfig.getSetting(circuitscapeUtils.MAX_PARALLEL) or 0)
+
+        layer = self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context)
+        cellCount = layer.width() * layer.height()
+
+        workers, reason = circuitscapeUtils.parallelWorkers(mode, maxWorkers, cellCount)
+        feedback.pushInfo(self.tr("Using {} solver worker(s): {}").format(workers, reason))
+
+        section = cfg["Calculation options"]
+        section["parallelize"] = str(workers > 1)
+        section["max_parallel"] = str(workers if workers > 1 else 0)
+
+    def runShards(self, cfg, shardSetups, basePath, parameters, context, feedback):
+        # runs one solver process per shard, each shard setup is a callable
+        # adjusting configuration for that shard and given the shard
+        # directory, outputs are merged into basePath afterwards
+        layer = self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context)
+        cellCount = layer.width() * layer.height()
+        workers, reason = circuitscapeUtils.parallelWorkers(circuitscapeUtils.PARALLEL_AUTO,
+                                                            len(shardSetups), cellCount)
+        feedback.pushInfo(self.tr("Running {} shard(s), {} at a time: {}").format(
+            len(shardSetups), workers, reason))
+
+        # shards already keep the cores busy
+        section = cfg["Calculation options"]
+        section["parallelize"] = "False"
+        section["max_parallel"] = "0"
+
+        baseName = os.path.basename(basePath)
+        iniPaths = []
+        shardBases = []
+        for i, setup in enumerate(shardSetups):
+            directory = self.workspace.subdirectory("shard_{}".format(i + 1))
+            setup(cfg, directory)
+
+            # keep solver outputs apart from shard inputs, so merging
+            # can pick them up by basename
+            outputDirectory = os.path.join(directory, "output")
+            os.makedirs(outputDirectory, exist_ok=True)
+            shardBase = os.path.join(outputDirectory, baseName)
+            cfg["Output options"]["output_file"] = shardBase
+
+            iniPath = os.path.join(directory, "circuitscape.ini")
+            with open(iniPath, "w") as f:
+                cfg.write(f)
+            iniPaths.append(iniPath)
+            shardBases.append(shardBase)
+
+        self.shardBases = shardBases
+        labels = ["shard {}/{}".format(i + 1, len(iniPaths)) for i in range(len(iniPaths))]
+        runs = parallelRuns.runSolvers(iniPaths, feedback, workers, labels)
+        if runs is None:
+            return None
+
+        outputMerger.mergeOutputs(shardBases, basePath, feedback)
+        return {circuitscapeUtils.TIMINGS: {"shards": [r[circuitscapeUtils.TIMINGS] for r in runs]},
+                circuitscapeUtils.LOG_FILE: "{}_solver.log".format(basePath)}
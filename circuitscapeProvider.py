@@ -38,7 +38,14 @@ from processing.tools.system import isWindows
 from processing_circuitscape.pairwise import Pairwise
 from processing_circuitscape.oneToAll import OneToAll
 from processing_circuitscape.advanced import Advanced
+from processing_circuitscape.network import Network
+from processing_circuitscape.multiResolution import MultiResolution
+from processing_circuitscape.scenarioBatch import ScenarioBatch
+from processing_circuitscape.transformSweep import TransformSweep
+from processing_circuitscape.tiled import Tiled
+from processing_circuitscape.calibrate import Calibrate
 from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import solverWorker
 
 pluginPath = os.path.dirname(__file__)
 
@@ -110,11 +117,165 @@ class CircuitscapeProvider(QgsProcessingProvider):
                                             self.tr("Compress output grids"),
                                             False))
 
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.SOLVER,
+                                            self.tr("Solver (CHOLMOD needs the Julia solver worker)"),
+                                            self.tr("CG+AMG (iterative)"),
+                                            valuetype=Setting.SELECTION,
+                                            options=[self.tr("Automatic"),
+                                                     self.tr("CG+AMG (iterative)"),
+                                                     self.tr("CHOLMOD (direct)")]))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.ENGINE,
+                                            self.tr("Solver engine"),
+                                            self.tr("External Circuitscape"),
+                                            valuetype=Setting.SELECTION,
+                                            options=[self.tr("External Circuitscape"),
+                                                     self.tr("In-process SciPy when supported")]))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.IN_PROCESS_MAX_CELLS,
+                                            self.tr("Largest grid solved in process, cells"),
+                                            1000000,
+                                            valuetype=Setting.INT))
+
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.ADMISSION_CONTROL,
+                                            self.tr("Jobs exceeding memory budget"),
+                                            self.tr("Warn only"),
+                                            valuetype=Setting.SELECTION,
+                                            options=[self.tr("Run without estimating"),
+                                                     self.tr("Warn only"),
+                                                     self.tr("Switch to low memory mode or refuse")]))
+
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.SCRATCH_DIRECTORY,
+                                            self.tr("Scratch directory for run workspaces (empty = QGIS temporary folder)"),
+                                            "",
+                                            valuetype=Setting.FOLDER))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.WORKSPACE_RETENTION,
+                                            self.tr("Keep run workspaces"),
+                                            self.tr("Never"),
+                                            valuetype=Setting.SELECTION,
+                                            options=[self.tr("Never"),
+                                                     self.tr("After failed runs"),
+                                                     self.tr("Always")]))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.WORKSPACE_MAX_AGE,
+                                            self.tr("Remove kept run workspaces after, hours (0 = never)"),
+                                            72,
+                                            valuetype=Setting.INT))
+
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.NATIVE_FORMATS,
+                                            self.tr("Raster formats read directly by Circuitscape (comma-separated extensions, "
+                                                    "GeoTIFF needs the Julia solver worker)"),
+                                            "asc"))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.EXPORT_FORMAT,
+                                            self.tr("Format for converted input rasters"),
+                                            self.tr("ASCII grid"),
+                                            valuetype=Setting.SELECTION,
+                                            options=[self.tr("GeoTIFF"),
+                                                     self.tr("ASCII grid")]))
+
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.VALIDATE_INPUTS,
+                                            self.tr("Validate input rasters before running"),
+                                            True))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.AUTO_ALIGN,
+                                            self.tr("Resample misaligned inputs on the resistance map grid"),
+                                            False))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.CROP_TO_ROI,
+                                            self.tr("Crop inputs to the extent of focal nodes, sources, grounds and mask"),
+                                            False))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.CROP_BUFFER,
+                                            self.tr("Buffer around cropped extent, cells"),
+                                            100,
+                                            valuetype=Setting.INT))
+
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.PRUNE_COMPONENTS,
+                                            self.tr("Remove habitat patches without focal nodes, sources or grounds"),
+                                            False))
+
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.EXPORT_THREADS,
+                                            self.tr("Number of threads used to convert input rasters (0 = all CPU cores)"),
+                                            0,
+                                            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.EXPORT_CACHE,
+                                            self.tr("Cache converted input rasters between runs"),
+                                            True))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.EXPORT_CACHE_DIRECTORY,
+                                            self.tr("Cache directory"),
+                                            circuitscapeUtils.cacheDirectory(),
+                                            valuetype=Setting.FOLDER))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.EXPORT_CACHE_SIZE,
+                                            self.tr("Maximum size of the converted rasters cache, MB (0 = unlimited)"),
+                                            10240,
+                                            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.RESULT_CACHE,
+                                            self.tr("Reuse results of earlier runs with identical inputs and options"),
+                                            False))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.RESULT_CACHE_SIZE,
+                                            self.tr("Maximum size of the results cache, MB (0 = unlimited)"),
+                                            10240,
+                                            valuetype=Setting.INT))
+
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.SOLVER_TIMEOUT,
+                                            self.tr("Terminate solver running longer than, minutes (0 = never)"),
+                                            0,
+                                            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.WARM_WORKER,
+                                            self.tr("Keep solver running between jobs"),
+                                            False))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.WORKER_COMMAND,
+                                            self.tr("Solver worker command"),
+                                            circuitscapeUtils.defaultWorkerCommand()))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.WORKER_IDLE_TIMEOUT,
+                                            self.tr("Stop idle solver worker after, minutes (0 = never)"),
+                                            15,
+                                            valuetype=Setting.INT))
+
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.PARALLEL_MODE,
+                                            self.tr("Parallel execution"),
+                                            self.tr("Disabled"),
+                                            valuetype=Setting.SELECTION,
+                                            options=[self.tr("Disabled"),
+                                                     self.tr("Automatic"),
+                                                     self.tr("Fixed number of workers")]))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.MAX_PARALLEL,
+                                            self.tr("Maximum number of parallel workers (0 = all CPU cores)"),
+                                            0,
+                                            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            circuitscapeUtils.PARALLEL_MEMORY,
+                                            self.tr("Memory budget for solver processes, MB (0 = all memory)"),
+                                            0,
+                                            valuetype=Setting.INT))
+
         ProcessingConfig.readSettings()
         self.refreshAlgorithms()
         return True
 
     def unload(self):
+        solverWorker.shutdownSharedWorker()
+
         ProcessingConfig.removeSetting(circuitscapeUtils.CIRCUITSCAPE_ACTIVE)
         if isWindows():
             ProcessingConfig.removeSetting(circuitscapeUtils.CIRCUITSCAPE_DIRECTORY)
@@ -128,6 +289,33 @@ class CircuitscapeProvider(QgsProcessingProvider):
         ProcessingConfig.removeSetting(circuitscapeUtils.ZERO_FOCAL)
         ProcessingConfig.removeSetting(circuitscapeUtils.LOG_TRANSFORM)
         ProcessingConfig.removeSetting(circuitscapeUtils.COMPRESS_OUTPUT)
+        ProcessingConfig.removeSetting(circuitscapeUtils.SOLVER)
+        ProcessingConfig.removeSetting(circuitscapeUtils.ENGINE)
+        ProcessingConfig.removeSetting(circuitscapeUtils.IN_PROCESS_MAX_CELLS)
+        ProcessingConfig.removeSetting(circuitscapeUtils.ADMISSION_CONTROL)
+        ProcessingConfig.removeSetting(circuitscapeUtils.SCRATCH_DIRECTORY)
+        ProcessingConfig.removeSetting(circuitscapeUtils.WORKSPACE_RETENTION)
+        ProcessingConfig.removeSetting(circuitscapeUtils.WORKSPACE_MAX_AGE)
+        ProcessingConfig.removeSetting(circuitscapeUtils.NATIVE_FORMATS)
+        ProcessingConfig.removeSetting(circuitscapeUtils.EXPORT_FORMAT)
+        ProcessingConfig.removeSetting(circuitscapeUtils.VALIDATE_INPUTS)
+        ProcessingConfig.removeSetting(circuitscapeUtils.AUTO_ALIGN)
+        ProcessingConfig.removeSetting(circuitscapeUtils.CROP_TO_ROI)
+        ProcessingConfig.removeSetting(circuitscapeUtils.CROP_BUFFER)
+        ProcessingConfig.removeSetting(circuitscapeUtils.PRUNE_COMPONENTS)
+        ProcessingConfig.removeSetting(circuitscapeUtils.EXPORT_THREADS)
+        ProcessingConfig.removeSetting(circuitscapeUtils.EXPORT_CACHE)
+        ProcessingConfig.removeSetting(circuitscapeUtils.EXPORT_CACHE_DIRECTORY)
+        ProcessingConfig.removeSetting(circuitscapeUtils.EXPORT_CACHE_SIZE)
+        ProcessingConfig.removeSetting(circuitscapeUtils.RESULT_CACHE)
+        ProcessingConfig.removeSetting(circuitscapeUtils.RESULT_CACHE_SIZE)
+        ProcessingConfig.removeSetting(circuitscapeUtils.SOLVER_TIMEOUT)
+        ProcessingConfig.removeSetting(circuitscapeUtils.WARM_WORKER)
+        ProcessingConfig.removeSetting(circuitscapeUtils.WORKER_COMMAND)
+        ProcessingConfig.removeSetting(circuitscapeUtils.WORKER_IDLE_TIMEOUT)
+        ProcessingConfig.removeSetting(circuitscapeUtils.PARALLEL_MODE)
+        ProcessingConfig.removeSetting(circuitscapeUtils.MAX_PARALLEL)
+        ProcessingConfig.removeSetting(circuitscapeUtils.PARALLEL_MEMORY)
 
     def isActive(self):
         return ProcessingConfig.getSetting(circuitscapeUtils.CIRCUITSCAPE_ACTIVE)
@@ -141,7 +329,13 @@ class CircuitscapeProvider(QgsProcessingProvider):
     def getAlgs(self):
         algs = [Pairwise(),
                 OneToAll(),
-                Advanced()
+                Advanced(),
+                Network(),
+                MultiResolution(),
+                ScenarioBatch(),
+                TransformSweep(),
+                Tiled(),
+                Calibrate()
                ]
 
         return algs
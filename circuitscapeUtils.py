@@ -26,16 +26,37 @@ __copyright__ = '(C) 2014-2018, Alexander Bruy'
 __revision__ = '$Format:%H$'
 
 import os
+import re
 import stat
+import time
+import queue
+import hashlib
+import threading
 import subprocess
 import configparser
 
-from qgis.core import QgsMessageLog, QgsProcessingFeedback, QgsProcessingUtils
+from qgis.core import (QgsMessageLog,
+                       QgsProcessingFeedback,
+                       QgsProcessingUtils,
+                       QgsProcessingException
+                      )
 from processing.core.ProcessingLog import ProcessingLog
 from processing.core.ProcessingConfig import ProcessingConfig
 
 from processing.tools.system import isWindows, userFolder
 
+from processing_circuitscape import diskCache
+from processing_circuitscape.diskCache import DiskCache
+from processing_circuitscape import solverWorker
+from processing_circuitscape import processTools
+from processing_circuitscape import sparseSolver
+from processing_circuitscape.resourcePlanner import MemoryQueue
+from processing_circuitscape.progressParser import SolverProgressParser
+from processing_circuitscape.solverLog import SolverLog
+from processing_circuitscape.workspace import RunWorkspace
+
+pluginPath = os.path.dirname(__file__)
+
 CIRCUITSCAPE_ACTIVE = "CIRCUITSCAPE_ACTIVE"
 CIRCUITSCAPE_DIRECTORY = "CIRCUITSCAPE_DIRECTORY"
 CIRCUITSCAPE_VERBOSE = "CIRCUITSCAPE_VERBOSE"
@@ -48,6 +69,102 @@ CUM_MAX_MAPS = "CUM_MAX_MAPS"
 ZERO_FOCAL = "ZERO_FOCAL"
 COMPRESS_OUTPUT = "COMPRESS_OUTPUT"
 LOG_TRANSFORM = "LOG_TRANSFORM"
+SOLVER_TIMEOUT = "SOLVER_TIMEOUT"
+WARM_WORKER = "WARM_WORKER"
+WORKER_COMMAND = "WORKER_COMMAND"
+WORKER_IDLE_TIMEOUT = "WORKER_IDLE_TIMEOUT"
+PARALLEL_MODE = "PARALLEL_MODE"
+MAX_PARALLEL = "MAX_PARALLEL"
+PARALLEL_MEMORY = "PARALLEL_MEMORY"
+NATIVE_FORMATS = "NATIVE_FORMATS"
+EXPORT_FORMAT = "EXPORT_FORMAT"
+EXPORT_CACHE = "EXPORT_CACHE"
+EXPORT_THREADS = "EXPORT_THREADS"
+EXPORT_CACHE_DIRECTORY = "EXPORT_CACHE_DIRECTORY"
+EXPORT_CACHE_SIZE = "EXPORT_CACHE_SIZE"
+RESULT_CACHE = "RESULT_CACHE"
+RESULT_CACHE_SIZE = "RESULT_CACHE_SIZE"
+SCRATCH_DIRECTORY = "SCRATCH_DIRECTORY"
+WORKSPACE_RETENTION = "WORKSPACE_RETENTION"
+WORKSPACE_MAX_AGE = "WORKSPACE_MAX_AGE"
+SOLVER = "SOLVER"
+ENGINE = "ENGINE"
+IN_PROCESS_MAX_CELLS = "IN_PROCESS_MAX_CELLS"
+ADMISSION_CONTROL = "ADMISSION_CONTROL"
+VALIDATE_INPUTS = "VALIDATE_INPUTS"
+AUTO_ALIGN = "AUTO_ALIGN"
+CROP_TO_ROI = "CROP_TO_ROI"
+CROP_BUFFER = "CROP_BUFFER"
+PRUNE_COMPONENTS = "PRUNE_COMPONENTS"
+
+# keys of the run details returned by runSolver()
+TIMINGS = "TIMINGS"
+LOG_FILE = "LOG_FILE"
+
+PARALLEL_DISABLED = 0
+PARALLEL_AUTO = 1
+PARALLEL_FIXED = 2
+
+ADMISSION_DISABLED = 0
+ADMISSION_WARN = 1
+ADMISSION_ENFORCE = 2
+
+CALIBRATION_FILE = "circuitscape_calibration.json"
+PARTITION_PROBE_FILE = "circuitscape_partitions.json"
+
+SOLVER_AUTO = 0
+SOLVER_CG_AMG = 1
+SOLVER_CHOLMOD = 2
+
+ENGINE_EXTERNAL = 0
+ENGINE_IN_PROCESS = 1
+
+# solver names as understood by Circuitscape, by selection index
+SOLVERS = (None, "cg+amg", "cholmod")
+
+# Circuitscape 4 (csrun.py, cs_run.exe) only has the iterative solver,
+# the Julia worker running Circuitscape 5 also factorises directly
+EXTERNAL_SOLVERS = ("cg+amg",)
+WORKER_SOLVERS = ("cg+amg", "cholmod")
+
+# direct factorisation pays off only when it is reused for several
+# solves and the factor fits in memory; fill-in of the Cholesky factor of
+# a raster graph is a few hundred non-zeros per cell
+CHOLMOD_MIN_SOLVES = 3
+CHOLMOD_MAX_CELLS = 10000000
+CHOLMOD_BYTES_PER_CELL = 2000
+
+EXPORT_GTIFF = 0
+EXPORT_AAIGRID = 1
+
+# driver, file extension and creation options for each export format
+EXPORT_FORMATS = (("GTiff", "tif", ["TILED=YES", "COMPRESS=LZW", "BIGTIFF=IF_SAFER"]),
+                  ("AAIGrid", "asc", []))
+
+# raster formats each engine reads, Circuitscape 4 only has readers for
+# ASCII grids and NumPy arrays
+EXTERNAL_FORMATS = {"asc", "npy"}
+WORKER_FORMATS = {"asc", "npy", "tif", "tiff"}
+
+# configuration options holding input rasters
+INPUT_RASTERS = (("Habitat raster or graph", "habitat_file"),
+                 ("Options for pairwise and one-to-all and all-to-one modes", "point_file"),
+                 ("Mask file", "mask_file"),
+                 ("Options for advanced mode", "source_file"),
+                 ("Options for advanced mode", "ground_file"),
+                 ("Short circuit regions (aka polygons)", "polygon_file"))
+
+POLL_INTERVAL = 0.2
+
+# configuration options which do not change solver results
+RESULT_NEUTRAL_OPTIONS = ("output_file", "parallelize", "max_parallel", "print_timings",
+                          "print_rusages", "screenprint_log", "log_level", "log_file",
+                          "profiler_log_file", "preemptive_memory_release", "low_memory_mode")
+
+# rough per-worker footprint of the solver: fixed runtime overhead plus
+# graph, preconditioner and solution vectors for each raster cell
+WORKER_BASE_MEMORY = 512 * 1024 * 1024
+WORKER_BYTES_PER_CELL = 300
 
 
 def circuitscapeDirectory():
@@ -55,7 +172,246 @@ def circuitscapeDirectory():
     return filePath if filePath is not None else ""
 
 
-def writeConfiguration():
+def defaultWorkerCommand():
+    return 'julia "{}"'.format(os.path.join(pluginPath, "workers", "circuitscapeWorker.jl"))
+
+
+def engineFormats():
+    # GeoTIFF inputs are only possible when jobs go to the Julia worker
+    if ProcessingConfig.getSetting(WARM_WORKER):
+        return WORKER_FORMATS
+    return EXTERNAL_FORMATS
+
+
+def nativeFormats():
+    formats = ProcessingConfig.getSetting(NATIVE_FORMATS)
+    if not formats:
+        return {"asc"}
+    formats = {f.strip().lstrip(".").lower() for f in formats.split(",") if f.strip()}
+    return formats & engineFormats()
+
+
+def exportFormat():
+    fmt = ProcessingConfig.getSetting(EXPORT_FORMAT)
+    fmt = EXPORT_FORMATS[fmt if fmt is not None else EXPORT_AAIGRID]
+    return fmt if fmt[1] in engineFormats() else EXPORT_FORMATS[EXPORT_AAIGRID]
+
+
+exportCacheInstance = None
+resultCacheInstance = None
+
+
+def cacheDirectory():
+    directory = ProcessingConfig.getSetting(EXPORT_CACHE_DIRECTORY)
+    if not directory:
+        directory = os.path.join(userFolder(), "circuitscape_cache")
+    return directory
+
+
+def exportCache():
+    global exportCacheInstance
+
+    if not ProcessingConfig.getSetting(EXPORT_CACHE):
+        return None
+
+    directory = os.path.join(cacheDirectory(), "exports")
+    if exportCacheInstance is None or exportCacheInstance.directory != directory:
+        exportCacheInstance = DiskCache(directory, 0)
+
+    exportCacheInstance.maxBytes = int(ProcessingConfig.getSetting(EXPORT_CACHE_SIZE) or 0) * 1024 * 1024
+    return exportCacheInstance
+
+
+def resultCache():
+    global resultCacheInstance
+
+    if not ProcessingConfig.getSetting(RESULT_CACHE):
+        return None
+
+    directory = os.path.join(cacheDirectory(), "results")
+    if resultCacheInstance is None or resultCacheInstance.directory != directory:
+        resultCacheInstance = DiskCache(directory, 0)
+
+    resultCacheInstance.maxBytes = int(ProcessingConfig.getSetting(RESULT_CACHE_SIZE) or 0) * 1024 * 1024
+    return resultCacheInstance
+
+
+def resultKey(cfg):
+    # effective configuration with input files replaced by digests of
+    # their content, so the key does not depend on temporary file names,
+    # and the engine which solves it
+    parts = ["engine={}".format(solverEngine(cfg))]
+    for sectionName in sorted(cfg.sections()):
+        for option, value in sorted(cfg[sectionName].items()):
+            if option in RESULT_NEUTRAL_OPTIONS:
+                continue
+            if value and os.path.isfile(value):
+                value = "file:{}".format(diskCache.contentDigest(value))
+            parts.append("{}.{}={}".format(sectionName, option, value))
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+def calibrationFile():
+    return os.path.join(userFolder(), CALIBRATION_FILE)
+
+
+def partitionProbeFile():
+    return os.path.join(userFolder(), PARTITION_PROBE_FILE)
+
+
+def memoryBudget():
+    # memory solver processes may use together, bytes
+    budget = ProcessingConfig.getSetting(PARALLEL_MEMORY)
+    return int(budget) * 1024 * 1024 if budget else totalMemory()
+
+
+def memoryQueue():
+    budget = memoryBudget()
+    if budget is None:
+        return None
+    return MemoryQueue(os.path.join(cacheDirectory(), "queue"), budget)
+
+
+def scratchDirectory():
+    directory = ProcessingConfig.getSetting(SCRATCH_DIRECTORY)
+    return directory if directory else QgsProcessingUtils.tempFolder()
+
+
+def createWorkspace():
+    retention = ProcessingConfig.getSetting(WORKSPACE_RETENTION) or 0
+    maxAge = int(ProcessingConfig.getSetting(WORKSPACE_MAX_AGE) or 0) * 3600
+    return RunWorkspace(scratchDirectory(), retention, maxAge)
+
+
+def availableMemory():
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+
+    if isWindows():
+        import ctypes
+
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [("dwLength", ctypes.c_ulong),
+                        ("dwMemoryLoad", ctypes.c_ulong),
+                        ("ullTotalPhys", ctypes.c_ulonglong),
+                        ("ullAvailPhys", ctypes.c_ulonglong),
+                        ("ullTotalPageFile", ctypes.c_ulonglong),
+                        ("ullAvailPageFile", ctypes.c_ulonglong),
+                        ("ullTotalVirtual", ctypes.c_ulonglong),
+                        ("ullAvailVirtual", ctypes.c_ulonglong),
+                        ("sullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys
+        return None
+
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                m = re.match(r"MemAvailable:\s+(\d+)\s+kB", line)
+                if m:
+                    return int(m.group(1)) * 1024
+    except OSError:
+        pass
+
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def totalMemory():
+    try:
+        import psutil
+        return psutil.virtual_memory().total
+    except ImportError:
+        pass
+
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        # on Windows fall back to what is free right now
+        return availableMemory()
+
+
+def cpuCount():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def workerMemory(cellCount):
+    return WORKER_BASE_MEMORY + cellCount * WORKER_BYTES_PER_CELL
+
+
+def solverSetting():
+    value = ProcessingConfig.getSetting(SOLVER)
+    return int(value) if value is not None else SOLVER_CG_AMG
+
+
+def supportedSolvers(allowWorker=True):
+    # solvers the engine runSolver() starts can handle
+    if allowWorker and ProcessingConfig.getSetting(WARM_WORKER):
+        return WORKER_SOLVERS
+    return EXTERNAL_SOLVERS
+
+
+def chooseSolver(mode, cellCount, solveCount):
+    # returns solver name and a short explanation of the choice
+    if mode != SOLVER_AUTO and SOLVERS[mode] in supportedSolvers():
+        return SOLVERS[mode], "selected explicitly"
+
+    if "cholmod" not in supportedSolvers():
+        return "cg+amg", "configured Circuitscape engine only has the iterative solver"
+
+    if solveCount < CHOLMOD_MIN_SOLVES:
+        return "cg+amg", "{} solve(s), factorisation would not be reused".format(solveCount)
+
+    if cellCount > CHOLMOD_MAX_CELLS:
+        return "cg+amg", "{} cells, too large for direct factorisation".format(cellCount)
+
+    required = WORKER_BASE_MEMORY + cellCount * CHOLMOD_BYTES_PER_CELL
+    available = availableMemory()
+    if available is None:
+        return "cg+amg", "available memory unknown"
+    if required > available:
+        return "cg+amg", "factorisation needs ~{} MB, {} MB available".format(
+            required // (1024 * 1024), available // (1024 * 1024))
+
+    return "cholmod", "{} cells and {} solves, factorisation needs ~{} MB of {} MB available".format(
+        cellCount, solveCount, required // (1024 * 1024), available // (1024 * 1024))
+
+
+def parallelWorkers(mode, maxWorkers, cellCount):
+    # returns number of solver workers and a short explanation of the choice
+    if mode == PARALLEL_DISABLED:
+        return 1, "parallel execution disabled"
+
+    cores = cpuCount()
+    if mode == PARALLEL_FIXED:
+        workers = maxWorkers if maxWorkers > 0 else cores
+        return workers, "fixed number of workers"
+
+    workers = min(cores, maxWorkers) if maxWorkers > 0 else cores
+
+    budget = ProcessingConfig.getSetting(PARALLEL_MEMORY)
+    budget = int(budget) * 1024 * 1024 if budget else availableMemory()
+    if budget is None:
+        return workers, "{} CPU cores, available memory unknown".format(cores)
+
+    perWorker = workerMemory(cellCount)
+    fitting = max(1, int(budget // perWorker))
+    reason = "{} CPU cores, {} MB memory budget, ~{} MB per worker".format(
+        cores, budget // (1024 * 1024), perWorker // (1024 * 1024))
+    return min(workers, fitting), reason
+
+
+def writeConfiguration(directory=None):
     cfg = configparser.ConfigParser()
 
     cfg["Options for advanced mode"] = {}
@@ -76,7 +432,8 @@ def writeConfiguration():
     section = cfg["Calculation options"]
     section["low_memory_mode"] = "False"
     section["parallelize"] = "False"
-    section["solver"] = "cg+amg"
+    solver = SOLVERS[solverSetting()]
+    section["solver"] = solver if solver in supportedSolvers() else "cg+amg"
     section["print_timings"] = "True"
     section["preemptive_memory_release"] = str(ProcessingConfig.getSetting(PREEMPT_MEMORY))
     section["print_rusages"] = "False"
@@ -134,41 +491,63 @@ def writeConfiguration():
     section["Habitat raster or graph"] = "habitat_file"
 
     cfg["Circuitscape mode"] = {}
+    section = cfg["Circuitscape mode"]
     section["data_type"] = "raster"
     section["scenario"] = ""
 
-    iniPath = QgsProcessingUtils.generateTempFilename("circuitscape.ini")
+    if directory is None:
+        iniPath = QgsProcessingUtils.generateTempFilename("circuitscape.ini")
+    else:
+        iniPath = os.path.join(directory, "circuitscape.ini")
     with open(iniPath, "w") as f:
         cfg.write(f)
 
     return iniPath
 
 
-def batchJobFilename():
+def batchJobFilename(directory=None):
     if isWindows():
         fileName = "circuitscape_batch_job.bat"
     else:
         fileName = "circuitscape_batch_job.sh"
 
-    batchFile = userFolder() + os.sep + fileName
+    if directory is None:
+        directory = userFolder()
+    batchFile = directory + os.sep + fileName
 
     return batchFile
 
 
-def jobFileFromCommands(commands):
-    with open(batchJobFilename(), "w") as f:
+def jobFileFromCommands(commands, directory=None):
+    jobFile = batchJobFilename(directory)
+    with open(jobFile, "w") as f:
         for command in commands:
             f.write("{}\n".format(command))
 
-        f.write("exit")
+        # propagate exit code of the last command
+        if isWindows():
+            f.write("exit /b %ERRORLEVEL%")
+        else:
+            f.write("exit")
+
+    return jobFile
+
+
+def readLines(stream, lines):
+    for line in iter(stream.readline, ""):
+        lines.put(line)
+    lines.put(None)
 
 
-def execute(feedback):
+def execute(feedback, parser=None, log=None, jobFile=None):
+    if jobFile is None:
+        jobFile = batchJobFilename()
+
     if isWindows():
-        commands = ["cmd.exe", "/C", batchJobFilename()]
+        commands = ["cmd.exe", "/C", jobFile]
     else:
-        os.chmod(batchJobFilename(), stat.S_IEXEC | stat.S_IREAD | stat.S_IWRITE)
-        commands = [batchJobFilename()]
+        os.chmod(jobFile, stat.S_IEXEC | stat.S_IREAD | stat.S_IWRITE)
+        commands = ["/bin/sh", jobFile]
 
     fused_command = " ".join([str(c) for c in commands])
     QgsMessageLog.logMessage(fused_command, "Processing", QgsMessageLog.INFO)
@@ -176,19 +555,212 @@ def execute(feedback):
     feedback.pushCommandInfo(fused_command)
     feedback.pushInfo("Circuitscape command output:")
 
-    loglines = []
-    with subprocess.Popen(fused_command,
-                          shell=True,
-                          stdout=subprocess.PIPE,
-                          stdin=subprocess.DEVNULL,
-                          stderr=subprocess.STDOUT,
-                          universal_newlines=True) as proc:
-        try:
-            for line in iter(proc.stdout.readline, ""):
-                feedback.pushConsoleInfo(line)
-                loglines.append(line)
-        except:
-            pass
-
-    if ProcessingConfig.getSetting(CIRCUITSCAPE_VERBOSE):
-        QgsMessageLog.logMessage("\n".join(loglines), "Processing", QgsMessageLog.INFO)
+    timeout = solverTimeout()
+    started = time.monotonic()
+
+    if log is None:
+        log = SolverLog(feedback)
+    lines = queue.Queue()
+    proc = subprocess.Popen(commands,
+                            stdout=subprocess.PIPE,
+                            stdin=subprocess.DEVNULL,
+                            stderr=subprocess.STDOUT,
+                            universal_newlines=True,
+                            **processTools.processGroupArgs())
+    reader = threading.Thread(target=readLines, args=(proc.stdout, lines), daemon=True)
+    reader.start()
+
+    try:
+        while True:
+            if feedback.isCanceled():
+                processTools.killProcessTree(proc)
+                feedback.pushInfo("Circuitscape execution canceled")
+                return False
+
+            if timeout > 0 and time.monotonic() - started > timeout:
+                processTools.killProcessTree(proc)
+                raise QgsProcessingException(
+                    "Circuitscape did not finish in {} minute(s) and was terminated".format(timeout // 60))
+
+            try:
+                line = lines.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                log.poll()
+                continue
+
+            if line is None:
+                break
+
+            log.write(line)
+            if parser is not None:
+                parser.feed(line)
+
+        proc.wait()
+    finally:
+        # never leave solver behind, whatever happened here
+        processTools.killProcessTree(proc)
+        proc.stdout.close()
+
+        log.close()
+        if ProcessingConfig.getSetting(CIRCUITSCAPE_VERBOSE):
+            QgsMessageLog.logMessage(log.summary(), "Processing", QgsMessageLog.INFO)
+
+    if proc.returncode != 0:
+        raise QgsProcessingException("Circuitscape failed with exit code {}".format(proc.returncode))
+
+    return True
+
+
+def solverTimeout():
+    return int(ProcessingConfig.getSetting(SOLVER_TIMEOUT) or 0) * 60
+
+
+def solverExecutable():
+    if isWindows():
+        csPath = circuitscapeDirectory()
+        if csPath == "":
+            return "cs_run.exe"
+        return os.path.join(csPath, "cs_run.exe")
+    return "csrun.py"
+
+
+def solverCommand(iniPath):
+    if isWindows():
+        return '"{}" {}'.format(solverExecutable(), iniPath)
+    else:
+        return "{} {}".format(solverExecutable(), iniPath)
+
+
+def inProcessUnsupportedReason(cfg):
+    maxCells = int(ProcessingConfig.getSetting(IN_PROCESS_MAX_CELLS) or 0)
+    return sparseSolver.unsupportedReason(cfg, maxCells)
+
+
+def solverEngine(cfg):
+    # engine runSolver() picks for the configuration, both engines write
+    # slightly different outputs
+    if ProcessingConfig.getSetting(ENGINE) == ENGINE_IN_PROCESS and inProcessUnsupportedReason(cfg) is None:
+        return "in-process"
+    return "external:{}".format(solverCommand(""))
+
+
+def runSolver(iniPath, feedback, allowWorker=True, allowInProcess=True):
+    # returns run details to merge into algorithm results or None
+    # if execution was canceled
+    logFile = solverLogFilename(iniPath)
+    feedback.pushInfo("Full solver output is written to {}".format(logFile))
+
+    if allowInProcess and ProcessingConfig.getSetting(ENGINE) == ENGINE_IN_PROCESS:
+        cfg = configparser.ConfigParser()
+        cfg.read(iniPath)
+        reason = inProcessUnsupportedReason(cfg)
+        if reason is None:
+            return runInProcess(cfg, feedback, logFile)
+        feedback.pushInfo("Using external solver, in-process engine can not run this job: {}".format(reason))
+
+    parser = SolverProgressParser(feedback)
+    log = SolverLog(feedback, logFile)
+    if allowWorker and ProcessingConfig.getSetting(WARM_WORKER):
+        completed = runInWorker(iniPath, feedback, parser, log)
+    else:
+        checkExternalSolver(iniPath, feedback)
+        checkExternalInputs(iniPath)
+        # job script lives next to the configuration, so concurrent runs
+        # using separate workspaces never overwrite each other's scripts
+        jobFile = jobFileFromCommands([solverCommand(iniPath)], os.path.dirname(iniPath))
+        completed = execute(feedback, parser, log, jobFile)
+
+    if not completed:
+        return None
+
+    parser.finish()
+    return {TIMINGS: parser.timings(),
+            LOG_FILE: logFile}
+
+
+def checkExternalSolver(iniPath, feedback):
+    # runs that can not use the worker, e.g. parallel ones, fall back to
+    # the solver Circuitscape 4 has
+    cfg = configparser.ConfigParser()
+    cfg.read(iniPath)
+    solver = cfg.get("Calculation options", "solver", fallback="cg+amg")
+    if solver not in EXTERNAL_SOLVERS:
+        feedback.pushInfo("External Circuitscape does not support {} solver, using cg+amg".format(solver))
+        cfg["Calculation options"]["solver"] = "cg+amg"
+        with open(iniPath, "w") as f:
+            cfg.write(f)
+
+
+def checkExternalInputs(iniPath):
+    # runs bypassing the worker get inputs Circuitscape 4 can not read
+    # when GeoTIFF was allowed for the worker
+    cfg = configparser.ConfigParser()
+    cfg.read(iniPath)
+    for section, option in INPUT_RASTERS:
+        fileName = cfg.get(section, option, fallback="")
+        ext = os.path.splitext(fileName)[1].lstrip(".").lower()
+        if ext in WORKER_FORMATS - EXTERNAL_FORMATS:
+            raise QgsProcessingException("External Circuitscape can not read {}, runs which bypass the solver "
+                                         "worker need ASCII grid inputs".format(fileName))
+
+
+def runInProcess(cfg, feedback, logFile):
+    feedback.pushInfo("Solving with in-process SciPy engine")
+    log = SolverLog(feedback, logFile)
+    try:
+        timings = sparseSolver.solve(cfg, feedback, log)
+    finally:
+        log.close()
+
+    if timings is None:
+        return None
+    return {TIMINGS: timings,
+            LOG_FILE: logFile}
+
+
+def solverLogFilename(iniPath):
+    # keep log next to the solver outputs, so it outlives temporary files
+    cfg = configparser.ConfigParser()
+    cfg.read(iniPath)
+    outputFile = cfg.get("Output options", "output_file", fallback="")
+    if outputFile:
+        return "{}_solver.log".format(os.path.splitext(outputFile)[0])
+    return os.path.splitext(iniPath)[0] + ".log"
+
+
+def runInWorker(iniPath, feedback, parser=None, log=None):
+    command = ProcessingConfig.getSetting(WORKER_COMMAND) or defaultWorkerCommand()
+    idleTimeout = int(ProcessingConfig.getSetting(WORKER_IDLE_TIMEOUT) or 0) * 60
+    worker = solverWorker.sharedWorker(command, idleTimeout)
+
+    if not worker.isRunning():
+        feedback.pushInfo("Starting solver worker:")
+        feedback.pushCommandInfo(command)
+    feedback.pushInfo("Submitting {} to solver worker".format(iniPath))
+    feedback.pushInfo("Circuitscape command output:")
+
+    if log is None:
+        log = SolverLog(feedback)
+
+    def pushLine(line):
+        log.write(line)
+        if parser is not None:
+            parser.feed(line)
+
+    try:
+        returnCode = worker.run(iniPath, pushLine, feedback.isCanceled, solverTimeout(), log.poll)
+    except solverWorker.WorkerError as e:
+        raise QgsProcessingException(str(e))
+    finally:
+        log.close()
+        if ProcessingConfig.getSetting(CIRCUITSCAPE_VERBOSE):
+            QgsMessageLog.logMessage(log.summary(), "Processing", QgsMessageLog.INFO)
+
+    if returnCode is None:
+        feedback.pushInfo("Circuitscape execution canceled")
+        return False
+
+    if returnCode != 0:
+        raise QgsProcessingException("Circuitscape failed with exit code {}".format(returnCode))
+
+    return True
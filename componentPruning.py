@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    componentPruning.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+from osgeo import gdal
+
+try:
+    from scipy import ndimage
+except ImportError:
+    ndimage = None
+
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+
+class PruneStatistics:
+
+    def __init__(self, components, removedComponents, cells, removedCells):
+        self.components = components
+        self.removedComponents = removedComponents
+        self.cells = cells
+        self.removedCells = removedCells
+
+
+def isAvailable():
+    return ndimage is not None
+
+
+def readBand(fileName):
+    ds = rasterTools.openRaster(fileName)
+    band = ds.GetRasterBand(1)
+    return ds, band.ReadAsArray(), band.GetNoDataValue()
+
+
+def presentCells(fileName, keepZero=False):
+    ds, data, noData = readBand(fileName)
+    present = rasterTools.validMask(data, noData)
+    if not keepZero:
+        present &= data != 0
+    return present
+
+
+def pruneComponents(resistanceFile, anchors, destination, fourNeighbours=False, mask=None, polygons=None):
+    # anchors is a list of (fileName, keepZero) tuples for rasters marking
+    # focal nodes, sources or grounds; habitat cells in components without
+    # any anchor are set to NODATA in the destination raster
+    ds, data, noData = readBand(resistanceFile)
+    if noData is None:
+        noData = rasterExporter.DEFAULT_NODATA
+
+    habitat = rasterTools.validMask(data, noData) & (data > 0)
+    if mask is not None:
+        maskDs, maskData, maskNoData = readBand(mask)
+        habitat &= rasterTools.validMask(maskData, maskNoData) & (maskData > 0)
+
+    structure = ndimage.generate_binary_structure(2, 1 if fourNeighbours else 2)
+    labels, count = ndimage.label(habitat, structure=structure)
+
+    keep = numpy.zeros(count + 1, dtype=bool)
+    for fileName, keepZero in anchors:
+        keep[numpy.unique(labels[presentCells(fileName, keepZero) & habitat])] = True
+
+    if polygons is not None:
+        # short-circuit regions join all components they touch
+        polygonDs, polygonData, polygonNoData = readBand(polygons)
+        valid = rasterTools.validMask(polygonData, polygonNoData) & (polygonData != 0) & habitat
+        groups = [numpy.unique(labels[valid & (polygonData == value)])
+                  for value in numpy.unique(polygonData[valid])]
+        changed = True
+        while changed:
+            changed = False
+            for group in groups:
+                if keep[group].any() and not keep[group].all():
+                    keep[group] = True
+                    changed = True
+
+    # label 0 is background, never touched
+    keep[0] = True
+    removed = ~keep[labels]
+    removedCells = int(removed.sum())
+    stats = PruneStatistics(count, int(count - keep[1:].sum()), int(habitat.sum()), removedCells)
+    if removedCells == 0:
+        return stats
+
+    dataType = ds.GetRasterBand(1).DataType
+    if not canHold(data.dtype, noData):
+        # e.g. Byte rasters without NODATA can not hold the default one,
+        # removed cells would become zero resistances
+        data = data.astype(numpy.float32)
+        dataType = gdal.GDT_Float32
+
+    data = numpy.where(removed, noData, data)
+    rasterTools.writeRaster(destination, ds, [(0, data)], noData, dataType)
+    return stats
+
+
+def canHold(dtype, value):
+    if numpy.issubdtype(dtype, numpy.integer):
+        info = numpy.iinfo(dtype)
+        return float(value).is_integer() and info.min <= value <= info.max
+    return True
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    corridors.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+from osgeo import gdal
+
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+# rasters are read in strips of whole blocks of factor rows, only the
+# coarse grid is held in memory at once
+
+
+def readBand(fileName):
+    ds = rasterTools.openRaster(fileName)
+    band = ds.GetRasterBand(1)
+    return ds, band.ReadAsArray().astype(numpy.float64), band.GetNoDataValue()
+
+
+def blocks(data, factor, fill):
+    # view of the array as (rows, factor, columns, factor) blocks, edges
+    # are padded with the fill value up to whole blocks
+    rows = -(-data.shape[0] // factor)
+    columns = -(-data.shape[1] // factor)
+    padded = numpy.full((rows * factor, columns * factor), fill, dtype=data.dtype)
+    padded[:data.shape[0], :data.shape[1]] = data
+    return padded.reshape(rows, factor, columns, factor)
+
+
+def coarseGeoTransform(geoTransform, factor):
+    return (geoTransform[0], geoTransform[1] * factor, geoTransform[2] * factor,
+            geoTransform[3], geoTransform[4] * factor, geoTransform[5] * factor)
+
+
+def stripRows(band, width, factor):
+    # rows read at once, a multiple of factor so no block of the coarse
+    # grid is split between strips
+    rows = rasterExporter.blockRows(band, width)
+    return max(factor, rows - rows % factor)
+
+
+def aggregate(fileName, factor, combine, fill, dtype):
+    # coarse grid built strip by strip, combine(data, valid) returns the
+    # coarse rows of a strip; returns source dataset and coarse grid
+    ds = rasterTools.openRaster(fileName)
+    band = ds.GetRasterBand(1)
+    noData = band.GetNoDataValue()
+    width, height = ds.RasterXSize, ds.RasterYSize
+
+    coarse = numpy.full((-(-height // factor), -(-width // factor)), fill, dtype=dtype)
+    for row, data in rasterExporter.iterBlocks(band, (0, 0, width, height), stripRows(band, width, factor)):
+        part = combine(data, rasterTools.validMask(data, noData))
+        coarse[row // factor:row // factor + part.shape[0]] = part
+    return ds, coarse
+
+
+def aggregateValues(fileName, factor):
+    # mean of the valid cells in every block, blocks without valid cells
+    # become NODATA; returns source dataset and coarse grid
+    def mean(data, valid):
+        counts = blocks(valid, factor, False).sum(axis=(1, 3))
+        sums = blocks(numpy.where(valid, data, 0.0), factor, 0.0).sum(axis=(1, 3))
+        means = numpy.full(counts.shape, rasterExporter.DEFAULT_NODATA, dtype=numpy.float64)
+        means[counts > 0] = sums[counts > 0] / counts[counts > 0]
+        return means
+
+    return aggregate(fileName, factor, mean, rasterExporter.DEFAULT_NODATA, numpy.float64)
+
+
+def aggregateIds(fileName, factor):
+    # largest positive ID in every block, so each coarse cell keeps one
+    # focal node; returns coarse grid and IDs lost in shared blocks
+    seen = set()
+
+    def largest(data, valid):
+        ids = numpy.where(valid & (data > 0), data, 0).astype(numpy.float64)
+        seen.update(numpy.unique(ids[ids > 0]).tolist())
+        return blocks(ids, factor, 0.0).max(axis=(1, 3))
+
+    ds, coarse = aggregate(fileName, factor, largest, 0.0, numpy.float64)
+    lost = seen - set(numpy.unique(coarse[coarse > 0]).tolist())
+    coarse = numpy.where(coarse > 0, coarse, rasterExporter.DEFAULT_NODATA)
+    return coarse, sorted(lost)
+
+
+def presence(data, noData):
+    # cells with valid non-zero values
+    return rasterTools.validMask(data, noData) & (data != 0)
+
+
+def aggregatePresence(fileName, factor):
+    # coarse cells with at least one valid non-zero cell
+    def anyPresent(data, valid):
+        return blocks(valid & (data != 0), factor, False).any(axis=(1, 3))
+
+    return aggregate(fileName, factor, anyPresent, False, bool)[1]
+
+
+def dilate(mask, radius):
+    # square dilation by radius cells, rows and columns are handled
+    # separately with running sums of the padded mask
+    if radius <= 0:
+        return mask
+
+    def along(values, axis):
+        padded = numpy.pad(values.astype(numpy.uint32), [(radius + 1, radius) if a == axis else (0, 0)
+                                                          for a in range(values.ndim)])
+        sums = numpy.cumsum(padded, axis=axis, dtype=numpy.uint32)
+        upper = numpy.take(sums, numpy.arange(2 * radius + 1, sums.shape[axis]), axis=axis)
+        lower = numpy.take(sums, numpy.arange(0, sums.shape[axis] - 2 * radius - 1), axis=axis)
+        return upper > lower
+
+    return along(along(mask, 0), 1)
+
+
+def corridorSelection(currentFile, percentile):
+    # coarse cells carrying at least the given percentile of current;
+    # returns mask and the current threshold
+    ds, data, noData = readBand(currentFile)
+    carrying = rasterTools.validMask(data, noData) & (data > 0)
+    if not carrying.any():
+        return numpy.zeros(data.shape, dtype=bool), None
+
+    threshold = numpy.percentile(data[carrying], percentile)
+    return carrying & (data >= threshold), threshold
+
+
+def upsample(selected, factor, top, bottom, width):
+    # fine rows top to bottom of the coarse mask
+    coarse = selected[top // factor:(bottom - 1) // factor + 1]
+    fine = numpy.repeat(numpy.repeat(coarse, factor, axis=0), factor, axis=1)
+    offset = top - top // factor * factor
+    return fine[offset:offset + bottom - top, :width]
+
+
+def corridorStrips(selected, factor, dilation, width, height, rows):
+    # fine corridor mask in strips of rows, each dilated together with a
+    # halo of dilation rows above and below
+    for row in range(0, height, rows):
+        count = min(rows, height - row)
+        top = max(0, row - dilation)
+        bottom = min(height, row + count + dilation)
+        fine = dilate(upsample(selected, factor, top, bottom, width), dilation)
+        yield row, fine[row - top:row - top + count]
+
+
+def writeCorridorMask(destination, template, selected, factor, dilation, focalFile, maskFile=None):
+    # corridors widened by dilation cells plus all focal cells, limited
+    # to the mask; written strip by strip as Byte raster, returns number
+    # of corridor cells
+    width, height = template.RasterXSize, template.RasterYSize
+    window = (0, 0, width, height)
+    focal = rasterTools.openRaster(focalFile).GetRasterBand(1)
+    rows = rasterExporter.blockRows(focal, width)
+    readers = [(rasterExporter.iterBlocks(focal, window, rows), focal.GetNoDataValue())]
+    if maskFile is not None:
+        mask = rasterTools.openRaster(maskFile).GetRasterBand(1)
+        readers.append((rasterExporter.iterBlocks(mask, window, rows), mask.GetNoDataValue()))
+
+    count = 0
+
+    def strips():
+        nonlocal count
+        for row, corridor in corridorStrips(selected, factor, dilation, width, height, rows):
+            focalRow, data = next(readers[0][0])
+            # focal nodes must stay on the graph whatever current they carry
+            corridor |= presence(data, readers[0][1])
+            if maskFile is not None:
+                maskRow, data = next(readers[1][0])
+                corridor &= presence(data, readers[1][1])
+            count += int(numpy.count_nonzero(corridor))
+            yield row, corridor.astype(numpy.uint8)
+
+    rasterTools.writeRaster(destination, template, strips(), 255, gdal.GDT_Byte)
+    return count
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    diskCache.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import json
+import time
+import shutil
+import uuid
+import hashlib
+import threading
+import contextlib
+
+from processing_circuitscape import resourcePlanner
+
+# size of the chunks read from the start, middle and end of a file
+# when computing its content fingerprint
+FINGERPRINT_CHUNK = 1024 * 1024
+
+# entries being written are kept in private directories with this
+# marker until they are complete
+PENDING_MARKER = ".pending-"
+
+# age in seconds after which abandoned private directories are removed
+PENDING_MAX_AGE = 24 * 3600
+
+# full content digests by file key, files are read in full again only
+# when their location, modification time, size or fingerprint changed
+contentDigests = {}
+contentDigestsLock = threading.Lock()
+MAX_CONTENT_DIGESTS = 4096
+
+
+def fingerprint(filePath):
+    size = os.path.getsize(filePath)
+    digest = hashlib.sha1(str(size).encode())
+    with open(filePath, "rb") as f:
+        if size <= 3 * FINGERPRINT_CHUNK:
+            digest.update(f.read())
+        else:
+            for offset in (0, (size - FINGERPRINT_CHUNK) // 2, size - FINGERPRINT_CHUNK):
+                f.seek(offset)
+                digest.update(f.read(FINGERPRINT_CHUNK))
+    return digest.hexdigest()
+
+
+def contentHash(filePath):
+    # full content digest, for files which are rewritten with new
+    # modification time on every run
+    digest = hashlib.sha1()
+    with open(filePath, "rb") as f:
+        for chunk in iter(lambda: f.read(FINGERPRINT_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fileKey(filePath, *options):
+    # identifies file by its location, modification time, size and content,
+    # so any change on disk results in a different key
+    st = os.stat(filePath)
+    parts = [os.path.abspath(filePath), st.st_mtime_ns, st.st_size, fingerprint(filePath)]
+    parts.extend(options)
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def contentDigest(filePath):
+    # content digest independent of the file location, computed once per
+    # version of the file
+    key = fileKey(filePath)
+    with contentDigestsLock:
+        digest = contentDigests.get(key)
+    if digest is None:
+        digest = contentHash(filePath)
+        with contentDigestsLock:
+            if len(contentDigests) >= MAX_CONTENT_DIGESTS:
+                contentDigests.clear()
+            contentDigests[key] = digest
+    return digest
+
+
+class DiskCache:
+    # entries are shared by all processes using the directory: the index
+    # is changed under a lock file and entries used by a run are pinned
+    # with files naming the run and its process until the run releases
+    # them, so no other process evicts them meanwhile
+
+    INDEX = "index.json"
+    LOCK = "index.lock"
+    PINS = "pins"
+
+    def __init__(self, directory, maxBytes):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reservations = {}
+        self.lock = threading.RLock()
+
+        os.makedirs(os.path.join(self.directory, self.PINS), exist_ok=True)
+        self.removeAbandoned()
+
+    @contextlib.contextmanager
+    def locked(self):
+        with self.lock, resourcePlanner.QueueLock(os.path.join(self.directory, self.LOCK)):
+            yield
+
+    def entryPath(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key, owner):
+        # returns entry path pinned for the owner run or None
+        with self.locked():
+            index = self.readIndex()
+            entry = index["entries"].get(key)
+            if entry is not None:
+                files = [os.path.join(self.entryPath(key), f) for f in entry["files"]]
+                if all(os.path.isfile(f) for f in files):
+                    entry["lastAccess"] = time.time()
+                    self.hits += 1
+                    index["stats"]["hits"] += 1
+                    self.pin(key, owner)
+                    self.writeIndex(index)
+                    return self.entryPath(key)
+
+                # some files were removed behind our back, entry is unusable
+                del index["entries"][key]
+                shutil.rmtree(self.entryPath(key), ignore_errors=True)
+
+            self.misses += 1
+            index["stats"]["misses"] += 1
+            self.writeIndex(index)
+            return None
+
+    def reserve(self, key, owner):
+        # returns a private directory to write the entry into; other runs
+        # storing the same key at the same time get their own directory
+        # and entries become visible only when put() moves them in place;
+        # the entry stays pinned for the owner run
+        with self.lock:
+            path = os.path.join(self.directory, "{}{}{}-{}-{}".format(
+                key, PENDING_MARKER, os.getpid(), threading.get_ident(), uuid.uuid4().hex))
+            os.makedirs(path)
+            self.reservations[(threading.get_ident(), key)] = path
+            self.pin(key, owner)
+            return path
+
+    def put(self, key, meta=None):
+        # moves the reserved directory in place, returns the entry path or
+        # None when nothing was written
+        with self.lock:
+            pending = self.reservations.pop((threading.get_ident(), key), None)
+        if pending is None:
+            return None
+
+        files = sorted(f for f in os.listdir(pending) if os.path.isfile(os.path.join(pending, f)))
+        if len(files) == 0:
+            shutil.rmtree(pending, ignore_errors=True)
+            return None
+
+        with self.locked():
+            path = self.entryPath(key)
+            try:
+                os.rename(pending, path)
+            except OSError:
+                if not os.path.isdir(path):
+                    shutil.rmtree(pending, ignore_errors=True)
+                    raise
+                # another run stored the same key first, its entry has
+                # the same content and was moved in place complete
+                shutil.rmtree(pending, ignore_errors=True)
+                files = sorted(f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f)))
+
+            index = self.readIndex()
+            index["entries"][key] = {"size": sum(os.path.getsize(os.path.join(path, f)) for f in files),
+                                     "files": files,
+                                     "lastAccess": time.time(),
+                                     "meta": meta or {}}
+            evicted = self.evict(index)
+            self.writeIndex(index)
+
+        # evicted entries were moved aside, removing them may take a while
+        for trash in evicted:
+            shutil.rmtree(trash, ignore_errors=True)
+        return path
+
+    def discard(self, key):
+        # drops what this thread reserved for the key, entries stored by
+        # others stay untouched
+        with self.lock:
+            pending = self.reservations.pop((threading.get_ident(), key), None)
+        if pending is not None:
+            shutil.rmtree(pending, ignore_errors=True)
+
+    def removeAbandoned(self):
+        # private directories left behind by runs which crashed
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            if PENDING_MARKER in entry.name and entry.is_dir():
+                try:
+                    if now - entry.stat().st_mtime > PENDING_MAX_AGE:
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                except OSError:
+                    pass
+
+    def pinFile(self, key, owner):
+        return os.path.join(self.directory, self.PINS, "{}-{}".format(key, owner))
+
+    def pin(self, key, owner):
+        with open(self.pinFile(key, owner), "w") as f:
+            json.dump({"pid": os.getpid(), "created": resourcePlanner.processStartTime(os.getpid())}, f)
+
+    def release(self, owner):
+        # unpins every entry the owner run used
+        suffix = "-{}".format(owner)
+        for entry in os.scandir(os.path.join(self.directory, self.PINS)):
+            if entry.name.endswith(suffix):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def pinnedKeys(self):
+        # keys pinned by runs of live processes, pins of processes which
+        # died are removed
+        keys = set()
+        for entry in os.scandir(os.path.join(self.directory, self.PINS)):
+            try:
+                with open(entry.path) as f:
+                    owner = json.load(f)
+            except (OSError, ValueError):
+                # pin being written
+                keys.add(entry.name.rsplit("-", 1)[0])
+                continue
+
+            if resourcePlanner.processMatches(owner.get("pid", 0), owner.get("created")):
+                keys.add(entry.name.rsplit("-", 1)[0])
+            else:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+        return keys
+
+    def totalSize(self):
+        with self.lock:
+            return sum(e["size"] for e in self.readIndex()["entries"].values())
+
+    def statistics(self):
+        with self.lock:
+            index = self.readIndex()
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions,
+                    "totalHits": index["stats"]["hits"],
+                    "totalMisses": index["stats"]["misses"],
+                    "entries": len(index["entries"]),
+                    "size": sum(e["size"] for e in index["entries"].values())}
+
+    def evict(self, index):
+        # drops least recently used entries over the budget from the
+        # index, must be called holding the lock; returns directories the
+        # entries were moved to for removal
+        if self.maxBytes <= 0:
+            return []
+
+        entries = index["entries"]
+        total = sum(e["size"] for e in entries.values())
+        if total <= self.maxBytes:
+            return []
+
+        pinned = self.pinnedKeys()
+        evicted = []
+        for key in sorted(entries, key=lambda k: entries[k]["lastAccess"]):
+            if total <= self.maxBytes:
+                break
+            if key in pinned:
+                continue
+
+            total -= entries[key]["size"]
+            del entries[key]
+            trash = os.path.join(self.directory, "{}{}evicted-{}".format(key, PENDING_MARKER, uuid.uuid4().hex))
+            try:
+                os.rename(self.entryPath(key), trash)
+                evicted.append(trash)
+            except OSError:
+                pass
+            self.evictions += 1
+            index["stats"]["evictions"] += 1
+        return evicted
+
+    def readIndex(self):
+        try:
+            with open(os.path.join(self.directory, self.INDEX)) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+
+        index.setdefault("entries", {})
+        index.setdefault("stats", {})
+        for k in ("hits", "misses", "evictions"):
+            index["stats"].setdefault(k, 0)
+        return index
+
+    def writeIndex(self, index):
+        # write to a temporary file first, so concurrent readers never see
+        # a partially written index
+        fileName = os.path.join(self.directory, self.INDEX)
+        tmpName = "{}.{}.{}".format(fileName, os.getpid(), threading.get_ident())
+        with open(tmpName, "w") as f:
+            json.dump(index, f)
+        os.replace(tmpName, fileName)
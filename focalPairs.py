@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    focalPairs.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+
+
+def formatId(value):
+    return "{:d}".format(int(value)) if float(value).is_integer() else "{!r}".format(float(value))
+
+
+def allPairs(ids):
+    ids = sorted(ids)
+    return [(a, b) for i, a in enumerate(ids) for b in ids[i + 1:]]
+
+
+def readIncludedPairs(fileName, ids):
+    # pairs of the given focal nodes selected by a Circuitscape
+    # include/exclude file, either a pair list or a matrix
+    with open(fileName) as f:
+        first = f.readline().split()
+    if first and first[0].lower() == "mode":
+        return readPairList(fileName, ids)
+    return readPairMatrix(fileName, ids)
+
+
+def readPairList(fileName, ids):
+    # "mode include" or "mode exclude" line followed by one pair per line,
+    # excluded pairs are removed from all pairs of the focal nodes
+    listed = set()
+    with open(fileName) as f:
+        mode = f.readline().split()[1].lower()
+        for line in f:
+            values = line.split()
+            if not values:
+                continue
+            a, b = float(values[0]), float(values[1])
+            if a != b:
+                listed.add((min(a, b), max(a, b)))
+
+    if mode == "exclude":
+        return [p for p in allPairs(ids) if p not in listed]
+    known = set(ids)
+    return sorted(p for p in listed if p[0] in known and p[1] in known)
+
+
+def readPairMatrix(fileName, ids):
+    # "min" and "max" lines followed by a matrix whose first row and
+    # column hold focal node IDs, pairs with values within [min, max]
+    # are included
+    limits = {}
+    with open(fileName) as f:
+        for i in range(2):
+            key, value = f.readline().split()
+            limits[key.lower()] = float(value)
+
+    matrix = numpy.loadtxt(fileName, skiprows=2, ndmin=2)
+    columns = matrix[0, 1:]
+    values = matrix[1:, 1:]
+    rows = matrix[1:, 0]
+
+    known = set(ids)
+    included = (values >= limits.get("min", 1)) & (values <= limits.get("max", 1))
+    pairs = set()
+    for i, j in zip(*numpy.nonzero(included)):
+        a, b = rows[i], columns[j]
+        if a != b and a in known and b in known:
+            pairs.add((min(a, b), max(a, b)))
+    return sorted(pairs)
+
+
+def writeIncludedPairs(fileName, ids, pairs, symmetric=True):
+    # with symmetric=False pair (a, b) only sets row a, which in one-to-all
+    # and all-to-one modes limits solves to the nodes having non-empty rows
+    ids = sorted(ids)
+    index = {v: i for i, v in enumerate(ids)}
+    partners = [[] for i in ids]
+    for a, b in pairs:
+        partners[index[a]].append(index[b])
+        if symmetric:
+            partners[index[b]].append(index[a])
+
+    # written row by row, full matrix may not fit in memory for
+    # large number of focal nodes
+    with open(fileName, "w") as f:
+        f.write("min 1\n")
+        f.write("max 1\n")
+        f.write("0 {}\n".format(" ".join(formatId(v) for v in ids)))
+        for i, v in enumerate(ids):
+            row = numpy.zeros(len(ids), dtype=numpy.int8)
+            row[partners[i]] = 1
+            f.write("{} {}\n".format(formatId(v), " ".join(map(str, row.tolist()))))
+
+
+def splitPairs(pairs, count):
+    # round-robin keeps shards balanced even when pair costs correlate
+    # with position in the list
+    shards = [pairs[i::count] for i in range(count)]
+    return [s for s in shards if s]
+
+
+def sourcePairs(ids, sources):
+    # every other focal node stays a partner of each source node, so the
+    # nodes grounded (or injecting current) in each solve do not change
+    return [(a, b) for a in sources for b in ids if a != b]
+
+
+def splitNodes(ids, count):
+    shards = [list(ids[i::count]) for i in range(count)]
+    return [s for s in shards if s]
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    habitatCircuit.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import time
+
+import numpy
+
+try:
+    from scipy import sparse
+    from scipy.sparse import csgraph
+    from scipy.sparse import linalg
+except ImportError:
+    sparse = None
+
+from processing_circuitscape import focalPairs
+
+# graph Laplacian of raster habitat and its solves on plain arrays,
+# rasters are read and written by networkGraph and sparseSolver
+
+SQRT2 = numpy.sqrt(2.0)
+
+# row and column offsets of the neighbours each cell is connected to,
+# every pair of cells is visited only once
+ORTHOGONAL_OFFSETS = ((0, 1), (1, 0))
+DIAGONAL_OFFSETS = ((1, 1), (1, -1))
+
+# value written for pairs which were not computed or are not connected
+NOT_CONNECTED = -1
+
+
+def isAvailable():
+    return sparse is not None
+
+
+class Graph:
+
+    def __init__(self, nodes, first, second, weights, focalIds):
+        # nodes holds node ID of every cell, 0 for cells outside the graph
+        self.nodes = nodes
+        self.first = first
+        self.second = second
+        self.weights = weights
+        self.focalIds = focalIds
+
+    def nodeCount(self):
+        return int(numpy.unique(self.nodes[self.nodes > 0]).size)
+
+
+def nodeIds(conductances, focal):
+    # every focal region collapses into a single node numbered with its
+    # focal ID, remaining habitat cells are numbered after the largest
+    # focal ID in row-major order; focal holds integer IDs, 0 elsewhere
+    habitat = conductances > 0
+    nodes = numpy.zeros(conductances.shape, dtype=numpy.int64)
+
+    isFocal = (focal > 0) & habitat
+    focalIds = numpy.unique(focal[isFocal]).astype(numpy.int64)
+    maxFocal = int(focalIds[-1]) if focalIds.size else 0
+
+    nodes[isFocal] = focal[isFocal].astype(numpy.int64)
+    plain = habitat & ~isFocal
+    nodes[plain] = maxFocal + 1 + numpy.flatnonzero(plain)
+    return nodes, focalIds, maxFocal
+
+
+def neighbourPairs(array, rowOffset, colOffset):
+    # views of the array and of its neighbours at the given offset,
+    # aligned so that equal positions hold the two ends of an edge
+    rows, cols = array.shape
+    if colOffset >= 0:
+        here = array[:rows - rowOffset, :cols - colOffset]
+        there = array[rowOffset:, colOffset:]
+    else:
+        here = array[:rows - rowOffset, -colOffset:]
+        there = array[rowOffset:, :cols + colOffset]
+    return here, there
+
+
+def buildGraph(conductances, focal, fourNeighbours, averageResistances):
+    # weighted edge list of the habitat cells following the connection
+    # scheme used by the solver for rasters: conductances of neighbours
+    # are averaged arithmetically, or harmonically when resistances are
+    # averaged, and diagonal connections are longer by sqrt(2)
+    nodes, focalIds, maxFocal = nodeIds(conductances, focal)
+
+    offsets = ORTHOGONAL_OFFSETS if fourNeighbours else ORTHOGONAL_OFFSETS + DIAGONAL_OFFSETS
+    first = []
+    second = []
+    weights = []
+    for rowOffset, colOffset in offsets:
+        nodesHere, nodesThere = neighbourPairs(nodes, rowOffset, colOffset)
+        connected = (nodesHere > 0) & (nodesThere > 0) & (nodesHere != nodesThere)
+
+        here, there = neighbourPairs(conductances, rowOffset, colOffset)
+        here = here[connected]
+        there = there[connected]
+        if averageResistances:
+            weight = 2.0 / (1.0 / here + 1.0 / there)
+        else:
+            weight = (here + there) / 2.0
+        if rowOffset and colOffset:
+            weight /= SQRT2
+
+        first.append(nodesHere[connected])
+        second.append(nodesThere[connected])
+        weights.append(weight)
+
+    first = numpy.concatenate(first)
+    second = numpy.concatenate(second)
+    weights = numpy.concatenate(weights)
+
+    # only edges touching a collapsed focal region can repeat, parallel
+    # connections between the same nodes add up
+    repeated = (first <= maxFocal) | (second <= maxFocal)
+    if repeated.any():
+        low = numpy.minimum(first[repeated], second[repeated])
+        high = numpy.maximum(first[repeated], second[repeated])
+        pairs, inverse = numpy.unique(numpy.column_stack((low, high)), axis=0, return_inverse=True)
+        summed = numpy.bincount(inverse.ravel(), weights=weights[repeated], minlength=len(pairs))
+
+        first = numpy.concatenate((first[~repeated], pairs[:, 0]))
+        second = numpy.concatenate((second[~repeated], pairs[:, 1]))
+        weights = numpy.concatenate((weights[~repeated], summed))
+
+    return Graph(nodes, first, second, weights, focalIds)
+
+
+class Circuit:
+    # graph Laplacian of the habitat cells with focal regions collapsed
+    # into single nodes
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.nodeIds = numpy.unique(graph.nodes[graph.nodes > 0])
+        self.size = len(self.nodeIds)
+        self.first = numpy.searchsorted(self.nodeIds, graph.first)
+        self.second = numpy.searchsorted(self.nodeIds, graph.second)
+        self.weights = graph.weights
+
+        adjacency = sparse.coo_matrix((self.weights, (self.first, self.second)), shape=(self.size, self.size))
+        adjacency = (adjacency + adjacency.T).tocsr()
+        degrees = numpy.asarray(adjacency.sum(axis=1)).ravel()
+        self.laplacian = (sparse.diags(degrees) - adjacency).tocsc()
+        self.componentCount, self.components = csgraph.connected_components(adjacency, directed=False)
+
+    def index(self, focalId):
+        # node index of the focal ID or None when it lies off habitat
+        i = int(numpy.searchsorted(self.nodeIds, focalId))
+        if i < self.size and self.nodeIds[i] == focalId:
+            return i
+        return None
+
+    def factorize(self, unknown):
+        return linalg.splu(self.laplacian[unknown][:, unknown].tocsc())
+
+    def nodeCurrents(self, voltages):
+        # half of all current passing through each node, including
+        # currents injected at sources and drained at grounds
+        flows = numpy.abs(self.weights * (voltages[self.first] - voltages[self.second]))
+        passing = numpy.bincount(self.first, flows, self.size) + numpy.bincount(self.second, flows, self.size)
+        return 0.5 * (passing + numpy.abs(self.laplacian @ voltages))
+
+
+def solvePairwise(circuit, pairs, writer, feedback, log, phases):
+    # each component is grounded at its first focal node, so a single
+    # factorisation serves every pair: the solution for a unit current
+    # from i to j is shifted to put j at zero volts
+    started = time.perf_counter()
+    focal = {}
+    for pair in pairs:
+        for focalId in pair:
+            if focalId not in focal:
+                focal[focalId] = circuit.index(focalId)
+
+    grounds = {}
+    for focalId in sorted(focal):
+        i = focal[focalId]
+        if i is not None:
+            grounds.setdefault(circuit.components[i], i)
+
+    # components without focal nodes float and are left out
+    unknown = numpy.isin(circuit.components, list(grounds.keys()))
+    unknown[list(grounds.values())] = False
+    factor = circuit.factorize(unknown) if unknown.any() else None
+    phases["factorisation"] = time.perf_counter() - started
+    log.write("Factorised {} unknowns".format(int(unknown.sum())))
+
+    started = time.perf_counter()
+    resistances = {}
+    for k, (a, b) in enumerate(pairs):
+        if feedback.isCanceled():
+            return None
+        feedback.setProgress(100.0 * k / max(1, len(pairs)))
+
+        i, j = focal[a], focal[b]
+        if i is None or j is None or circuit.components[i] != circuit.components[j]:
+            resistances[(a, b)] = NOT_CONNECTED
+            continue
+
+        currents = numpy.zeros(circuit.size)
+        currents[i] = 1.0
+        currents[j] = -1.0
+        voltages = numpy.zeros(circuit.size)
+        voltages[unknown] = factor.solve(currents[unknown])
+        voltages[circuit.components == circuit.components[j]] -= voltages[j]
+        resistances[(a, b)] = float(voltages[i])
+
+        writer.addSolve("{}_{}".format(focalPairs.formatId(a), focalPairs.formatId(b)), voltages)
+        log.write("Solved pair {}: {} of {}".format(k + 1, focalPairs.formatId(a), focalPairs.formatId(b)))
+
+    phases["solves"] = time.perf_counter() - started
+    return resistances
+
+
+def solveOneToAll(circuit, ids, writer, feedback, log, phases):
+    # all focal nodes except the source are grounded: with every focal
+    # node eliminated a single factorisation of the remaining nodes
+    # serves every source through its Schur complement
+    started = time.perf_counter()
+    focal = {focalId: circuit.index(focalId) for focalId in ids}
+    present = [i for i in focal.values() if i is not None]
+    counts = numpy.bincount(circuit.components[present], minlength=circuit.componentCount)
+
+    unknown = counts[circuit.components] > 0
+    unknown[present] = False
+    factor = circuit.factorize(unknown) if unknown.any() else None
+    coupling = circuit.laplacian[unknown]
+    phases["factorisation"] = time.perf_counter() - started
+    log.write("Factorised {} unknowns".format(int(unknown.sum())))
+
+    started = time.perf_counter()
+    resistances = {}
+    for k, focalId in enumerate(ids):
+        if feedback.isCanceled():
+            return None
+        feedback.setProgress(100.0 * k / max(1, len(ids)))
+
+        i = focal[focalId]
+        if i is None or counts[circuit.components[i]] < 2:
+            resistances[focalId] = NOT_CONNECTED
+            continue
+
+        column = coupling[:, i].toarray().ravel()
+        response = factor.solve(column) if factor is not None else numpy.zeros(0)
+        # Laplacian is symmetric, the coupling column is also the row
+        schur = circuit.laplacian[i, i] - column @ response
+
+        voltages = numpy.zeros(circuit.size)
+        voltages[i] = 1.0 / float(schur)
+        voltages[unknown] = -response * voltages[i]
+        resistances[focalId] = float(voltages[i])
+
+        writer.addSolve(focalPairs.formatId(focalId), voltages)
+        log.write("Solved focal node {} ({} of {})".format(focalPairs.formatId(focalId), k + 1, len(ids)))
+
+    phases["solves"] = time.perf_counter() - started
+    return resistances
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    inputValidation.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+from osgeo import gdal
+
+from qgis.core import QgsProcessingException
+
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+ROLE_RESISTANCE = "resistance"
+ROLE_CONDUCTANCE = "conductance"
+ROLE_FOCAL = "focal"
+ROLE_SOURCE = "source"
+ROLE_GROUND = "ground"
+ROLE_REGION = "region"
+ROLE_OTHER = "other"
+
+# grids are considered aligned when origins differ by less than this
+# share of the cell size
+ALIGNMENT_TOLERANCE = 0.01
+
+
+class ValueStatistics:
+
+    def __init__(self):
+        self.valid = 0
+        self.negative = 0
+        self.zero = 0
+        self.fractional = 0
+        self.ids = set()
+
+
+def alignmentProblems(layer, reference):
+    # returns list of differences between grids of two raster layers
+    problems = []
+    if layer.crs() != reference.crs():
+        problems.append("CRS {} differs from {}".format(layer.crs().authid(), reference.crs().authid()))
+
+    cellX = reference.rasterUnitsPerPixelX()
+    cellY = reference.rasterUnitsPerPixelY()
+    if abs(layer.rasterUnitsPerPixelX() - cellX) > cellX * 1e-6 or \
+            abs(layer.rasterUnitsPerPixelY() - cellY) > cellY * 1e-6:
+        problems.append("cell size {:g}x{:g} differs from {:g}x{:g}".format(
+            layer.rasterUnitsPerPixelX(), layer.rasterUnitsPerPixelY(), cellX, cellY))
+
+    extent = layer.extent()
+    target = reference.extent()
+    if abs(extent.xMinimum() - target.xMinimum()) > cellX * ALIGNMENT_TOLERANCE or \
+            abs(extent.yMaximum() - target.yMaximum()) > cellY * ALIGNMENT_TOLERANCE or \
+            layer.width() != reference.width() or layer.height() != reference.height():
+        problems.append("extent {} ({}x{} cells) differs from {} ({}x{} cells)".format(
+            extent.toString(3), layer.width(), layer.height(),
+            target.toString(3), reference.width(), reference.height()))
+
+    return problems
+
+
+def warpedView(source, reference, destination):
+    # virtual raster resampling source on the reference grid, cells are
+    # computed when read, nothing is materialized on disk
+    extent = reference.extent()
+    options = gdal.WarpOptions(format="VRT",
+                               outputBounds=(extent.xMinimum(), extent.yMinimum(),
+                                             extent.xMaximum(), extent.yMaximum()),
+                               width=reference.width(),
+                               height=reference.height(),
+                               dstSRS=reference.crs().toWkt(),
+                               resampleAlg="near")
+    ds = gdal.Warp(destination, source, options=options)
+    if ds is None:
+        raise QgsProcessingException("Can not create aligned view of {}".format(source))
+    ds = None
+    return destination
+
+
+def collectStatistics(fileName, role):
+    ds = rasterExporter.openDataset(fileName)
+    band = ds.GetRasterBand(1)
+    noData = band.GetNoDataValue()
+
+    stats = ValueStatistics()
+    for row, data in rasterTools.iterBlocks(ds):
+        values = data[rasterTools.validMask(data, noData)]
+        stats.valid += values.size
+        stats.negative += int(numpy.count_nonzero(values < 0))
+        stats.zero += int(numpy.count_nonzero(values == 0))
+        if role in (ROLE_FOCAL, ROLE_REGION):
+            nonZero = values[values != 0]
+            stats.fractional += int(numpy.count_nonzero(nonZero != numpy.floor(nonZero)))
+            if role == ROLE_FOCAL and len(stats.ids) <= 2:
+                stats.ids.update(numpy.unique(nonZero[nonZero > 0]).tolist())
+    return stats
+
+
+def validateValues(fileName, role, name):
+    # returns list of error messages for the values of a single input
+    stats = collectStatistics(fileName, role)
+    errors = []
+    if stats.valid == 0:
+        errors.append("{} has no valid cells".format(name))
+        return errors
+
+    if role == ROLE_RESISTANCE:
+        if stats.negative:
+            errors.append("{} has {} negative resistance value(s)".format(name, stats.negative))
+        if stats.zero:
+            errors.append("{} has {} zero resistance value(s), use NODATA for barriers".format(name, stats.zero))
+    elif role in (ROLE_CONDUCTANCE, ROLE_SOURCE, ROLE_GROUND):
+        if stats.negative:
+            errors.append("{} has {} negative value(s)".format(name, stats.negative))
+    elif role in (ROLE_FOCAL, ROLE_REGION):
+        if stats.fractional:
+            errors.append("{} has {} non-integer ID(s)".format(name, stats.fractional))
+        if role == ROLE_FOCAL and len(stats.ids) < 2:
+            errors.append("{} must contain at least two focal nodes with positive IDs".format(name))
+    return errors
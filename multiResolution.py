@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    multiResolution.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import configparser
+
+import numpy
+
+from qgis.core import (QgsProcessing,
+                       QgsProcessingParameterRasterLayer,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterString,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterFeatureSource,
+                       QgsProcessingParameterField,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingOutputFile,
+                       QgsProcessingException
+                      )
+
+from processing_circuitscape.circuitscapeAlgorithm import CircuitscapeAlgorithm
+from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import corridors
+from processing_circuitscape import inputValidation
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+from processing_circuitscape import vectorRasterizer
+from processing_circuitscape import focalPairs
+
+
+class MultiResolution(CircuitscapeAlgorithm):
+
+    RESISTANCE_MAP = "RESISTANCE_MAP"
+    IS_CONDUCTANCES = "IS_CONDUCTANCES"
+    FOCAL_NODE = "FOCAL_NODE"
+    FOCAL_NODE_FEATURES = "FOCAL_NODE_FEATURES"
+    FOCAL_NODE_FIELD = "FOCAL_NODE_FIELD"
+    FACTOR = "FACTOR"
+    PERCENTILE = "PERCENTILE"
+    DILATION = "DILATION"
+    WRITE_CURRENT_MAP = "WRITE_CURRENT_MAP"
+    WRITE_VOLTAGE_MAP = "WRITE_VOLTAGE_MAP"
+    MASK = "MASK"
+    SOLVER = "SOLVER"
+    PARALLEL_MODE = "PARALLEL_MODE"
+    MAX_PARALLEL = "MAX_PARALLEL"
+    BASENAME = "BASENAME"
+    DIRECTORY = "DIRECTORY"
+    CORRIDOR_MASK = "CORRIDOR_MASK"
+    LOG_FILE = "LOG_FILE"
+
+    ROI_PARAMETERS = (FOCAL_NODE, MASK)
+    INPUT_ROLES = {FOCAL_NODE: inputValidation.ROLE_FOCAL}
+    VECTOR_INPUTS = {FOCAL_NODE: (FOCAL_NODE_FEATURES, FOCAL_NODE_FIELD, vectorRasterizer.BURN_IDS)}
+
+    def name(self):
+        return "multiresolution"
+
+    def displayName(self):
+        return self.tr("Multi-resolution pairwise")
+
+    def group(self):
+        return self.tr("Circuitscape")
+
+    def groupId(self):
+        return "circuitscape"
+
+    def __init__(self):
+        super().__init__()
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterRasterLayer(self.RESISTANCE_MAP,
+                                                            self.tr("Resistance map")))
+        self.addParameter(QgsProcessingParameterBoolean(self.IS_CONDUCTANCES,
+                                                        self.tr("Data represent conductances instead of resistances"),
+                                                        False))
+        self.addParameter(QgsProcessingParameterRasterLayer(self.FOCAL_NODE,
+                                                            self.tr("Focal node location"),
+                                                            optional=True))
+        self.addParameter(QgsProcessingParameterFeatureSource(self.FOCAL_NODE_FEATURES,
+                                                              self.tr("Focal node location (vector)"),
+                                                              [QgsProcessing.TypeVectorPoint, QgsProcessing.TypeVectorPolygon],
+                                                              optional=True))
+        self.addParameter(QgsProcessingParameterField(self.FOCAL_NODE_FIELD,
+                                                      self.tr("Focal node ID field (default: feature order)"),
+                                                      parentLayerParameterName=self.FOCAL_NODE_FEATURES,
+                                                      type=QgsProcessingParameterField.Numeric,
+                                                      optional=True))
+        self.addParameter(QgsProcessingParameterNumber(self.FACTOR,
+                                                       self.tr("Aggregation factor of the coarse solve (cells)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       8,
+                                                       minValue=2))
+        self.addParameter(QgsProcessingParameterNumber(self.PERCENTILE,
+                                                       self.tr("Keep coarse cells with current above percentile"),
+                                                       QgsProcessingParameterNumber.Double,
+                                                       80.0,
+                                                       minValue=0.0,
+                                                       maxValue=100.0))
+        self.addParameter(QgsProcessingParameterNumber(self.DILATION,
+                                                       self.tr("Widen corridors by (cells, -1 = aggregation factor)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       -1,
+                                                       minValue=-1))
+        self.addParameter(QgsProcessingParameterBoolean(self.WRITE_CURRENT_MAP,
+                                                        self.tr("Create current map"),
+                                                        True))
+        self.addParameter(QgsProcessingParameterBoolean(self.WRITE_VOLTAGE_MAP,
+                                                        self.tr("Create voltage map"),
+                                                        False))
+        self.addParameter(QgsProcessingParameterRasterLayer(self.MASK,
+                                                            self.tr("Mask raster"),
+                                                            optional=True))
+        self.addParameter(QgsProcessingParameterEnum(self.SOLVER,
+                                                     self.tr("Solver"),
+                                                     options=self.solvers(),
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterEnum(self.PARALLEL_MODE,
+                                                     self.tr("Parallel execution"),
+                                                     options=self.parallelModes(),
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterNumber(self.MAX_PARALLEL,
+                                                       self.tr("Maximum number of parallel workers (0 = use provider setting)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       0,
+                                                       minValue=0))
+        self.addParameter(QgsProcessingParameterString(self.BASENAME,
+                                                       self.tr("Output basename"),
+                                                       "csoutput"))
+
+        self.addParameter(QgsProcessingParameterFolderDestination(self.DIRECTORY,
+                                                                  self.tr("Output directory")))
+
+        self.addOutput(QgsProcessingOutputFile(self.CORRIDOR_MASK, self.tr("Corridor mask")))
+        self.addOutput(QgsProcessingOutputFile(self.LOG_FILE, self.tr("Solver log")))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        useConductance = str(not self.parameterAsBool(parameters, self.IS_CONDUCTANCES, context))
+        if self.parameterAsRasterLayer(parameters, self.FOCAL_NODE, context) is None and \
+                self.parameterAsSource(parameters, self.FOCAL_NODE_FEATURES, context) is None:
+            raise QgsProcessingException(self.tr("Focal nodes are required, either as a raster or as a vector layer"))
+        factor = self.parameterAsInt(parameters, self.FACTOR, context)
+        percentile = self.parameterAsDouble(parameters, self.PERCENTILE, context)
+        dilation = self.parameterAsInt(parameters, self.DILATION, context)
+        if dilation < 0:
+            dilation = factor
+        writeCurrent = str(self.parameterAsBool(parameters, self.WRITE_CURRENT_MAP, context))
+        writeVoltage = str(self.parameterAsBool(parameters, self.WRITE_VOLTAGE_MAP, context))
+
+        baseName = self.parameterAsString(parameters, self.BASENAME, context)
+        directory = self.parameterAsString(parameters, self.DIRECTORY, context)
+        basePath = os.path.join(directory, baseName)
+
+        with self.createWorkspace(feedback) as workspace:
+            if not self.prepareInputs(parameters, context, feedback):
+                return {}
+
+            resistance = self.exportedParameter(parameters, self.RESISTANCE_MAP, context)
+            focal = self.exportedInput(parameters, self.FOCAL_NODE, context)
+            mask = self.exportedParameter(parameters, self.MASK, context)
+
+            feedback.setProgressText(self.tr("Solving coarse grid"))
+            coarseRun = self.solveCoarse(resistance, focal, mask, factor, useConductance, feedback)
+            if coarseRun is None:
+                return {}
+            coarseCurrents, coarseTimings = coarseRun
+
+            feedback.setProgressText(self.tr("Building corridor mask"))
+            selected, threshold = corridors.corridorSelection(coarseCurrents, percentile)
+            if threshold is None:
+                raise QgsProcessingException(self.tr("No current flows on the coarse grid, focal nodes are not "
+                                                     "connected at {}x aggregation").format(factor))
+
+            ext = ".asc" if rasterTools.rasterExtension(resistance) == ".asc" else ".tif"
+            maskFile = "{}_corridors{}".format(basePath, ext)
+            template = rasterTools.openRaster(resistance)
+            corridorCells = corridors.writeCorridorMask(maskFile, template, selected, factor, dilation, focal, mask)
+
+            habitat = rasterTools.countValid(resistance)
+            feedback.pushInfo(self.tr("Corridors above {:g} A cover {} cell(s), {:.1f}% of {} habitat cell(s)").format(
+                threshold, corridorCells, 100.0 * corridorCells / max(1, habitat), habitat))
+
+            iniPath = circuitscapeUtils.writeConfiguration(workspace.path)
+            cfg = configparser.ConfigParser()
+            cfg.read(iniPath)
+
+            cfg["Circuitscape mode"]["scenario"] = "pairwise"
+
+            section = cfg["Habitat raster or graph"]
+            section["habitat_map_is_resistances"] = useConductance
+            section["habitat_file"] = resistance
+
+            section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+            section["point_file"] = focal
+
+            section = cfg["Mask file"]
+            section["mask_file"] = maskFile
+            section["use_mask"] = "True"
+
+            cfg["Output options"]["write_cur_maps"] = writeCurrent
+            cfg["Output options"]["write_volt_maps"] = writeVoltage
+            cfg["Output options"]["output_file"] = basePath
+
+            feedback.setProgressText(self.tr("Solving corridors at full resolution"))
+            focalCount = len(rasterTools.uniqueValues(focal))
+            self.configureSolver(cfg, parameters, context, feedback, focalCount)
+            self.configureParallel(cfg, parameters, context, feedback)
+            estimate = self.planRun(cfg, feedback, focalCount * (focalCount - 1) // 2, corridorCells)
+
+            # write configuration back to the file
+            with open(iniPath, "w") as f:
+                cfg.write(f)
+
+            def run():
+                return circuitscapeUtils.runSolver(iniPath, feedback)
+
+            results = self.runCached(cfg, basePath, feedback, lambda: self.runQueued(estimate, feedback, run))
+            if results is None:
+                return {}
+
+            results[circuitscapeUtils.TIMINGS] = {"coarse": coarseTimings,
+                                                  "fine": results.get(circuitscapeUtils.TIMINGS)}
+            results[self.CORRIDOR_MASK] = maskFile
+            results[self.DIRECTORY] = directory
+            return results
+
+    def solveCoarse(self, resistance, focal, mask, factor, useConductance, feedback):
+        # pairwise solve on the aggregated grid writing only the
+        # cumulative current map; returns map and timings or None
+        runDirectory = self.workspace.subdirectory("coarse")
+        source, coarse = corridors.aggregateValues(resistance, factor)
+        geoTransform = corridors.coarseGeoTransform(source.GetGeoTransform(), factor)
+        height, width = coarse.shape
+        noData = rasterExporter.DEFAULT_NODATA
+
+        coarseFocal, lost = corridors.aggregateIds(focal, factor)
+        if lost:
+            feedback.reportError(self.tr("{} focal node(s) share coarse cells with other nodes and are not solved "
+                                         "on the coarse grid: {}").format(len(lost),
+                                                                         ", ".join(focalPairs.formatId(i) for i in lost)))
+        if numpy.count_nonzero(coarseFocal != noData) < 2:
+            raise QgsProcessingException(self.tr("Less than two focal nodes remain at {}x aggregation, "
+                                                 "use a smaller factor").format(factor))
+
+        feedback.pushInfo(self.tr("Aggregated {}x{} cells into {}x{} coarse grid").format(
+            source.RasterXSize, source.RasterYSize, width, height))
+
+        habitatFile = os.path.join(runDirectory, "resistance.asc")
+        focalFile = os.path.join(runDirectory, "focal.asc")
+        projection = source.GetProjection()
+        rasterTools.writeGrid(habitatFile, width, height, geoTransform, projection, [(0, coarse)], noData)
+        rasterTools.writeGrid(focalFile, width, height, geoTransform, projection, [(0, coarseFocal)], noData)
+
+        iniPath = circuitscapeUtils.writeConfiguration(runDirectory)
+        cfg = configparser.ConfigParser()
+        cfg.read(iniPath)
+
+        cfg["Circuitscape mode"]["scenario"] = "pairwise"
+        cfg["Habitat raster or graph"]["habitat_map_is_resistances"] = useConductance
+        cfg["Habitat raster or graph"]["habitat_file"] = habitatFile
+        cfg["Options for pairwise and one-to-all and all-to-one modes"]["point_file"] = focalFile
+
+        if mask is not None:
+            maskFile = os.path.join(runDirectory, "mask.asc")
+            present = corridors.aggregatePresence(mask, factor).astype(numpy.float64)
+            rasterTools.writeGrid(maskFile, width, height, geoTransform, projection, [(0, present)], noData)
+            cfg["Mask file"]["mask_file"] = maskFile
+            cfg["Mask file"]["use_mask"] = "True"
+
+        # only the cumulative current drives corridor selection
+        section = cfg["Output options"]
+        section["write_cur_maps"] = "True"
+        section["write_volt_maps"] = "False"
+        section["write_cum_cur_map_only"] = "True"
+        section["write_max_cur_maps"] = "False"
+        section["log_transform_maps"] = "False"
+        section["compress_grids"] = "False"
+        section["set_focal_node_currents_to_zero"] = "False"
+        outputBase = os.path.join(runDirectory, "coarse")
+        section["output_file"] = outputBase
+
+        with open(iniPath, "w") as f:
+            cfg.write(f)
+
+        results = circuitscapeUtils.runSolver(iniPath, feedback)
+        if results is None:
+            return None
+
+        currentMap = "{}_cum_curmap.asc".format(outputBase)
+        if not os.path.exists(currentMap):
+            raise QgsProcessingException(self.tr("Solver did not write current map for the coarse grid"))
+        return currentMap, results[circuitscapeUtils.TIMINGS]
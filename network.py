@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    network.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import configparser
+
+from qgis.core import (QgsProcessing,
+                       QgsProcessingParameterRasterLayer,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterString,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterFeatureSource,
+                       QgsProcessingParameterField,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingOutputFile,
+                       QgsProcessingException
+                      )
+from processing.core.ProcessingConfig import ProcessingConfig
+
+from processing_circuitscape.circuitscapeAlgorithm import CircuitscapeAlgorithm
+from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import inputValidation
+from processing_circuitscape import vectorRasterizer
+from processing_circuitscape import networkGraph
+
+
+class Network(CircuitscapeAlgorithm):
+
+    RESISTANCE_MAP = "RESISTANCE_MAP"
+    IS_CONDUCTANCES = "IS_CONDUCTANCES"
+    FOCAL_NODE = "FOCAL_NODE"
+    FOCAL_NODE_FEATURES = "FOCAL_NODE_FEATURES"
+    FOCAL_NODE_FIELD = "FOCAL_NODE_FIELD"
+    MODE = "MODE"
+    WRITE_CURRENT_MAP = "WRITE_CURRENT_MAP"
+    MASK = "MASK"
+    SOLVER = "SOLVER"
+    PARALLEL_MODE = "PARALLEL_MODE"
+    MAX_PARALLEL = "MAX_PARALLEL"
+    BASENAME = "BASENAME"
+    DIRECTORY = "DIRECTORY"
+    CURRENT_MAP = "CURRENT_MAP"
+    LOG_FILE = "LOG_FILE"
+
+    ROI_PARAMETERS = (FOCAL_NODE, MASK)
+    INPUT_ROLES = {FOCAL_NODE: inputValidation.ROLE_FOCAL}
+    VECTOR_INPUTS = {FOCAL_NODE: (FOCAL_NODE_FEATURES, FOCAL_NODE_FIELD, vectorRasterizer.BURN_IDS)}
+
+    def name(self):
+        return "network"
+
+    def displayName(self):
+        return self.tr("Network")
+
+    def group(self):
+        return self.tr("Circuitscape")
+
+    def groupId(self):
+        return "circuitscape"
+
+    def __init__(self):
+        super().__init__()
+
+    def initAlgorithm(self, config=None):
+        self.modes = ((self.tr("Pairwise"), "pairwise"),
+                      (self.tr("One-to-all"), "one-to-all"),
+                      (self.tr("All-to-one"), "all-to-one"))
+
+        self.addParameter(QgsProcessingParameterRasterLayer(self.RESISTANCE_MAP,
+                                                            self.tr("Resistance map")))
+        self.addParameter(QgsProcessingParameterBoolean(self.IS_CONDUCTANCES,
+                                                        self.tr("Data represent conductances instead of resistances"),
+                                                        False))
+        self.addParameter(QgsProcessingParameterRasterLayer(self.FOCAL_NODE,
+                                                            self.tr("Focal node location"),
+                                                            optional=True))
+        self.addParameter(QgsProcessingParameterFeatureSource(self.FOCAL_NODE_FEATURES,
+                                                              self.tr("Focal node location (vector)"),
+                                                              [QgsProcessing.TypeVectorPoint, QgsProcessing.TypeVectorPolygon],
+                                                              optional=True))
+        self.addParameter(QgsProcessingParameterField(self.FOCAL_NODE_FIELD,
+                                                      self.tr("Focal node ID field (default: feature order)"),
+                                                      parentLayerParameterName=self.FOCAL_NODE_FEATURES,
+                                                      type=QgsProcessingParameterField.Numeric,
+                                                      optional=True))
+        self.addParameter(QgsProcessingParameterEnum(self.MODE,
+                                                     self.tr("Mode"),
+                                                     options=[i[0] for i in self.modes],
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterBoolean(self.WRITE_CURRENT_MAP,
+                                                        self.tr("Create current map"),
+                                                        True))
+        self.addParameter(QgsProcessingParameterRasterLayer(self.MASK,
+                                                            self.tr("Mask raster"),
+                                                            optional=True))
+        self.addParameter(QgsProcessingParameterEnum(self.SOLVER,
+                                                     self.tr("Solver"),
+                                                     options=self.solvers(),
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterEnum(self.PARALLEL_MODE,
+                                                     self.tr("Parallel execution"),
+                                                     options=self.parallelModes(),
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterNumber(self.MAX_PARALLEL,
+                                                       self.tr("Maximum number of parallel workers (0 = use provider setting)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       0,
+                                                       minValue=0))
+        self.addParameter(QgsProcessingParameterString(self.BASENAME,
+                                                       self.tr("Output basename"),
+                                                       "csoutput"))
+
+        self.addParameter(QgsProcessingParameterFolderDestination(self.DIRECTORY,
+                                                                  self.tr("Output directory")))
+
+        self.addOutput(QgsProcessingOutputFile(self.CURRENT_MAP, self.tr("Cumulative current map")))
+        self.addOutput(QgsProcessingOutputFile(self.LOG_FILE, self.tr("Solver log")))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        isConductance = self.parameterAsBool(parameters, self.IS_CONDUCTANCES, context)
+        if self.parameterAsRasterLayer(parameters, self.FOCAL_NODE, context) is None and \
+                self.parameterAsSource(parameters, self.FOCAL_NODE_FEATURES, context) is None:
+            raise QgsProcessingException(self.tr("Focal nodes are required, either as a raster or as a vector layer"))
+        mode = self.modes[self.parameterAsEnum(parameters, self.MODE, context)][1]
+        writeCurrent = self.parameterAsBool(parameters, self.WRITE_CURRENT_MAP, context)
+
+        baseName = self.parameterAsString(parameters, self.BASENAME, context)
+        directory = self.parameterAsString(parameters, self.DIRECTORY, context)
+        basePath = os.path.join(directory, baseName)
+
+        with self.createWorkspace(feedback) as workspace:
+            if not self.prepareInputs(parameters, context, feedback):
+                return {}
+
+            # the solver receives the connection scheme only for rasters,
+            # so the graph is built following the same settings
+            feedback.setProgressText(self.tr("Building habitat graph"))
+            resistance = self.exportedParameter(parameters, self.RESISTANCE_MAP, context)
+            template, graph = networkGraph.buildGraph(resistance,
+                                                      self.exportedInput(parameters, self.FOCAL_NODE, context),
+                                                      isConductance,
+                                                      bool(ProcessingConfig.getSetting(circuitscapeUtils.FOUR_NEIGHBOURS)),
+                                                      bool(ProcessingConfig.getSetting(circuitscapeUtils.AVERAGE_CONDUCTANCE)),
+                                                      self.exportedParameter(parameters, self.MASK, context))
+            nodeCount = graph.nodeCount()
+            focalCount = len(graph.focalIds)
+            feedback.pushInfo(self.tr("Habitat graph has {} node(s) and {} edge(s) for {} of {} cell(s), "
+                                      "{} focal node(s)").format(nodeCount, len(graph.weights), nodeCount,
+                                                                 template.RasterXSize * template.RasterYSize,
+                                                                 focalCount))
+            if focalCount < 2:
+                raise QgsProcessingException(self.tr("At least two focal nodes must lie on habitat cells"))
+
+            iniPath = circuitscapeUtils.writeConfiguration(workspace.path)
+            cfg = configparser.ConfigParser()
+            cfg.read(iniPath)
+
+            # set parameters
+            cfg["Circuitscape mode"]["scenario"] = mode
+            cfg["Circuitscape mode"]["data_type"] = "network"
+
+            section = cfg["Habitat raster or graph"]
+            section["habitat_map_is_resistances"] = "False"
+            section["habitat_file"] = networkGraph.writeEdgeList(workspace.fileName("graph.txt"), graph)
+
+            section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+            section["point_file"] = networkGraph.writeFocalList(workspace.fileName("focal_nodes.txt"), graph)
+
+            cfg["Output options"]["write_cur_maps"] = str(writeCurrent)
+            cfg["Output options"]["write_volt_maps"] = "False"
+            cfg["Output options"]["output_file"] = basePath
+
+            solves = focalCount * (focalCount - 1) // 2 if mode == "pairwise" else focalCount
+            self.configureSolver(cfg, parameters, context, feedback, solves)
+            self.configureParallel(cfg, parameters, context, feedback)
+            estimate = self.planRun(cfg, feedback, solves, nodeCount)
+
+            # write configuration back to the file
+            with open(iniPath, "w") as f:
+                cfg.write(f)
+
+            def run():
+                return circuitscapeUtils.runSolver(iniPath, feedback)
+
+            results = self.runCached(cfg, basePath, feedback, lambda: self.runQueued(estimate, feedback, run))
+            if results is None:
+                return {}
+
+            if writeCurrent:
+                currentsFile = networkGraph.nodeCurrentsFile(basePath)
+                if currentsFile is None:
+                    feedback.reportError(self.tr("Solver did not write node currents, current map is not created"))
+                else:
+                    results[self.CURRENT_MAP] = networkGraph.currentsToRaster(currentsFile, graph, template,
+                                                                              "{}_cum_curmap.tif".format(basePath))
+
+            results[self.DIRECTORY] = directory
+            return results
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    networkGraph.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+
+import numpy
+
+from qgis.core import QgsProcessingException
+
+from processing_circuitscape import habitatCircuit
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+
+def readBand(fileName):
+    ds = rasterTools.openRaster(fileName)
+    band = ds.GetRasterBand(1)
+    return ds, band.ReadAsArray(), band.GetNoDataValue()
+
+
+def cellConductances(resistanceFile, isConductance, mask=None):
+    # conductance of every habitat cell, 0 where there is no habitat
+    ds, data, noData = readBand(resistanceFile)
+    data = data.astype(numpy.float64)
+    habitat = rasterTools.validMask(data, noData) & (data > 0)
+    if mask is not None:
+        maskDs, maskData, maskNoData = readBand(mask)
+        habitat &= rasterTools.validMask(maskData, maskNoData) & (maskData > 0)
+
+    conductances = numpy.zeros(data.shape, dtype=numpy.float64)
+    if isConductance:
+        conductances[habitat] = data[habitat]
+    else:
+        conductances[habitat] = 1.0 / data[habitat]
+    return ds, conductances
+
+
+def focalIds(conductances, focalFile):
+    # focal ID of every habitat cell, 0 where there is none
+    ds, focal, noData = readBand(focalFile)
+    isFocal = rasterTools.validMask(focal, noData) & (focal > 0) & (conductances > 0)
+    if numpy.any(focal[isFocal] != numpy.floor(focal[isFocal])):
+        raise QgsProcessingException("Focal node IDs must be integers")
+    return numpy.where(isFocal, focal, 0).astype(numpy.int64)
+
+
+def buildGraph(resistanceFile, focalFile, isConductance, fourNeighbours, averageResistances, mask=None):
+    # weighted edge list of the habitat cells following the connection
+    # scheme used by the solver for rasters
+    ds, conductances = cellConductances(resistanceFile, isConductance, mask)
+    return ds, habitatCircuit.buildGraph(conductances, focalIds(conductances, focalFile),
+                                         fourNeighbours, averageResistances)
+
+
+def writeEdgeList(fileName, graph):
+    # "node node conductance" lines, the network habitat file format
+    with open(fileName, "w") as f:
+        numpy.savetxt(f, numpy.column_stack((graph.first, graph.second, graph.weights)),
+                      fmt=("%d", "%d", "%.9g"), delimiter=" ")
+    return fileName
+
+
+def writeFocalList(fileName, graph):
+    with open(fileName, "w") as f:
+        numpy.savetxt(f, graph.focalIds, fmt="%d")
+    return fileName
+
+
+def nodeCurrentsFile(basePath):
+    # cumulative node currents of pairwise and one-to-all runs, plain
+    # node currents of single solves
+    for suffix in ("_node_currents_cum.txt", "_node_currents.txt"):
+        fileName = basePath + suffix
+        if os.path.exists(fileName):
+            return fileName
+    return None
+
+
+def currentsToRaster(currentsFile, graph, template, destination):
+    # writes current of every node onto the cells it was built from
+    currents = numpy.loadtxt(currentsFile, ndmin=2)
+    values = numpy.zeros(int(graph.nodes.max()) + 1, dtype=numpy.float64)
+    values[currents[:, 0].astype(numpy.int64)] = currents[:, 1]
+
+    noData = rasterExporter.DEFAULT_NODATA
+    data = numpy.where(graph.nodes > 0, values[graph.nodes], noData)
+    return rasterTools.writeRaster(destination, template, [(0, data)], noData)
@@ -33,13 +33,22 @@ from qgis.core import (QgsProcessing,
                        QgsProcessingParameterBoolean,
                        QgsProcessingParameterString,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterFolderDestination
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterFeatureSource,
+                       QgsProcessingParameterField,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingOutputFile,
+                       QgsProcessingException
                       )
 from processing.core.ProcessingConfig import ProcessingConfig
-from processing.tools import system
 
 from processing_circuitscape.circuitscapeAlgorithm import CircuitscapeAlgorithm
 from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import inputValidation
+from processing_circuitscape import vectorRasterizer
+from processing_circuitscape import focalPairs
+from processing_circuitscape import partitionProbe
+from processing_circuitscape import rasterTools
 
 
 class OneToAll(CircuitscapeAlgorithm):
@@ -48,13 +57,33 @@ class OneToAll(CircuitscapeAlgorithm):
     RESISTANCE_MAP = "RESISTANCE_MAP"
     IS_CONDUCTANCES = "IS_CONDUCTANCES"
     FOCAL_NODE = "FOCAL_NODE"
+    FOCAL_NODE_FEATURES = "FOCAL_NODE_FEATURES"
+    FOCAL_NODE_FIELD = "FOCAL_NODE_FIELD"
     WRITE_CURRENT_MAP = "WRITE_CURRENT_MAP"
     WRITE_VOLTAGE_MAP = "WRITE_VOLTAGE_MAP"
     MASK = "MASK"
     SHORT_CIRCUIT = "SHORT_CIRCUIT"
+    SHORT_CIRCUIT_FEATURES = "SHORT_CIRCUIT_FEATURES"
+    SHORT_CIRCUIT_FIELD = "SHORT_CIRCUIT_FIELD"
     SOURCE_STRENGTH = "SOURCE_STRENGTH"
+    SOURCE_STRENGTH_FEATURES = "SOURCE_STRENGTH_FEATURES"
+    SOURCE_STRENGTH_FIELD = "SOURCE_STRENGTH_FIELD"
+    SOLVER = "SOLVER"
+    PARALLEL_MODE = "PARALLEL_MODE"
+    MAX_PARALLEL = "MAX_PARALLEL"
+    PARTITIONS = "PARTITIONS"
     BASENAME = "BASENAME"
     DIRECTORY = "DIRECTORY"
+    LOG_FILE = "LOG_FILE"
+
+    ROI_PARAMETERS = (FOCAL_NODE, MASK)
+    ANCHOR_PARAMETERS = (FOCAL_NODE,)
+    INPUT_ROLES = {FOCAL_NODE: inputValidation.ROLE_FOCAL,
+                   SHORT_CIRCUIT: inputValidation.ROLE_REGION,
+                   SOURCE_STRENGTH: inputValidation.ROLE_SOURCE}
+    VECTOR_INPUTS = {FOCAL_NODE: (FOCAL_NODE_FEATURES, FOCAL_NODE_FIELD, vectorRasterizer.BURN_IDS),
+                     SHORT_CIRCUIT: (SHORT_CIRCUIT_FEATURES, SHORT_CIRCUIT_FIELD, vectorRasterizer.BURN_IDS),
+                     SOURCE_STRENGTH: (SOURCE_STRENGTH_FEATURES, SOURCE_STRENGTH_FIELD, vectorRasterizer.BURN_ONES)}
 
     def name(self):
         return "onetoall"
@@ -86,7 +115,17 @@ class OneToAll(CircuitscapeAlgorithm):
                                                         self.tr("Data represent conductances instead of resistances"),
                                                         False))
         self.addParameter(QgsProcessingParameterRasterLayer(self.FOCAL_NODE,
-                                                            self.tr("Focal node location")))
+                                                            self.tr("Focal node location"),
+                                                            optional=True))
+        self.addParameter(QgsProcessingParameterFeatureSource(self.FOCAL_NODE_FEATURES,
+                                                              self.tr("Focal node location (vector)"),
+                                                              [QgsProcessing.TypeVectorPoint, QgsProcessing.TypeVectorPolygon],
+                                                              optional=True))
+        self.addParameter(QgsProcessingParameterField(self.FOCAL_NODE_FIELD,
+                                                      self.tr("Focal node ID field (default: feature order)"),
+                                                      parentLayerParameterName=self.FOCAL_NODE_FEATURES,
+                                                      type=QgsProcessingParameterField.Numeric,
+                                                      optional=True))
         self.addParameter(QgsProcessingParameterBoolean(self.WRITE_CURRENT_MAP,
                                                         self.tr("Create current map"),
                                                         True))
@@ -99,9 +138,47 @@ class OneToAll(CircuitscapeAlgorithm):
         self.addParameter(QgsProcessingParameterRasterLayer(self.SHORT_CIRCUIT,
                                                             self.tr("Short-circuit region"),
                                                             optional=True))
+        self.addParameter(QgsProcessingParameterFeatureSource(self.SHORT_CIRCUIT_FEATURES,
+                                                              self.tr("Short-circuit region (vector)"),
+                                                              [QgsProcessing.TypeVectorPolygon],
+                                                              optional=True))
+        self.addParameter(QgsProcessingParameterField(self.SHORT_CIRCUIT_FIELD,
+                                                      self.tr("Short-circuit region ID field (default: feature order)"),
+                                                      parentLayerParameterName=self.SHORT_CIRCUIT_FEATURES,
+                                                      type=QgsProcessingParameterField.Numeric,
+                                                      optional=True))
         self.addParameter(QgsProcessingParameterRasterLayer(self.SOURCE_STRENGTH,
                                                             self.tr("Source strength"),
                                                             optional=True))
+        self.addParameter(QgsProcessingParameterFeatureSource(self.SOURCE_STRENGTH_FEATURES,
+                                                              self.tr("Source strength (vector)"),
+                                                              [QgsProcessing.TypeVectorPoint, QgsProcessing.TypeVectorPolygon],
+                                                              optional=True))
+        self.addParameter(QgsProcessingParameterField(self.SOURCE_STRENGTH_FIELD,
+                                                      self.tr("Source strength field (default: 1)"),
+                                                      parentLayerParameterName=self.SOURCE_STRENGTH_FEATURES,
+                                                      type=QgsProcessingParameterField.Numeric,
+                                                      optional=True))
+        self.addParameter(QgsProcessingParameterEnum(self.SOLVER,
+                                                     self.tr("Solver"),
+                                                     options=self.solvers(),
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterEnum(self.PARALLEL_MODE,
+                                                     self.tr("Parallel execution"),
+                                                     options=self.parallelModes(),
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterNumber(self.MAX_PARALLEL,
+                                                       self.tr("Maximum number of parallel workers (0 = use provider setting)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       0,
+                                                       minValue=0))
+        self.addParameter(QgsProcessingParameterNumber(self.PARTITIONS,
+                                                       self.tr("Split focal nodes into partitions run as separate processes (0 = disabled)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       0,
+                                                       minValue=0))
         self.addParameter(QgsProcessingParameterString(self.BASENAME,
                                                        self.tr("Output basename"),
                                                        "csoutput"))
@@ -109,77 +186,118 @@ class OneToAll(CircuitscapeAlgorithm):
         self.addParameter(QgsProcessingParameterFolderDestination(self.DIRECTORY,
                                                                   self.tr("Output directory")))
 
+        self.addOutput(QgsProcessingOutputFile(self.LOG_FILE, self.tr("Solver log")))
+
     def processAlgorithm(self, parameters, context, feedback):
         mode = self.modes[self.parameterAsEnum(parameters, self.MODE, context)][1]
         resistance = self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context).source()
         useConductance = str(not self.parameterAsBool(parameters, self.IS_CONDUCTANCES, context))
-        focal = self.parameterAsRasterLayer(parameters, self.FOCAL_NODE, context).source()
+        if self.parameterAsRasterLayer(parameters, self.FOCAL_NODE, context) is None and \
+                self.parameterAsSource(parameters, self.FOCAL_NODE_FEATURES, context) is None:
+            raise QgsProcessingException(self.tr("Focal nodes are required, either as a raster or as a vector layer"))
         writeCurrent = str(self.parameterAsBool(parameters, self.WRITE_CURRENT_MAP, context))
         writeVoltage = str(self.parameterAsBool(parameters, self.WRITE_VOLTAGE_MAP, context))
 
         # advanced parameters
         mask = self.parameterAsRasterLayer(parameters, self.MASK, context)
-        shortCircuit = self.parameterAsRasterLayer(parameters, self.SHORT_CIRCUIT, context)
-        sourceStrength = self.parameterAsRasterLayer(parameters, self.SOURCE_STRENGTH, context)
+        partitions = self.parameterAsInt(parameters, self.PARTITIONS, context)
 
         baseName = self.parameterAsString(parameters, self.BASENAME, context)
         directory = self.parameterAsString(parameters, self.DIRECTORY, context)
         basePath = os.path.join(directory, baseName)
 
-        commands = self.prepareInputs(parameters, context)
+        with self.createWorkspace(feedback) as workspace:
+            if not self.prepareInputs(parameters, context, feedback):
+                return {}
+
+            iniPath = circuitscapeUtils.writeConfiguration(workspace.path)
+            cfg = configparser.ConfigParser()
+            cfg.read(iniPath)
 
-        iniPath = circuitscapeUtils.writeConfiguration()
-        cfg = configparser.ConfigParser()
-        cfg.read(iniPath)
+            # set parameters
+            cfg["Circuitscape mode"]["scenario"] = mode
 
-        # set parameters
-        cfg["Circuitscape mode"]["scenario"] = mode
+            section = cfg["Habitat raster or graph"]
+            section["habitat_map_is_resistances"] = useConductance
+            if resistance in self.exportedLayers.keys():
+                section["habitat_file"] = self.exportedLayers[resistance]
 
-        section = cfg["Habitat raster or graph"]
-        section["habitat_map_is_resistances"] = useConductance
-        if resistance in self.exportedLayers.keys():
-            section["habitat_file"] = self.exportedLayers[resistance]
+            pruned = self.pruneResistance(parameters, context, feedback)
+            if pruned is not None:
+                section["habitat_file"] = pruned
 
-        if focal in self.exportedLayers.keys():
             section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
-            section["point_file"] = self.exportedLayers[focal]
+            section["point_file"] = self.exportedInput(parameters, self.FOCAL_NODE, context)
 
-        if sourceStrength is not None:
-            if sourceStrength in self.exportedLayers.keys():
+            strengths = self.exportedInput(parameters, self.SOURCE_STRENGTH, context)
+            if strengths is not None:
                 section = cfg["Options for one-to-all and all-to-one modes"]
-                section["variable_source_file"] = self.exportedLayers[sourceStrength]
+                section["variable_source_file"] = strengths
                 section["use_variable_source_strengths"] = "True"
 
-        if mask is not None:
-            if mask in self.exportedLayers.keys():
-                section = cfg["Mask file"]
-                section["mask_file"] = self.exportedLayers[mask]
-                section["use_mask"] = "True"
+            if mask is not None:
+                if mask.source() in self.exportedLayers.keys():
+                    section = cfg["Mask file"]
+                    section["mask_file"] = self.exportedLayers[mask.source()]
+                    section["use_mask"] = "True"
 
-        if shortCircuit is not None:
-            if shortCircuit in self.exportedLayers.keys():
+            polygons = self.exportedInput(parameters, self.SHORT_CIRCUIT, context)
+            if polygons is not None:
                 section = cfg["Short circuit regions (aka polygons)"]
-                section["polygon_file"] = self.exportedLayers[shortCircuit]
+                section["polygon_file"] = polygons
                 section["use_polygons"] = "True"
 
-        cfg["Output options"]["write_cur_maps"] = writeCurrent
-        cfg["Output options"]["write_volt_maps"] = writeVoltage
-        cfg["Output options"]["output_file"] = basePath
-
-        # write configuration back to the file
-        with open(iniPath, "w") as f:
-            cfg.write(f)
+            cfg["Output options"]["write_cur_maps"] = writeCurrent
+            cfg["Output options"]["write_volt_maps"] = writeVoltage
+            cfg["Output options"]["output_file"] = basePath
 
-        if system.isWindows():
-            csPath = circuitscapeUtils.circuitscapeDirectory()
-            if csPath == "":
-                csPath = "cs_run.exe"
-            else:
-                csPath = os.path.join(csPath, "cs_run.exe")
-
-            commands.append('"{}" {}'.format(csPath, iniPath))
-        else:
-            commands.append("csrun.py {}".format(iniPath))
-
-        circuitscapeUtils.jobFileFromCommands(commands)
-        circuitscapeUtils.execute(feedback)
+            section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+            focalCount = len(rasterTools.uniqueValues(section["point_file"]))
+            self.configureSolver(cfg, parameters, context, feedback, focalCount)
+            self.configureParallel(cfg, parameters, context, feedback)
+            estimate = self.planRun(cfg, feedback, focalCount)
+
+            # write configuration back to the file
+            with open(iniPath, "w") as f:
+                cfg.write(f)
+
+            def run():
+                if partitions > 1:
+                    matches = partitionProbe.partitionsMatch(mode, workspace, feedback)
+                    if matches is None:
+                        return None
+                    if matches:
+                        return self.runPartitioned(cfg, partitions, basePath, parameters, context, feedback)
+                    feedback.pushInfo(self.tr("Installed solver does not reproduce single {} runs when "
+                                              "partitioned, running as a single job").format(mode))
+                return circuitscapeUtils.runSolver(iniPath, feedback)
+
+            results = self.runCached(cfg, basePath, feedback, lambda: self.runQueued(estimate, feedback, run))
+            if results is None:
+                return {}
+
+            results[self.DIRECTORY] = directory
+            return results
+
+    def runPartitioned(self, cfg, partitionCount, basePath, parameters, context, feedback):
+        # every partition gets the complete focal node file, so per-node
+        # outputs keep their IDs and each solve sees the same set of
+        # nodes as in a single run; an included pairs file restricts the
+        # partition to its own source nodes, which partitionProbe checks
+        # the installed solver honours
+        section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+        ids = rasterTools.uniqueValues(section["point_file"])
+        partitions = focalPairs.splitNodes(ids, partitionCount)
+        feedback.pushInfo(self.tr("Splitting {} focal node(s) into {} partition(s)").format(
+            len(ids), len(partitions)))
+
+        def partitionSetup(nodes):
+            def setup(cfg, directory):
+                fileName = os.path.join(directory, "included_pairs.txt")
+                focalPairs.writeIncludedPairs(fileName, ids, focalPairs.sourcePairs(ids, nodes), False)
+                section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+                section["included_pairs_file"] = fileName
+                section["use_included_pairs"] = "True"
+            return setup
+
+        return self.runShards(cfg, [partitionSetup(n) for n in partitions], basePath, parameters, context, feedback)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    outputMerger.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import shutil
+
+import numpy
+
+from qgis.core import QgsProcessingException
+
+from processing_circuitscape import rasterTools
+
+# value written by the solver for pairs which were not computed
+NOT_COMPUTED = -1
+
+
+def shardFiles(shardBase):
+    # maps output suffix (everything after the basename) to file path
+    directory, name = os.path.split(shardBase)
+    files = {}
+    for entry in sorted(os.listdir(directory)):
+        path = os.path.join(directory, entry)
+        if entry.startswith(name) and os.path.isfile(path):
+            files[entry[len(name):]] = path
+    return files
+
+
+def mergeOutputs(shardBases, basePath, feedback):
+    groups = {}
+    for shardBase in shardBases:
+        for suffix, path in shardFiles(shardBase).items():
+            groups.setdefault(suffix, []).append(path)
+
+    merged = []
+    for suffix, paths in sorted(groups.items()):
+        destination = basePath + suffix
+        if os.path.exists(destination):
+            os.remove(destination)
+
+        if "cum_curmap" in suffix:
+            feedback.pushInfo("Summing {} cumulative current map(s) into {}".format(len(paths), destination))
+            rasterTools.combineRasters(paths, destination, "sum")
+        elif "max_curmap" in suffix:
+            feedback.pushInfo("Combining {} maximum current map(s) into {}".format(len(paths), destination))
+            rasterTools.combineRasters(paths, destination, "max")
+        elif suffix.endswith("_resistances_3columns.out"):
+            mergeThreeColumns(paths, destination)
+        elif suffix.endswith("_resistances.out"):
+            mergeResistanceMatrices(paths, destination)
+        elif suffix.endswith(".log"):
+            concatenateLogs(paths, destination)
+        else:
+            # per-pair and per-node outputs are unique to a shard, anything
+            # else (e.g. configuration copies) is the same for all of them
+            shutil.move(paths[0], destination)
+        merged.append(destination)
+
+    return merged
+
+
+def mergeResistanceMatrices(paths, destination):
+    result = None
+    for path in paths:
+        matrix = numpy.loadtxt(path, ndmin=2)
+        if result is None:
+            result = matrix
+            continue
+
+        if matrix.shape != result.shape or not numpy.array_equal(matrix[0], result[0]):
+            raise QgsProcessingException("Can not merge resistance matrices {} and {}: focal nodes differ".format(
+                paths[0], path))
+
+        values = result[1:, 1:]
+        update = (values == NOT_COMPUTED) & (matrix[1:, 1:] != NOT_COMPUTED)
+        values[update] = matrix[1:, 1:][update]
+
+    numpy.savetxt(destination, result, fmt="%.12g", delimiter="\t")
+
+
+def mergeThreeColumns(paths, destination):
+    values = {}
+    for path in paths:
+        for a, b, resistance in numpy.loadtxt(path, ndmin=2):
+            key = (min(a, b), max(a, b))
+            if values.get(key, NOT_COMPUTED) == NOT_COMPUTED:
+                values[key] = resistance
+
+    rows = [(a, b, r) for (a, b), r in sorted(values.items())]
+    numpy.savetxt(destination, numpy.array(rows, ndmin=2), fmt="%.12g", delimiter=" ")
+
+
+def concatenateLogs(paths, destination):
+    with open(destination, "w") as out:
+        for path in paths:
+            out.write("==> {} <==\n".format(os.path.dirname(os.path.dirname(path))))
+            with open(path) as f:
+                shutil.copyfileobj(f, out)
+            out.write("\n")
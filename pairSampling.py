@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    pairSampling.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+# number of distance classes used for stratified sampling
+DISTANCE_STRATA = 5
+
+# relative standard errors reported as convergence diagnostics
+ERROR_LEVELS = (0.05, 0.1, 0.2)
+
+
+class Convergence:
+
+    def __init__(self):
+        self.cells = 0
+        self.relativeErrorSum = 0.0
+        self.below = [0] * len(ERROR_LEVELS)
+
+    def add(self, relativeErrors):
+        self.cells += relativeErrors.size
+        self.relativeErrorSum += float(relativeErrors.sum())
+        for i, level in enumerate(ERROR_LEVELS):
+            self.below[i] += int(numpy.count_nonzero(relativeErrors < level))
+
+    def meanRelativeError(self):
+        return self.relativeErrorSum / self.cells if self.cells else 0.0
+
+    def shares(self):
+        # share of current carrying cells below every error level
+        return [(level, count / float(self.cells) if self.cells else 0.0)
+                for level, count in zip(ERROR_LEVELS, self.below)]
+
+
+def sampleSize(value, total):
+    # values below one are a fraction of all pairs, others a pair count
+    if value < 1:
+        return max(1, int(round(value * total)))
+    return min(total, int(value))
+
+
+def nodeCentroids(fileName):
+    # mean cell position of every focal ID, in map units
+    ds = rasterTools.openRaster(fileName)
+    noData = ds.GetRasterBand(1).GetNoDataValue()
+    geoTransform = ds.GetGeoTransform()
+
+    sums = {}
+    for row, data in rasterTools.iterBlocks(ds):
+        valid = rasterTools.validMask(data, noData) & (data > 0)
+        rows, columns = numpy.nonzero(valid)
+        values = data[rows, columns]
+        ids, inverse = numpy.unique(values, return_inverse=True)
+        counts = numpy.bincount(inverse)
+        xs = numpy.bincount(inverse, weights=columns + 0.5)
+        ys = numpy.bincount(inverse, weights=rows + row + 0.5)
+        for i, value in enumerate(ids.tolist()):
+            total = sums.setdefault(value, [0, 0.0, 0.0])
+            total[0] += counts[i]
+            total[1] += xs[i]
+            total[2] += ys[i]
+
+    centroids = {}
+    for value, (count, x, y) in sums.items():
+        column, row = x / count, y / count
+        centroids[value] = (geoTransform[0] + column * geoTransform[1] + row * geoTransform[2],
+                            geoTransform[3] + column * geoTransform[4] + row * geoTransform[5])
+    return centroids
+
+
+def samplePairs(pairs, size, batchCount, seed, centroids=None):
+    # splits a random sample of pairs into batches of (nearly) equal size;
+    # with centroids every distance class is sampled in proportion to its
+    # share of all pairs, so every sampled pair keeps the same weight
+    rng = numpy.random.default_rng(seed)
+    if centroids is None:
+        strata = [numpy.arange(len(pairs))]
+    else:
+        distances = numpy.array([numpy.hypot(centroids[a][0] - centroids[b][0], centroids[a][1] - centroids[b][1])
+                                 for a, b in pairs])
+        edges = numpy.quantile(distances, numpy.linspace(0, 1, DISTANCE_STRATA + 1)[1:-1])
+        classes = numpy.searchsorted(edges, distances, side="right")
+        strata = [numpy.flatnonzero(classes == c) for c in range(DISTANCE_STRATA)]
+
+    # largest remainder allocation keeps the requested sample size
+    shares = numpy.array([len(s) for s in strata], dtype=float) * size / len(pairs)
+    counts = numpy.floor(shares).astype(int)
+    remainder = numpy.argsort(counts - shares)[:size - counts.sum()]
+    counts[remainder] += 1
+
+    # dealing pairs of every stratum round-robin spreads distances evenly
+    # over batches
+    batches = [[] for i in range(batchCount)]
+    position = 0
+    for stratum, count in zip(strata, counts):
+        for index in rng.permutation(stratum)[:count]:
+            batches[position % batchCount].append(pairs[index])
+            position += 1
+    return [b for b in batches if b]
+
+
+def writeEstimates(batchMaps, batchSizes, totalPairs, estimateFile, errorFile):
+    # scales the summed batch current maps up to all pairs and writes the
+    # per-cell standard error of that estimate from the spread of batch
+    # means; returns convergence statistics
+    datasets = [rasterTools.openRaster(fileName) for fileName in batchMaps]
+    template = datasets[0]
+    noData = template.GetRasterBand(1).GetNoDataValue()
+    outNoData = rasterExporter.DEFAULT_NODATA
+    sampled = float(sum(batchSizes))
+    batchCount = len(batchMaps)
+
+    width, height = template.RasterXSize, template.RasterYSize
+    geoTransform, projection = template.GetGeoTransform(), template.GetProjection()
+    estimateDs = rasterTools.createRaster(estimateFile, width, height, geoTransform, projection, outNoData)
+    errorDs = rasterTools.createRaster(errorFile, width, height, geoTransform, projection, outNoData)
+
+    convergence = Convergence()
+    for blocks in zip(*[rasterTools.iterBlocks(ds) for ds in datasets]):
+        row = blocks[0][0]
+        valid = rasterTools.validMask(blocks[0][1], noData)
+        sums = numpy.stack([numpy.where(valid, data, 0.0) for r, data in blocks])
+
+        estimate = sums.sum(axis=0) * totalPairs / sampled
+        batchEstimates = sums * (totalPairs / numpy.array(batchSizes, dtype=float))[:, None, None]
+        error = batchEstimates.std(axis=0, ddof=1) / numpy.sqrt(batchCount)
+
+        carrying = valid & (estimate > 0)
+        convergence.add(error[carrying] / estimate[carrying])
+
+        estimateDs.GetRasterBand(1).WriteArray(numpy.where(valid, estimate, outNoData), 0, row)
+        errorDs.GetRasterBand(1).WriteArray(numpy.where(valid, error, outNoData), 0, row)
+
+    estimateDs = None
+    errorDs = None
+    return convergence
@@ -32,13 +32,25 @@ from qgis.core import (QgsProcessing,
                        QgsProcessingParameterRasterLayer,
                        QgsProcessingParameterBoolean,
                        QgsProcessingParameterString,
-                       QgsProcessingParameterFolderDestination
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterFile,
+                       QgsProcessingParameterFeatureSource,
+                       QgsProcessingParameterField,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingOutputFile,
+                       QgsProcessingException
                       )
 from processing.core.ProcessingConfig import ProcessingConfig
-from processing.tools import system
 
 from processing_circuitscape.circuitscapeAlgorithm import CircuitscapeAlgorithm
 from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import inputValidation
+from processing_circuitscape import vectorRasterizer
+from processing_circuitscape import focalPairs
+from processing_circuitscape import outputMerger
+from processing_circuitscape import pairSampling
+from processing_circuitscape import rasterTools
 
 
 class Pairwise(CircuitscapeAlgorithm):
@@ -46,14 +58,34 @@ class Pairwise(CircuitscapeAlgorithm):
     RESISTANCE_MAP = "RESISTANCE_MAP"
     IS_CONDUCTANCES = "IS_CONDUCTANCES"
     FOCAL_NODE = "FOCAL_NODE"
+    FOCAL_NODE_FEATURES = "FOCAL_NODE_FEATURES"
+    FOCAL_NODE_FIELD = "FOCAL_NODE_FIELD"
     WRITE_CURRENT_MAP = "WRITE_CURRENT_MAP"
     WRITE_VOLTAGE_MAP = "WRITE_VOLTAGE_MAP"
     MASK = "MASK"
     SHORT_CIRCUIT = "SHORT_CIRCUIT"
+    SHORT_CIRCUIT_FEATURES = "SHORT_CIRCUIT_FEATURES"
+    SHORT_CIRCUIT_FIELD = "SHORT_CIRCUIT_FIELD"
     EXCLUDE_INCLUDE = "EXCLUDE_INCLUDE"
     LOW_MEMORY = "LOW_MEMORY"
+    SOLVER = "SOLVER"
+    PARALLEL_MODE = "PARALLEL_MODE"
+    MAX_PARALLEL = "MAX_PARALLEL"
+    SHARDS = "SHARDS"
+    SAMPLE_SIZE = "SAMPLE_SIZE"
+    SAMPLE_BY_DISTANCE = "SAMPLE_BY_DISTANCE"
+    SAMPLE_BATCHES = "SAMPLE_BATCHES"
+    SAMPLE_SEED = "SAMPLE_SEED"
     BASENAME = "BASENAME"
     DIRECTORY = "DIRECTORY"
+    LOG_FILE = "LOG_FILE"
+
+    ROI_PARAMETERS = (FOCAL_NODE, MASK)
+    ANCHOR_PARAMETERS = (FOCAL_NODE,)
+    INPUT_ROLES = {FOCAL_NODE: inputValidation.ROLE_FOCAL,
+                   SHORT_CIRCUIT: inputValidation.ROLE_REGION}
+    VECTOR_INPUTS = {FOCAL_NODE: (FOCAL_NODE_FEATURES, FOCAL_NODE_FIELD, vectorRasterizer.BURN_IDS),
+                     SHORT_CIRCUIT: (SHORT_CIRCUIT_FEATURES, SHORT_CIRCUIT_FIELD, vectorRasterizer.BURN_IDS)}
 
     def name(self):
         return "pairwise"
@@ -77,7 +109,17 @@ class Pairwise(CircuitscapeAlgorithm):
                                                         self.tr("Data represent conductances instead of resistances"),
                                                         False))
         self.addParameter(QgsProcessingParameterRasterLayer(self.FOCAL_NODE,
-                                                            self.tr("Focal node location")))
+                                                            self.tr("Focal node location"),
+                                                            optional=True))
+        self.addParameter(QgsProcessingParameterFeatureSource(self.FOCAL_NODE_FEATURES,
+                                                              self.tr("Focal node location (vector)"),
+                                                              [QgsProcessing.TypeVectorPoint, QgsProcessing.TypeVectorPolygon],
+                                                              optional=True))
+        self.addParameter(QgsProcessingParameterField(self.FOCAL_NODE_FIELD,
+                                                      self.tr("Focal node ID field (default: feature order)"),
+                                                      parentLayerParameterName=self.FOCAL_NODE_FEATURES,
+                                                      type=QgsProcessingParameterField.Numeric,
+                                                      optional=True))
         self.addParameter(QgsProcessingParameterBoolean(self.WRITE_CURRENT_MAP,
                                                         self.tr("Create current map"),
                                                         True))
@@ -90,12 +132,60 @@ class Pairwise(CircuitscapeAlgorithm):
         self.addParameter(QgsProcessingParameterRasterLayer(self.SHORT_CIRCUIT,
                                                             self.tr("Short-circuit region"),
                                                             optional=True))
-        self.addParameter(QgsProcessingParameterRasterLayer(self.EXCLUDE_INCLUDE,
-                                                            self.tr("Focal node pairs to exclude/include"),
-                                                            optional=True))
+        self.addParameter(QgsProcessingParameterFeatureSource(self.SHORT_CIRCUIT_FEATURES,
+                                                              self.tr("Short-circuit region (vector)"),
+                                                              [QgsProcessing.TypeVectorPolygon],
+                                                              optional=True))
+        self.addParameter(QgsProcessingParameterField(self.SHORT_CIRCUIT_FIELD,
+                                                      self.tr("Short-circuit region ID field (default: feature order)"),
+                                                      parentLayerParameterName=self.SHORT_CIRCUIT_FEATURES,
+                                                      type=QgsProcessingParameterField.Numeric,
+                                                      optional=True))
+        self.addParameter(QgsProcessingParameterFile(self.EXCLUDE_INCLUDE,
+                                                     self.tr("Focal node pairs to exclude/include"),
+                                                     QgsProcessingParameterFile.File,
+                                                     optional=True))
         self.addParameter(QgsProcessingParameterBoolean(self.LOW_MEMORY,
                                                         self.tr("Run in low memory mode"),
                                                         False))
+        self.addParameter(QgsProcessingParameterEnum(self.SOLVER,
+                                                     self.tr("Solver"),
+                                                     options=self.solvers(),
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterEnum(self.PARALLEL_MODE,
+                                                     self.tr("Parallel execution"),
+                                                     options=self.parallelModes(),
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterNumber(self.MAX_PARALLEL,
+                                                       self.tr("Maximum number of parallel workers (0 = use provider setting)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       0,
+                                                       minValue=0))
+        self.addParameter(QgsProcessingParameterNumber(self.SHARDS,
+                                                       self.tr("Split focal node pairs into shards run as separate processes (0 = disabled)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       0,
+                                                       minValue=0))
+        self.addParameter(QgsProcessingParameterNumber(self.SAMPLE_SIZE,
+                                                       self.tr("Solve random sample of pairs (below 1 = fraction, otherwise number of pairs, 0 = all pairs)"),
+                                                       QgsProcessingParameterNumber.Double,
+                                                       0.0,
+                                                       minValue=0.0))
+        self.addParameter(QgsProcessingParameterBoolean(self.SAMPLE_BY_DISTANCE,
+                                                        self.tr("Stratify sampled pairs by distance"),
+                                                        True))
+        self.addParameter(QgsProcessingParameterNumber(self.SAMPLE_BATCHES,
+                                                       self.tr("Number of batches for standard error of sampled current"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       5,
+                                                       minValue=2))
+        self.addParameter(QgsProcessingParameterNumber(self.SAMPLE_SEED,
+                                                       self.tr("Random seed for pair sampling"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       1,
+                                                       minValue=0))
         self.addParameter(QgsProcessingParameterString(self.BASENAME,
                                                        self.tr("Output basename"),
                                                        "csoutput"))
@@ -103,76 +193,184 @@ class Pairwise(CircuitscapeAlgorithm):
         self.addParameter(QgsProcessingParameterFolderDestination(self.DIRECTORY,
                                                                   self.tr("Output directory")))
 
+        self.addOutput(QgsProcessingOutputFile(self.LOG_FILE, self.tr("Solver log")))
+
     def processAlgorithm(self, parameters, context, feedback):
         resistance = self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context).source()
         useConductance = str(not self.parameterAsBool(parameters, self.IS_CONDUCTANCES, context))
-        focal = self.parameterAsRasterLayer(parameters, self.FOCAL_NODE, context).source()
+        if self.parameterAsRasterLayer(parameters, self.FOCAL_NODE, context) is None and \
+                self.parameterAsSource(parameters, self.FOCAL_NODE_FEATURES, context) is None:
+            raise QgsProcessingException(self.tr("Focal nodes are required, either as a raster or as a vector layer"))
         writeCurrent = str(self.parameterAsBool(parameters, self.WRITE_CURRENT_MAP, context))
         writeVoltage = str(self.parameterAsBool(parameters, self.WRITE_VOLTAGE_MAP, context))
 
         # advanced parameters
         mask = self.parameterAsRasterLayer(parameters, self.MASK, context)
-        shortCircuit = self.parameterAsRasterLayer(parameters, self.SHORT_CIRCUIT, context)
-        focalPairs = self.parameterAsRasterLayer(parameters, self.EXCLUDE_INCLUDE, context)
+        pairsFile = self.parameterAsFile(parameters, self.EXCLUDE_INCLUDE, context)
         lowMemory = str(self.parameterAsBool(parameters, self.LOW_MEMORY, context))
+        shards = self.parameterAsInt(parameters, self.SHARDS, context)
+        sampleSize = self.parameterAsDouble(parameters, self.SAMPLE_SIZE, context)
 
         baseName = self.parameterAsString(parameters, self.BASENAME, context)
         directory = self.parameterAsString(parameters, self.DIRECTORY, context)
         basePath = os.path.join(directory, baseName)
 
-        commands = self.prepareInputs(parameters, context)
+        with self.createWorkspace(feedback) as workspace:
+            if not self.prepareInputs(parameters, context, feedback):
+                return {}
+
+            iniPath = circuitscapeUtils.writeConfiguration(workspace.path)
+            cfg = configparser.ConfigParser()
+            cfg.read(iniPath)
 
-        iniPath = circuitscapeUtils.writeConfiguration()
-        cfg = configparser.ConfigParser()
-        cfg.read(iniPath)
+            # set parameters
+            cfg["Circuitscape mode"]["scenario"] = "pairwise"
 
-        # set parameters
-        cfg["Circuitscape mode"]["scenario"] = "pairwise"
+            section = cfg["Habitat raster or graph"]
+            section["habitat_map_is_resistances"] = useConductance
+            if resistance in self.exportedLayers.keys():
+                section["habitat_file"] = self.exportedLayers[resistance]
 
-        section = cfg["Habitat raster or graph"]
-        section["habitat_map_is_resistances"] = useConductance
-        if resistance in self.exportedLayers.keys():
-            section["habitat_file"] = self.exportedLayers[resistance]
+            pruned = self.pruneResistance(parameters, context, feedback)
+            if pruned is not None:
+                section["habitat_file"] = pruned
 
-        if focal in self.exportedLayers.keys():
             section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
-            section["point_file"] = self.exportedLayers[focal]
+            section["point_file"] = self.exportedInput(parameters, self.FOCAL_NODE, context)
 
-        if focalPairs is not None:
-            section["included_pairs_file"] = focalPairs
-            section["use_included_pairs"] = "True"
+            if pairsFile:
+                section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+                section["included_pairs_file"] = pairsFile
+                section["use_included_pairs"] = "True"
 
-        if mask is not None:
-            if mask in self.exportedLayers.keys():
-                section = cfg["Mask file"]
-                section["mask_file"] = self.exportedLayers[mask]
-                section["use_mask"] = "True"
+            if mask is not None:
+                if mask.source() in self.exportedLayers.keys():
+                    section = cfg["Mask file"]
+                    section["mask_file"] = self.exportedLayers[mask.source()]
+                    section["use_mask"] = "True"
 
-        if shortCircuit is not None:
-            if shortCircuit in self.exportedLayers.keys():
+            polygons = self.exportedInput(parameters, self.SHORT_CIRCUIT, context)
+            if polygons is not None:
                 section = cfg["Short circuit regions (aka polygons)"]
-                section["polygon_file"] = self.exportedLayers[shortCircuit]
+                section["polygon_file"] = polygons
                 section["use_polygons"] = "True"
 
-        cfg["Calculation options"]["low_memory_mode"] = lowMemory
-        cfg["Output options"]["write_cur_maps"] = writeCurrent
-        cfg["Output options"]["write_volt_maps"] = writeVoltage
-        cfg["Output options"]["output_file"] = basePath
+            cfg["Calculation options"]["low_memory_mode"] = lowMemory
+            cfg["Output options"]["write_cur_maps"] = writeCurrent
+            cfg["Output options"]["write_volt_maps"] = writeVoltage
+            cfg["Output options"]["output_file"] = basePath
 
-        # write configuration back to the file
-        with open(iniPath, "w") as f:
-            cfg.write(f)
-
-        if system.isWindows():
-            csPath = circuitscapeUtils.circuitscapeDirectory()
-            if csPath == "":
-                csPath = "cs_run.exe"
-            else:
-                csPath = os.path.join(csPath, "cs_run.exe")
-
-            commands.append('"{}" {}'.format(csPath, iniPath))
+            section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+            focalCount = len(rasterTools.uniqueValues(section["point_file"]))
+            solves = focalCount * (focalCount - 1) // 2
+            batches = None
+            if sampleSize > 0:
+                batches = self.samplePairs(cfg, sampleSize, parameters, context, feedback)
+                if batches is not None:
+                    solves = sum(len(b) for b in batches)
+
+            self.configureSolver(cfg, parameters, context, feedback, focalCount)
+            self.configureParallel(cfg, parameters, context, feedback)
+            estimate = self.planRun(cfg, feedback, solves)
+
+            # write configuration back to the file
+            with open(iniPath, "w") as f:
+                cfg.write(f)
+
+            def run():
+                if batches is not None:
+                    return self.runSampled(cfg, batches, basePath, parameters, context, feedback)
+                if shards > 1:
+                    return self.runSharded(cfg, shards, basePath, parameters, context, feedback)
+                return circuitscapeUtils.runSolver(iniPath, feedback)
+
+            results = self.runCached(cfg, basePath, feedback, lambda: self.runQueued(estimate, feedback, run))
+            if results is None:
+                return {}
+
+            results[self.DIRECTORY] = directory
+            return results
+
+    def pairsToSolve(self, cfg):
+        # focal node IDs and all pairs the configuration asks to solve
+        section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+        ids = rasterTools.uniqueValues(section["point_file"])
+        if section.getboolean("use_included_pairs"):
+            pairs = focalPairs.readIncludedPairs(section["included_pairs_file"], ids)
         else:
-            commands.append("csrun.py {}".format(iniPath))
+            pairs = focalPairs.allPairs(ids)
+        return ids, pairs
 
-        circuitscapeUtils.jobFileFromCommands(commands)
-        circuitscapeUtils.execute(feedback)
+    def pairsSetup(self, ids, shardPairs):
+        def setup(cfg, directory):
+            fileName = os.path.join(directory, "included_pairs.txt")
+            focalPairs.writeIncludedPairs(fileName, ids, shardPairs)
+            section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+            section["included_pairs_file"] = fileName
+            section["use_included_pairs"] = "True"
+        return setup
+
+    def runSharded(self, cfg, shardCount, basePath, parameters, context, feedback):
+        ids, pairs = self.pairsToSolve(cfg)
+        shards = focalPairs.splitPairs(pairs, shardCount)
+        feedback.pushInfo(self.tr("Splitting {} pair(s) of {} focal node(s) into {} shard(s)").format(
+            len(pairs), len(ids), len(shards)))
+
+        return self.runShards(cfg, [self.pairsSetup(ids, p) for p in shards], basePath, parameters, context, feedback)
+
+    def samplePairs(self, cfg, sampleSize, parameters, context, feedback):
+        # returns batches of sampled pairs or None when the sample would
+        # cover all pairs anyway
+        ids, pairs = self.pairsToSolve(cfg)
+        size = pairSampling.sampleSize(sampleSize, len(pairs))
+        batchCount = min(size, self.parameterAsInt(parameters, self.SAMPLE_BATCHES, context))
+        if size >= len(pairs) or batchCount < 2:
+            feedback.pushInfo(self.tr("Sample of {} pair(s) does not reduce {} pair(s) to solve, "
+                                      "solving all of them").format(size, len(pairs)))
+            return None
+
+        centroids = None
+        if self.parameterAsBool(parameters, self.SAMPLE_BY_DISTANCE, context):
+            section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+            centroids = pairSampling.nodeCentroids(section["point_file"])
+
+        self.sampledIds = ids
+        self.totalPairs = len(pairs)
+        batches = pairSampling.samplePairs(pairs, size, batchCount,
+                                           self.parameterAsInt(parameters, self.SAMPLE_SEED, context), centroids)
+        feedback.pushInfo(self.tr("Solving {} of {} pair(s) ({:.1f}%) in {} batch(es){}").format(
+            size, len(pairs), 100.0 * size / len(pairs), len(batches),
+            self.tr(", stratified by distance") if centroids is not None else ""))
+        return batches
+
+    def runSampled(self, cfg, batches, basePath, parameters, context, feedback):
+        # every batch is a shard, its own cumulative map is one batch
+        # mean for the standard error of the scaled-up current map
+        results = self.runShards(cfg, [self.pairsSetup(self.sampledIds, b) for b in batches],
+                                 basePath, parameters, context, feedback)
+        if results is None:
+            return None
+
+        if not cfg["Output options"].getboolean("write_cur_maps"):
+            return results
+
+        batchMaps = []
+        for shardBase in self.shardBases:
+            maps = [path for suffix, path in outputMerger.shardFiles(shardBase).items() if "cum_curmap" in suffix]
+            if not maps:
+                feedback.reportError(self.tr("Batch {} did not write cumulative current map, "
+                                             "sampled current is not scaled").format(shardBase))
+                return results
+            batchMaps.append(maps[0])
+
+        estimateFile = "{}_cum_curmap_estimate.tif".format(basePath)
+        errorFile = "{}_cum_curmap_stderr.tif".format(basePath)
+        convergence = pairSampling.writeEstimates(batchMaps, [len(b) for b in batches], self.totalPairs,
+                                                  estimateFile, errorFile)
+        feedback.pushInfo(self.tr("Current map scaled to all {} pair(s) written to {}, standard error to {}").format(
+            self.totalPairs, estimateFile, errorFile))
+        feedback.pushInfo(self.tr("Mean relative standard error {:.1f}% over {} cell(s) carrying current; {}").format(
+            100.0 * convergence.meanRelativeError(), convergence.cells,
+            ", ".join(self.tr("{:.1f}% of cells below {:.0f}%").format(100.0 * share, 100.0 * level)
+                      for level, share in convergence.shares())))
+        return results
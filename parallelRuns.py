@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    parallelRuns.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from processing_circuitscape import circuitscapeUtils
+
+
+class ChildFeedback:
+    # feedback handed to one of several concurrent solver runs: messages
+    # are labelled and serialized, progress is averaged over all runs and
+    # cancellation of one run cancels the others
+
+    def __init__(self, parent, label, index, state):
+        self.parent = parent
+        self.label = label
+        self.index = index
+        self.state = state
+
+    def isCanceled(self):
+        if self.parent.isCanceled():
+            self.state.canceled.set()
+        return self.state.canceled.is_set()
+
+    def cancel(self):
+        self.state.canceled.set()
+
+    def setProgress(self, progress):
+        with self.state.lock:
+            self.state.progress[self.index] = progress
+            self.parent.setProgress(sum(self.state.progress) / len(self.state.progress))
+
+    def progress(self):
+        return self.state.progress[self.index]
+
+    def setProgressText(self, text):
+        with self.state.lock:
+            self.parent.setProgressText("[{}] {}".format(self.label, text))
+
+    def pushInfo(self, info):
+        with self.state.lock:
+            self.parent.pushInfo("[{}] {}".format(self.label, info))
+
+    def pushCommandInfo(self, info):
+        with self.state.lock:
+            self.parent.pushCommandInfo("[{}] {}".format(self.label, info))
+
+    def pushConsoleInfo(self, info):
+        with self.state.lock:
+            self.parent.pushConsoleInfo("\n".join("[{}] {}".format(self.label, line)
+                                                  for line in info.split("\n")))
+
+    def pushDebugInfo(self, info):
+        with self.state.lock:
+            self.parent.pushDebugInfo("[{}] {}".format(self.label, info))
+
+    def reportError(self, error, fatalError=False):
+        with self.state.lock:
+            self.parent.reportError("[{}] {}".format(self.label, error), fatalError)
+
+
+class RunState:
+
+    def __init__(self, count):
+        self.lock = threading.RLock()
+        self.canceled = threading.Event()
+        self.progress = [0.0] * count
+
+
+def runSolvers(iniPaths, feedback, maxWorkers, labels=None, keepGoing=False, queued=None):
+    # runs several independent solver configurations as separate
+    # processes, returns list of per-run results in the same order or
+    # None if execution was canceled; with keepGoing a failed run does
+    # not stop the others and its result is the raised exception;
+    # queued(feedback, run) calls run() once the run may start, e.g.
+    # when its memory is reserved
+    if labels is None:
+        labels = ["run {}".format(i + 1) for i in range(len(iniPaths))]
+    maxWorkers = max(1, min(maxWorkers, len(iniPaths)))
+
+    state = RunState(len(iniPaths))
+    children = [ChildFeedback(feedback, labels[i], i, state) for i in range(len(iniPaths))]
+
+    feedback.pushInfo("Running {} solver process(es), at most {} at a time".format(len(iniPaths), maxWorkers))
+    start = time.perf_counter()
+    results = [None] * len(iniPaths)
+
+    def run(iniPath, child):
+        def solve():
+            runStart = time.perf_counter()
+            # shared warm worker serves one run at a time, so concurrent
+            # runs always start their own solver processes
+            result = circuitscapeUtils.runSolver(iniPath, child, False)
+            if result is not None:
+                result[circuitscapeUtils.TIMINGS]["wall"] = round(time.perf_counter() - runStart, 3)
+            return result
+
+        return queued(child, solve) if queued is not None else solve()
+
+    with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        futures = {executor.submit(run, iniPath, children[i]): i
+                   for i, iniPath in enumerate(iniPaths)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                if not keepGoing:
+                    state.canceled.set()
+                    raise
+                children[i].reportError(str(e))
+                results[i] = e
+                continue
+
+            if results[i] is None:
+                state.canceled.set()
+
+    if state.canceled.is_set():
+        return None
+
+    feedback.pushInfo("All {} solver process(es) finished in {:.2f} s".format(
+        len(iniPaths), time.perf_counter() - start))
+    return results
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    partitionProbe.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import json
+import time
+import shutil
+import configparser
+
+import numpy
+
+from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import focalPairs
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+# partitioned one-to-all and all-to-one runs rely on the solver treating
+# an include matrix with only the rows of the partition's sources set as
+# "solve these nodes, keep all others as grounds (or sources)"; this is
+# checked once per solver installation on a tiny grid, comparing the
+# summed partition maps with a single run
+
+PROBE_RESISTANCES = numpy.array([[1, 1, 2, 1, 1, 1],
+                                 [1, 3, 2, 1, 4, 1],
+                                 [1, 1, 1, 1, 2, 1],
+                                 [2, 1, 1, 5, 1, 1]], dtype=numpy.float64)
+
+PROBE_FOCAL = numpy.array([[1, 0, 0, 0, 0, 3],
+                           [0, 0, 0, 0, 0, 0],
+                           [0, 0, 0, 0, 0, 0],
+                           [4, 0, 0, 0, 0, 2]], dtype=numpy.float64)
+
+PROBE_PARTITIONS = 2
+
+# relative difference tolerated between the maps, ASCII grids written by
+# the solver are rounded
+PROBE_TOLERANCE = 1e-4
+
+# verdicts are checked again after this many seconds, in case the solver
+# was upgraded in a way its executable does not reveal
+PROBE_MAX_AGE = 30 * 24 * 3600
+
+GEOTRANSFORM = (0.0, 1.0, 0.0, float(PROBE_RESISTANCES.shape[0]), 0.0, -1.0)
+
+
+def probeKey(mode):
+    # verdict belongs to the solver installation and mode, reinstalling
+    # or upgrading the solver replaces its executable
+    executable = circuitscapeUtils.solverExecutable()
+    path = shutil.which(executable) or executable
+    try:
+        info = os.stat(path)
+        installed = "{}:{}".format(int(info.st_mtime), info.st_size)
+    except OSError:
+        installed = "missing"
+    return "{}|{}|{}".format(path, installed, mode)
+
+
+def readVerdicts(fileName):
+    try:
+        with open(fileName) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def writeGrid(fileName, data):
+    rasterTools.writeGrid(fileName, data.shape[1], data.shape[0], GEOTRANSFORM, "",
+                          [(0, numpy.where(data > 0, data, rasterExporter.DEFAULT_NODATA))],
+                          rasterExporter.DEFAULT_NODATA)
+    return fileName
+
+
+def probeConfiguration(directory, mode, habitatFile, focalFile, includedPairs=None):
+    iniPath = circuitscapeUtils.writeConfiguration(directory)
+    cfg = configparser.ConfigParser()
+    cfg.read(iniPath)
+
+    cfg["Circuitscape mode"]["scenario"] = mode
+    cfg["Habitat raster or graph"]["habitat_file"] = habitatFile
+    cfg["Habitat raster or graph"]["habitat_map_is_resistances"] = "True"
+
+    section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+    section["point_file"] = focalFile
+    if includedPairs is not None:
+        section["included_pairs_file"] = includedPairs
+        section["use_included_pairs"] = "True"
+
+    section = cfg["Output options"]
+    section["write_cur_maps"] = "True"
+    section["write_cum_cur_map_only"] = "True"
+    section["write_volt_maps"] = "False"
+    section["write_max_cur_maps"] = "False"
+    section["log_transform_maps"] = "False"
+    section["compress_grids"] = "False"
+    section["output_file"] = os.path.join(directory, "probe")
+
+    cfg["Calculation options"]["parallelize"] = "False"
+    cfg["Calculation options"]["max_parallel"] = "0"
+
+    with open(iniPath, "w") as f:
+        cfg.write(f)
+    return iniPath
+
+
+def cumulativeMap(directory):
+    for name in sorted(os.listdir(directory)):
+        if "_cum_curmap" in name and name.lower().endswith((".asc", ".asc.gz", ".tif", ".tiff")):
+            ds = rasterTools.openRaster(os.path.join(directory, name))
+            band = ds.GetRasterBand(1)
+            data = band.ReadAsArray().astype(numpy.float64)
+            return numpy.where(rasterTools.validMask(data, band.GetNoDataValue()), data, 0.0)
+    return None
+
+
+def runProbe(mode, workspace, feedback):
+    # returns True when partitioned runs reproduce the single run
+    directory = workspace.subdirectory("partition_probe")
+    habitatFile = writeGrid(os.path.join(directory, "resistances.asc"), PROBE_RESISTANCES)
+    focalFile = writeGrid(os.path.join(directory, "focal.asc"), PROBE_FOCAL)
+    ids = rasterTools.uniqueValues(focalFile)
+
+    runs = [(os.path.join(directory, "single"), None)]
+    for i, nodes in enumerate(focalPairs.splitNodes(ids, PROBE_PARTITIONS)):
+        runDirectory = os.path.join(directory, "partition_{}".format(i))
+        os.makedirs(runDirectory, exist_ok=True)
+        fileName = os.path.join(runDirectory, "included_pairs.txt")
+        focalPairs.writeIncludedPairs(fileName, ids, focalPairs.sourcePairs(ids, nodes), False)
+        runs.append((runDirectory, fileName))
+
+    maps = []
+    for runDirectory, includedPairs in runs:
+        os.makedirs(runDirectory, exist_ok=True)
+        iniPath = probeConfiguration(runDirectory, mode, habitatFile, focalFile, includedPairs)
+        if circuitscapeUtils.runSolver(iniPath, feedback, False, False) is None:
+            return None
+        data = cumulativeMap(runDirectory)
+        if data is None:
+            return False
+        maps.append(data)
+
+    single = maps[0]
+    partitioned = numpy.sum(maps[1:], axis=0)
+    return bool(single.any() and numpy.allclose(partitioned, single, rtol=PROBE_TOLERANCE,
+                                                 atol=PROBE_TOLERANCE * float(single.max())))
+
+
+def partitionsMatch(mode, workspace, feedback):
+    # cached verdict of the probe for the installed solver, runs the
+    # probe when there is none yet; None if canceled
+    fileName = circuitscapeUtils.partitionProbeFile()
+    key = probeKey(mode)
+    entry = readVerdicts(fileName).get(key)
+    if isinstance(entry, dict) and time.time() - entry.get("checked", 0) < PROBE_MAX_AGE:
+        return entry["verdict"]
+
+    feedback.pushInfo("Checking that partitioned {} runs reproduce a single run on a test grid".format(mode))
+    try:
+        verdict = runProbe(mode, workspace, feedback)
+    except Exception as e:
+        feedback.reportError("Partition check failed: {}".format(e))
+        return False
+    if verdict is None:
+        return None
+
+    verdicts = readVerdicts(fileName)
+    verdicts[key] = {"verdict": verdict, "checked": time.time()}
+    tmpName = "{}.{}".format(fileName, os.getpid())
+    with open(tmpName, "w") as f:
+        json.dump(verdicts, f, indent=2)
+    os.replace(tmpName, fileName)
+    return verdict
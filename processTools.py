@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    processTools.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import signal
+import subprocess
+
+# time given to the solver to exit after a polite termination request
+TERMINATE_GRACE = 5
+
+
+def processGroupArgs():
+    # start child in its own process group, so it can be torn down together
+    # with everything it spawned (shell, solver, parallel workers)
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def killProcessTree(proc):
+    if os.name == "nt":
+        if proc.poll() is not None:
+            return
+        subprocess.call(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL)
+        proc.wait()
+        return
+
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=TERMINATE_GRACE)
+    except ProcessLookupError:
+        pass
+    except subprocess.TimeoutExpired:
+        pass
+
+    # make sure nothing in the group survived, even if the direct child
+    # exited on SIGTERM
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    proc.wait()
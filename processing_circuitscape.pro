@@ -3,8 +3,37 @@ SOURCES = __init__.py \
           circuitscapeProvider.py \
           circuitscapeAlgorithm.py \
           circuitscapeUtils.py \
+          componentPruning.py \
+          corridors.py \
+          diskCache.py \
+          inputValidation.py \
+          habitatCircuit.py \
+          networkGraph.py \
+          focalPairs.py \
+          outputMerger.py \
+          pairSampling.py \
+          parallelRuns.py \
+          partitionProbe.py \
+          processTools.py \
+          progressParser.py \
+          rasterExporter.py \
+          rasterTools.py \
+          resistanceTransforms.py \
+          resourcePlanner.py \
+          solverLog.py \
+          solverWorker.py \
+          sparseSolver.py \
+          tiling.py \
+          vectorRasterizer.py \
+          workspace.py \
           pairwise.py \
           oneToAll.py \
-          advanced.py
+          advanced.py \
+          network.py \
+          multiResolution.py \
+          scenarioBatch.py \
+          transformSweep.py \
+          tiled.py \
+          calibrate.py
 
 TRANSLATIONS = i18n/processing_circuitscape_uk.ts
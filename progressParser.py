@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    progressParser.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import re
+import time
+
+PHASE_GRAPH = "graph"
+PHASE_FACTORISATION = "factorisation"
+PHASE_SOLVING = "solving"
+PHASE_OUTPUT = "output"
+
+# share of the progress bar given to each phase
+PHASE_RANGES = {PHASE_GRAPH: (0, 10),
+                PHASE_FACTORISATION: (10, 15),
+                PHASE_SOLVING: (15, 95),
+                PHASE_OUTPUT: (95, 100)}
+
+# matched against each line in this order, both Python and Julia
+# Circuitscape messages are recognized
+SOLVE_RE = re.compile(r"(?:solving|processing)\s+(?:pair|focal node|point|node|source)s?\s+(\d+)\s+of\s+(\d+)", re.I)
+TOTAL_RE = re.compile(r"total number of pair solves\s*=\s*(\d+)", re.I)
+TIMING_RE = re.compile(r"time taken to\s+(.+?)\s*=\s*([0-9.eE+-]+)\s*sec", re.I)
+PHASE_RES = ((PHASE_OUTPUT, re.compile(r"writ(?:e|ing)\b.*(?:map|output|resistance)", re.I)),
+             (PHASE_FACTORISATION, re.compile(r"cholesky|factori[sz]|preconditioner", re.I)),
+             (PHASE_GRAPH, re.compile(r"reading .*map|graph has|construct(?:ing)? graph|nodemap|"
+                                      r"resistance/conductance map has|components", re.I)))
+
+# minimum interval between ETA messages
+ETA_INTERVAL = 30
+
+
+class SolverProgressParser:
+
+    def __init__(self, feedback):
+        self.feedback = feedback
+        self.phase = None
+        self.phaseStarted = time.monotonic()
+        self.phaseTimes = {}
+        self.reportedTimes = {}
+        self.total = None
+        self.solved = 0
+        self.solveStarted = None
+        self.firstSolve = 0
+        self.lastEta = 0
+        self.progress = 0
+        self.feedback.setProgress(0)
+
+    def feed(self, line):
+        m = SOLVE_RE.search(line)
+        if m:
+            self.pairSolved(int(m.group(1)), int(m.group(2)))
+            return
+
+        m = TOTAL_RE.search(line)
+        if m:
+            self.total = int(m.group(1))
+            return
+
+        m = TIMING_RE.search(line)
+        if m:
+            try:
+                self.reportedTimes[m.group(1).strip()] = float(m.group(2))
+            except ValueError:
+                pass
+
+        for phase, regex in PHASE_RES:
+            if regex.search(line):
+                self.enterPhase(phase)
+                break
+
+    def enterPhase(self, phase):
+        if phase == self.phase:
+            return
+
+        # phases may repeat (e.g. factorisation for each component), never
+        # move progress bar backwards because of that
+        now = time.monotonic()
+        if self.phase is not None:
+            self.phaseTimes[self.phase] = self.phaseTimes.get(self.phase, 0.0) + now - self.phaseStarted
+        self.phase = phase
+        self.phaseStarted = now
+
+        self.setProgress(PHASE_RANGES[phase][0])
+
+    def pairSolved(self, current, total):
+        self.enterPhase(PHASE_SOLVING)
+        self.total = total
+
+        now = time.monotonic()
+        if self.solveStarted is None:
+            # solve i of N is announced when it starts, rate is measured
+            # from the first announcement
+            self.solveStarted = now
+            self.firstSolve = current
+        self.solved = current
+
+        start, end = PHASE_RANGES[PHASE_SOLVING]
+        fraction = (current - 1) / total if total > 0 else 0
+        self.setProgress(start + (end - start) * fraction)
+
+        done = current - self.firstSolve
+        if done > 0 and now - self.lastEta >= ETA_INTERVAL:
+            self.lastEta = now
+            rate = (now - self.solveStarted) / done
+            remaining = rate * (total - current + 1)
+            self.feedback.setProgressText("Solving {} of {}, {:.2f} s per solve, about {} remaining".format(
+                current, total, rate, formatDuration(remaining)))
+
+    def finish(self):
+        now = time.monotonic()
+        if self.phase is not None:
+            self.phaseTimes[self.phase] = self.phaseTimes.get(self.phase, 0.0) + now - self.phaseStarted
+            self.phase = None
+        self.setProgress(100)
+
+    def setProgress(self, progress):
+        if progress > self.progress:
+            self.progress = progress
+            self.feedback.setProgress(progress)
+
+    def timings(self):
+        result = {"phases": {k: round(v, 3) for k, v in self.phaseTimes.items()},
+                  "solver": dict(self.reportedTimes)}
+        if self.total is not None:
+            result["solves"] = self.total
+        return result
+
+
+def formatDuration(seconds):
+    seconds = int(seconds)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours > 0:
+        return "{}h {:02d}m".format(hours, minutes)
+    if minutes > 0:
+        return "{}m {:02d}s".format(minutes, seconds)
+    return "{}s".format(seconds)
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    rasterExporter.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy
+from osgeo import gdal, osr
+
+from qgis.core import QgsProcessingException
+
+# upper limit for the amount of raster data held in memory by a single
+# export job at any time
+BLOCK_MEMORY = 64 * 1024 * 1024
+
+DEFAULT_NODATA = -9999
+
+
+class ExportJob:
+
+    def __init__(self, source, destination, driver, options, window=None):
+        self.source = source
+        self.destination = destination
+        self.driver = driver
+        self.options = options
+        self.window = window
+        self.elapsed = 0.0
+        self.progress = 0.0
+        self.estimatedSize = 0
+
+
+def estimateSize(width, height, driver):
+    # upper bound, assumes double precision values and no compression
+    bytesPerCell = 20 if driver == "AAIGrid" else 8
+    return width * height * bytesPerCell
+
+
+def openDataset(source):
+    if isinstance(source, gdal.Dataset):
+        return source
+
+    ds = gdal.Open(source, gdal.GA_ReadOnly)
+    if ds is None:
+        raise QgsProcessingException("Can not open raster {}".format(source))
+    return ds
+
+
+def blockRows(band, width):
+    # read whole natural blocks, but never more than BLOCK_MEMORY bytes
+    itemSize = max(1, gdal.GetDataTypeSize(band.DataType) // 8)
+    blockHeight = band.GetBlockSize()[1]
+    rows = max(1, BLOCK_MEMORY // (width * max(itemSize, 8)))
+    if rows > blockHeight:
+        rows -= rows % blockHeight
+    return rows
+
+
+def iterBlocks(band, window, rows):
+    xOff, yOff, xSize, ySize = window
+    for row in range(0, ySize, rows):
+        count = min(rows, ySize - row)
+        data = band.ReadAsArray(xOff, yOff + row, xSize, count)
+        if data is None:
+            raise QgsProcessingException("Failed to read raster block at row {}".format(yOff + row))
+        yield row, data
+
+
+def windowGeoTransform(geoTransform, window):
+    xOff, yOff = window[0], window[1]
+    return (geoTransform[0] + xOff * geoTransform[1] + yOff * geoTransform[2],
+            geoTransform[1],
+            geoTransform[2],
+            geoTransform[3] + xOff * geoTransform[4] + yOff * geoTransform[5],
+            geoTransform[4],
+            geoTransform[5])
+
+
+def isIntegerType(dataType):
+    return dataType in (gdal.GDT_Byte, gdal.GDT_UInt16, gdal.GDT_Int16,
+                        gdal.GDT_UInt32, gdal.GDT_Int32)
+
+
+def writeAsciiHeader(f, width, height, geoTransform, noData):
+    f.write("ncols {}\n".format(width))
+    f.write("nrows {}\n".format(height))
+    f.write("xllcorner {!r}\n".format(geoTransform[0]))
+    f.write("yllcorner {!r}\n".format(geoTransform[3] + height * geoTransform[5]))
+    f.write("cellsize {!r}\n".format(geoTransform[1]))
+    f.write("NODATA_value {}\n".format(int(noData) if float(noData).is_integer() else noData))
+
+
+def writeAsciiGrid(band, window, geoTransform, projection, destination, progress, isCanceled):
+    xOff, yOff, xSize, ySize = window
+    noData = band.GetNoDataValue()
+    if noData is None:
+        noData = DEFAULT_NODATA
+
+    integer = isIntegerType(band.DataType)
+    fmt = "%d" if integer else "%.9g"
+
+    rows = blockRows(band, xSize)
+    with open(destination, "w") as f:
+        writeAsciiHeader(f, xSize, ySize, geoTransform, noData)
+        for row, data in iterBlocks(band, window, rows):
+            if isCanceled():
+                return False
+            numpy.savetxt(f, data, fmt=fmt, delimiter=" ")
+            progress((row + data.shape[0]) / ySize)
+
+    writeProjection(destination, projection)
+    return True
+
+
+def writeProjection(destination, projection):
+    # ESRI .prj sidecar of an ASCII grid
+    if projection:
+        srs = osr.SpatialReference()
+        if srs.ImportFromWkt(projection) == 0:
+            srs.MorphToESRI()
+            with open(os.path.splitext(destination)[0] + ".prj", "w") as f:
+                f.write(srs.ExportToWkt())
+
+
+def writeDataset(band, window, geoTransform, projection, job, progress, isCanceled):
+    xOff, yOff, xSize, ySize = window
+    driver = gdal.GetDriverByName(job.driver)
+    if driver is None:
+        raise QgsProcessingException("GDAL driver {} is not available".format(job.driver))
+
+    dst = driver.Create(job.destination, xSize, ySize, 1, band.DataType, job.options)
+    if dst is None:
+        raise QgsProcessingException("Can not create raster {}".format(job.destination))
+
+    dst.SetGeoTransform(geoTransform)
+    if projection:
+        dst.SetProjection(projection)
+
+    dstBand = dst.GetRasterBand(1)
+    noData = band.GetNoDataValue()
+    if noData is not None:
+        dstBand.SetNoDataValue(noData)
+
+    rows = blockRows(band, xSize)
+    for row, data in iterBlocks(band, window, rows):
+        if isCanceled():
+            dst = None
+            return False
+        dstBand.WriteArray(data, 0, row)
+        progress((row + data.shape[0]) / ySize)
+
+    dstBand.FlushCache()
+    dst = None
+    return True
+
+
+class GridWriter:
+    # writes a raster in a solver input format block by block, for data
+    # computed on the fly rather than copied from another raster
+
+    def __init__(self, destination, driver, options, width, height, geoTransform, projection,
+                 noData=DEFAULT_NODATA):
+        self.destination = destination
+        self.driver = driver
+        self.dataset = None
+        self.file = None
+        if driver == "AAIGrid":
+            self.file = open(destination, "w")
+            writeAsciiHeader(self.file, width, height, geoTransform, noData)
+            writeProjection(destination, projection)
+            return
+
+        gdalDriver = gdal.GetDriverByName(driver)
+        if gdalDriver is None:
+            raise QgsProcessingException("GDAL driver {} is not available".format(driver))
+        self.dataset = gdalDriver.Create(destination, width, height, 1, gdal.GDT_Float64, options)
+        if self.dataset is None:
+            raise QgsProcessingException("Can not create raster {}".format(destination))
+        self.dataset.SetGeoTransform(geoTransform)
+        if projection:
+            self.dataset.SetProjection(projection)
+        self.dataset.GetRasterBand(1).SetNoDataValue(noData)
+
+    def write(self, row, data):
+        # blocks must come in row order
+        if self.file is not None:
+            numpy.savetxt(self.file, data, fmt="%.9g", delimiter=" ")
+        else:
+            self.dataset.GetRasterBand(1).WriteArray(data, 0, row)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if self.dataset is not None:
+            self.dataset.GetRasterBand(1).FlushCache()
+            self.dataset = None
+
+
+def exportRaster(job, progress=None, isCanceled=None):
+    progress = progress or (lambda value: None)
+    isCanceled = isCanceled or (lambda: False)
+
+    start = time.perf_counter()
+    src = openDataset(job.source)
+    band = src.GetRasterBand(1)
+
+    window = job.window or (0, 0, src.RasterXSize, src.RasterYSize)
+    geoTransform = windowGeoTransform(src.GetGeoTransform(), window)
+    projection = src.GetProjection()
+
+    try:
+        if job.driver == "AAIGrid":
+            # GDAL can only CreateCopy() ASCII grids, which renders whole
+            # raster through an intermediate dataset, so stream it ourselves
+            completed = writeAsciiGrid(band, window, geoTransform, projection,
+                                       job.destination, progress, isCanceled)
+        else:
+            completed = writeDataset(band, window, geoTransform, projection,
+                                     job, progress, isCanceled)
+    except Exception:
+        removeOutput(job.destination)
+        raise
+
+    if not completed:
+        removeOutput(job.destination)
+
+    job.elapsed = time.perf_counter() - start
+    return completed
+
+
+def removeOutput(fileName):
+    base = os.path.splitext(fileName)[0]
+    for f in (fileName, base + ".prj", fileName + ".aux.xml"):
+        if os.path.exists(f):
+            os.remove(f)
+
+
+def exportRasters(jobs, feedback, maxWorkers=0):
+    if len(jobs) == 0:
+        return True
+
+    if maxWorkers <= 0:
+        maxWorkers = os.cpu_count() or 1
+    maxWorkers = min(maxWorkers, len(jobs))
+
+    lock = threading.Lock()
+    canceled = threading.Event()
+
+    def isCanceled():
+        if feedback.isCanceled():
+            canceled.set()
+        return canceled.is_set()
+
+    def progressCallback(job):
+        def update(value):
+            with lock:
+                job.progress = value
+                feedback.setProgress(100.0 * sum(j.progress for j in jobs) / len(jobs))
+        return update
+
+    feedback.pushInfo("Converting {} input raster(s) using {} thread(s)".format(len(jobs), maxWorkers))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        futures = {executor.submit(exportRaster, job, progressCallback(job), isCanceled): job
+                   for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                completed = future.result()
+            except Exception:
+                canceled.set()
+                raise
+
+            if completed:
+                feedback.pushInfo("Converted {} in {:.2f} s".format(job.destination, job.elapsed))
+
+    if canceled.is_set():
+        return False
+
+    feedback.pushInfo("Input rasters converted in {:.2f} s".format(time.perf_counter() - start))
+    return True
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    rasterTools.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import gzip
+
+import numpy
+from osgeo import gdal
+
+from qgis.core import QgsProcessingException
+
+from processing_circuitscape import rasterExporter
+
+
+def gdalPath(fileName):
+    # solver may write gzipped ASCII grids
+    if fileName.lower().endswith(".gz"):
+        return "/vsigzip/" + fileName
+    return fileName
+
+
+def openRaster(fileName):
+    if isinstance(fileName, gdal.Dataset):
+        return fileName
+
+    ds = gdal.Open(gdalPath(fileName), gdal.GA_ReadOnly)
+    if ds is None:
+        raise QgsProcessingException("Can not open raster {}".format(fileName))
+    return ds
+
+
+def iterBlocks(ds, band=1):
+    rasterBand = ds.GetRasterBand(band)
+    rows = rasterExporter.blockRows(rasterBand, ds.RasterXSize)
+    window = (0, 0, ds.RasterXSize, ds.RasterYSize)
+    for row, data in rasterExporter.iterBlocks(rasterBand, window, rows):
+        yield row, data
+
+
+def validMask(data, noData):
+    if noData is None:
+        return numpy.isfinite(data) if data.dtype.kind == "f" else numpy.ones(data.shape, dtype=bool)
+    if numpy.isnan(noData):
+        return ~numpy.isnan(data)
+    return data != noData
+
+
+def uniqueValues(fileName, positiveOnly=True):
+    ds = openRaster(fileName)
+    noData = ds.GetRasterBand(1).GetNoDataValue()
+
+    values = set()
+    for row, data in iterBlocks(ds):
+        valid = data[validMask(data, noData)]
+        if positiveOnly:
+            valid = valid[valid > 0]
+        values.update(numpy.unique(valid).tolist())
+    return sorted(values)
+
+
+def countValid(fileName):
+    # cells which become graph nodes: valid and positive
+    ds = openRaster(fileName)
+    noData = ds.GetRasterBand(1).GetNoDataValue()
+    count = 0
+    for row, data in iterBlocks(ds):
+        count += int(numpy.count_nonzero(validMask(data, noData) & (data > 0)))
+    return count
+
+
+def valueExtent(fileName, nonZero=True):
+    # smallest window (xOff, yOff, xSize, ySize) holding all cells with
+    # (non-zero) values, None if there are no such cells
+    ds = openRaster(fileName)
+    noData = ds.GetRasterBand(1).GetNoDataValue()
+
+    columns = None
+    first = last = None
+    for row, data in iterBlocks(ds):
+        present = validMask(data, noData)
+        if nonZero:
+            present &= data != 0
+        rows = numpy.nonzero(present.any(axis=1))[0]
+        if len(rows) == 0:
+            continue
+        if first is None:
+            first = row + rows[0]
+        last = row + rows[-1]
+        cols = numpy.nonzero(present.any(axis=0))[0]
+        columns = (cols[0], cols[-1]) if columns is None else (min(columns[0], cols[0]), max(columns[1], cols[-1]))
+
+    if first is None:
+        return None
+    return (int(columns[0]), int(first), int(columns[1] - columns[0] + 1), int(last - first + 1))
+
+
+def combineRasters(sources, destination, operation):
+    # cell-by-cell sum or maximum of the rasters sharing the same grid,
+    # NODATA cells are skipped as long as at least one input has a value
+    datasets = [openRaster(s) for s in sources]
+    first = datasets[0]
+    for ds in datasets[1:]:
+        if ds.RasterXSize != first.RasterXSize or ds.RasterYSize != first.RasterYSize:
+            raise QgsProcessingException("Can not combine rasters of different size: {} and {}".format(
+                sources[0], sources[datasets.index(ds)]))
+
+    band = first.GetRasterBand(1)
+    noData = band.GetNoDataValue()
+    if noData is None:
+        noData = rasterExporter.DEFAULT_NODATA
+
+    def blocks():
+        readers = [iterBlocks(ds) for ds in datasets]
+        for parts in zip(*readers):
+            row = parts[0][0]
+            result = None
+            hasValue = None
+            for ds, (r, data) in zip(datasets, parts):
+                data = data.astype(numpy.float64)
+                valid = validMask(data, ds.GetRasterBand(1).GetNoDataValue())
+                if result is None:
+                    result = numpy.where(valid, data, 0.0)
+                    hasValue = valid
+                elif operation == "max":
+                    result = numpy.where(valid & (~hasValue | (data > result)), data, result)
+                    hasValue |= valid
+                else:
+                    result += numpy.where(valid, data, 0.0)
+                    hasValue |= valid
+            yield row, numpy.where(hasValue, result, noData)
+
+    writeRaster(destination, first, blocks(), noData)
+
+
+def writeRaster(destination, template, blocks, noData, dataType=gdal.GDT_Float64):
+    # writes blocks of rows produced by a generator on the template grid,
+    # format is chosen by destination extension
+    return writeGrid(destination, template.RasterXSize, template.RasterYSize,
+                     template.GetGeoTransform(), template.GetProjection(),
+                     blocks, noData, dataType)
+
+
+def writeGrid(destination, width, height, geoTransform, projection, blocks, noData, dataType=gdal.GDT_Float64):
+    if destination.lower().endswith((".asc", ".asc.gz")):
+        opener = gzip.open if destination.lower().endswith(".gz") else open
+        with opener(destination, "wt") as f:
+            rasterExporter.writeAsciiHeader(f, width, height, geoTransform, noData)
+            for row, data in blocks:
+                numpy.savetxt(f, data, fmt="%.9g", delimiter=" ")
+        return destination
+
+    dst = createRaster(destination, width, height, geoTransform, projection, noData, dataType)
+    dstBand = dst.GetRasterBand(1)
+    for row, data in blocks:
+        dstBand.WriteArray(data, 0, row)
+    dst = None
+    return destination
+
+
+def createRaster(destination, width, height, geoTransform, projection, noData, dataType=gdal.GDT_Float64):
+    driver = gdal.GetDriverByName("GTiff")
+    dst = driver.Create(destination, width, height, 1, dataType,
+                        ["TILED=YES", "COMPRESS=LZW", "BIGTIFF=IF_SAFER"])
+    if dst is None:
+        raise QgsProcessingException("Can not create raster {}".format(destination))
+    dst.SetGeoTransform(geoTransform)
+    if projection:
+        dst.SetProjection(projection)
+    dst.GetRasterBand(1).SetNoDataValue(noData)
+    return dst
+
+
+def rasterExtension(fileName):
+    name = os.path.basename(fileName).lower()
+    for ext in (".asc.gz", ".asc", ".tif", ".tiff"):
+        if name.endswith(ext):
+            return ext
+    return os.path.splitext(name)[1]
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    resistanceTransforms.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+TRANSFORM_EXPONENTIAL = 0
+TRANSFORM_POWER = 1
+
+# integer rasters with at most this many classes are reclassified by
+# the solver instead of being transformed cell by cell
+RECLASS_MAX_CLASSES = 1024
+
+
+def valueRange(ds):
+    # smallest and largest valid value of the first band or None
+    try:
+        low, high = ds.GetRasterBand(1).ComputeRasterMinMax(False)
+    except RuntimeError:
+        return None
+    return low, high
+
+
+def scale(values, low, high):
+    # suitability scaled to 0..1
+    if high <= low:
+        return numpy.ones(values.shape)
+    return numpy.clip((values - low) / float(high - low), 0.0, 1.0)
+
+
+def transform(values, kind, shape, maxResistance):
+    # resistance from scaled suitability, maxResistance for the worst
+    # habitat down to 1 for the best one; shape bends the curve
+    if kind == TRANSFORM_POWER:
+        return 1.0 + (maxResistance - 1.0) * (1.0 - values) ** shape
+    if abs(shape) < 1e-9:
+        return maxResistance - (maxResistance - 1.0) * values
+    return maxResistance - (maxResistance - 1.0) * numpy.expm1(-shape * values) / numpy.expm1(-shape)
+
+
+def classValues(ds, limit=RECLASS_MAX_CLASSES):
+    # sorted classes of an integer raster or None when the raster is not
+    # integer or has more than limit classes
+    band = ds.GetRasterBand(1)
+    if not rasterExporter.isIntegerType(band.DataType):
+        return None
+
+    noData = band.GetNoDataValue()
+    classes = set()
+    for row, data in rasterTools.iterBlocks(ds):
+        classes.update(numpy.unique(data[rasterTools.validMask(data, noData)]).tolist())
+        if len(classes) > limit:
+            return None
+    return numpy.array(sorted(classes), dtype=numpy.float64)
+
+
+def writeReclassTable(fileName, classes, resistances):
+    # two columns, class value and resistance assigned to it
+    with open(fileName, "w") as f:
+        for value, resistance in zip(classes, resistances):
+            f.write("{:d}\t{:.9g}\n".format(int(value), resistance))
+
+
+def writeTransformed(source, window, outputs, driver, options, low, high, feedback):
+    # reads the source once, block by block, and writes every transform
+    # of each block straight into its output; outputs are
+    # (destination, kind, shape, maxResistance) tuples. Returns False
+    # when canceled
+    ds = rasterExporter.openDataset(source)
+    band = ds.GetRasterBand(1)
+    noData = band.GetNoDataValue()
+    geoTransform = rasterExporter.windowGeoTransform(ds.GetGeoTransform(), window)
+    outNoData = rasterExporter.DEFAULT_NODATA
+
+    writers = []
+    try:
+        for destination, kind, shape, maxResistance in outputs:
+            writers.append(rasterExporter.GridWriter(destination, driver, options, window[2], window[3],
+                                                     geoTransform, ds.GetProjection(), outNoData))
+
+        rows = rasterExporter.blockRows(band, window[2])
+        for row, data in rasterExporter.iterBlocks(band, window, rows):
+            if feedback.isCanceled():
+                break
+            valid = rasterTools.validMask(data, noData)
+            values = scale(data.astype(numpy.float64), low, high)
+            for writer, (destination, kind, shape, maxResistance) in zip(writers, outputs):
+                writer.write(row, numpy.where(valid, transform(values, kind, shape, maxResistance), outNoData))
+            feedback.setProgress(100.0 * (row + data.shape[0]) / window[3])
+    except Exception:
+        for writer in writers:
+            writer.close()
+            rasterExporter.removeOutput(writer.destination)
+        raise
+
+    for writer in writers:
+        writer.close()
+        if feedback.isCanceled():
+            rasterExporter.removeOutput(writer.destination)
+    return not feedback.isCanceled()
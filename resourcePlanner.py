@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    resourcePlanner.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+
+import numpy
+
+# linear resource model per solver: peak memory is baseMemory plus
+# bytesPerCell for every valid cell, wall time is setupSeconds plus
+# secondsPerCellSolve for every valid cell and solve; defaults are
+# replaced by the calibration run on the local machine
+DEFAULT_CALIBRATION = {
+    "cg+amg": {"baseMemory": 512 * 1024 * 1024,
+               "bytesPerCell": 300,
+               "setupSeconds": 5.0,
+               "secondsPerCellSolve": 2e-6},
+    "cholmod": {"baseMemory": 512 * 1024 * 1024,
+                "bytesPerCell": 2000,
+                "setupSeconds": 5.0,
+                "secondsPerCellSolve": 5e-7},
+}
+
+# share of the peak memory left when solver runs in low memory mode
+# and releases memory preemptively
+LOW_MEMORY_FACTOR = 0.6
+
+# how often waiting jobs check whether memory was released, seconds
+QUEUE_POLL_INTERVAL = 2.0
+
+# lock held by a crashed process is taken over after this many seconds
+LOCK_TIMEOUT = 30
+
+# running job touches its reservation every HEARTBEAT_INTERVAL seconds,
+# reservation is dropped when not touched for HEARTBEAT_TIMEOUT seconds;
+# protects the queue from frozen processes whatever the job length
+HEARTBEAT_INTERVAL = 30
+HEARTBEAT_TIMEOUT = 300
+
+# process start times within this many seconds are considered equal,
+# sources differ in resolution
+START_TIME_TOLERANCE = 1.0
+
+# Windows API constants
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+ERROR_INVALID_PARAMETER = 87
+STILL_ACTIVE = 259
+# seconds between 1601-01-01, the FILETIME epoch, and the Unix epoch
+FILETIME_EPOCH_OFFSET = 11644473600
+
+
+class Estimate:
+
+    def __init__(self, memory, seconds, calibrated):
+        self.memory = int(memory)
+        self.seconds = seconds
+        self.calibrated = calibrated
+
+
+def readCalibration(fileName):
+    table = {solver: dict(values) for solver, values in DEFAULT_CALIBRATION.items()}
+    calibrated = set()
+    try:
+        with open(fileName) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return table, calibrated
+
+    for solver, values in stored.get("solvers", {}).items():
+        table.setdefault(solver, {}).update(values)
+        calibrated.add(solver)
+    return table, calibrated
+
+
+def writeCalibration(fileName, table):
+    tmpName = "{}.{}".format(fileName, os.getpid())
+    with open(tmpName, "w") as f:
+        json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "solvers": table}, f, indent=2)
+    os.replace(tmpName, fileName)
+
+
+def estimate(calibrationFile, solver, validCells, solveCount, lowMemory=False):
+    table, calibrated = readCalibration(calibrationFile)
+    model = table.get(solver, DEFAULT_CALIBRATION["cg+amg"])
+
+    memory = model["baseMemory"] + model["bytesPerCell"] * validCells
+    if lowMemory:
+        memory *= LOW_MEMORY_FACTOR
+    seconds = model["setupSeconds"] + model["secondsPerCellSolve"] * validCells * max(1, solveCount)
+    return Estimate(memory, seconds, solver in calibrated)
+
+
+def fitModel(samples, default):
+    # samples are (validCells, solveCount, seconds, peakMemory) tuples,
+    # peakMemory may be None where it could not be measured
+    model = dict(default)
+
+    work = numpy.array([s[0] * max(1, s[1]) for s in samples], dtype=float)
+    seconds = numpy.array([s[2] for s in samples], dtype=float)
+    if len(samples) >= 2 and numpy.ptp(work) > 0:
+        slope, intercept = numpy.polyfit(work, seconds, 1)
+        if slope > 0:
+            model["secondsPerCellSolve"] = float(slope)
+            model["setupSeconds"] = float(max(0.0, intercept))
+
+    measured = [(s[0], s[3]) for s in samples if s[3]]
+    if len(measured) >= 2:
+        cells = numpy.array([m[0] for m in measured], dtype=float)
+        memory = numpy.array([m[1] for m in measured], dtype=float)
+        if numpy.ptp(cells) > 0:
+            slope, intercept = numpy.polyfit(cells, memory, 1)
+            # peak of the child processes only grows, flat series means
+            # an earlier, bigger process masked the measurement
+            if slope > 0:
+                model["bytesPerCell"] = float(slope)
+                model["baseMemory"] = float(max(0.0, intercept))
+
+    return model
+
+
+def peakChildMemory():
+    # largest resident set of terminated child processes, bytes
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def pidAlive(pid):
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+
+    if os.name == "nt":
+        return windowsProcessAlive(pid)
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def processStartTime(pid):
+    # creation time of the process in seconds since the epoch, None when
+    # it can not be determined
+    try:
+        import psutil
+        try:
+            return psutil.Process(pid).create_time()
+        except psutil.Error:
+            return None
+    except ImportError:
+        pass
+
+    if os.name == "nt":
+        return windowsStartTime(pid)
+    if sys.platform.startswith("linux"):
+        return linuxStartTime(pid)
+    return None
+
+
+def processMatches(pid, startTime):
+    # False when the process is gone or its id was reused by another one
+    if not pidAlive(pid):
+        return False
+    if startTime is None:
+        return True
+    current = processStartTime(pid)
+    return current is None or abs(current - startTime) <= START_TIME_TOLERANCE
+
+
+def linuxStartTime(pid):
+    try:
+        with open("/proc/{}/stat".format(pid)) as f:
+            # command name may contain spaces, fields follow its closing
+            # parenthesis; start time is the 22nd field
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/stat") as f:
+            bootTime = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+    except (OSError, IndexError, ValueError, StopIteration):
+        return None
+    return bootTime + int(fields[19]) / os.sysconf("SC_CLK_TCK")
+
+
+def windowsProcess(pid):
+    import ctypes
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    return kernel32, handle
+
+
+def windowsProcessAlive(pid):
+    import ctypes
+    kernel32, handle = windowsProcess(pid)
+    if not handle:
+        # processes of other users can not be opened but do exist
+        return kernel32.GetLastError() != ERROR_INVALID_PARAMETER
+    try:
+        exitCode = ctypes.c_ulong()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exitCode)):
+            return True
+        return exitCode.value == STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def windowsStartTime(pid):
+    import ctypes
+    kernel32, handle = windowsProcess(pid)
+    if not handle:
+        return None
+    try:
+        # FILETIME structures, 100 ns intervals
+        creation, exited, kernel, user = (ctypes.c_ulonglong() for i in range(4))
+        if not kernel32.GetProcessTimes(handle, ctypes.byref(creation), ctypes.byref(exited),
+                                        ctypes.byref(kernel), ctypes.byref(user)):
+            return None
+        return creation.value / 1e7 - FILETIME_EPOCH_OFFSET
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+class MemoryQueue:
+    # host-wide queue of solver runs: each run reserves its estimated
+    # memory in a shared directory and waits until reservations of all
+    # running jobs, from any process, fit into the budget
+
+    LOCK = "queue.lock"
+
+    def __init__(self, directory, budget):
+        self.directory = directory
+        self.budget = budget
+        os.makedirs(directory, exist_ok=True)
+
+    def reservations(self):
+        active = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path) as f:
+                    reservation = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if not processMatches(reservation.get("pid", 0), reservation.get("created")):
+                # job died without releasing its reservation
+                self.remove(entry.path)
+                continue
+            try:
+                beat = os.path.getmtime(entry.path)
+            except OSError:
+                continue
+            if time.time() - beat > HEARTBEAT_TIMEOUT:
+                # owner is frozen and stopped refreshing the reservation
+                self.remove(entry.path)
+                continue
+            active.append(reservation)
+        return active
+
+    def acquire(self, size, feedback, label=""):
+        # returns reservation file name or None if canceled while waiting,
+        # keep it alive with heartbeat() while the job runs
+        fileName = os.path.join(self.directory, "{}_{}.json".format(os.getpid(), uuid.uuid4().hex))
+        announced = False
+        while True:
+            if feedback.isCanceled():
+                return None
+
+            with self.locked():
+                active = self.reservations()
+                reserved = sum(r["bytes"] for r in active)
+                # a job bigger than the budget still runs when alone,
+                # admission control decides whether it may run at all
+                if not active or reserved + size <= self.budget:
+                    reservation = {"pid": os.getpid(), "created": processStartTime(os.getpid()),
+                                   "bytes": size, "label": label, "started": time.time()}
+                    with open(fileName, "w") as f:
+                        json.dump(reservation, f)
+                    return fileName
+
+            if not announced:
+                feedback.pushInfo("Waiting for memory: {} MB requested, {} MB reserved by {} running job(s), "
+                                  "budget {} MB".format(size // 1048576, reserved // 1048576, len(active),
+                                                        self.budget // 1048576))
+                announced = True
+            time.sleep(QUEUE_POLL_INTERVAL)
+
+    def heartbeat(self, fileName):
+        return Heartbeat(fileName)
+
+    def release(self, fileName):
+        if fileName is not None:
+            self.remove(fileName)
+
+    def remove(self, fileName):
+        try:
+            os.remove(fileName)
+        except OSError:
+            pass
+
+    def locked(self):
+        return QueueLock(os.path.join(self.directory, self.LOCK))
+
+
+class Heartbeat:
+    # refreshes modification time of the reservation from a background
+    # thread for as long as the job runs
+
+    def __init__(self, fileName, interval=HEARTBEAT_INTERVAL):
+        self.fileName = fileName
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.beat, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.stopped.set()
+        self.thread.join()
+        return False
+
+    def beat(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                os.utime(self.fileName)
+            except OSError:
+                pass
+
+
+class QueueLock:
+
+    def __init__(self, fileName):
+        self.fileName = fileName
+
+    def __enter__(self):
+        while True:
+            try:
+                fd = os.open(self.fileName, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.fileName) > LOCK_TIMEOUT:
+                        os.remove(self.fileName)
+                        continue
+                except OSError:
+                    continue
+                time.sleep(0.05)
+
+    def __exit__(self, excType, excValue, traceback):
+        try:
+            os.remove(self.fileName)
+        except OSError:
+            pass
+        return False
@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    scenarioBatch.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import re
+import csv
+import configparser
+
+from qgis.core import (QgsProcessing,
+                       QgsRasterLayer,
+                       QgsProcessingParameterRasterLayer,
+                       QgsProcessingParameterMultipleLayers,
+                       QgsProcessingParameterFile,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterString,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingOutputFile
+                      )
+from processing.core.ProcessingConfig import ProcessingConfig
+
+from processing_circuitscape.circuitscapeAlgorithm import CircuitscapeAlgorithm
+from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import inputValidation
+from processing_circuitscape import parallelRuns
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+# files picked up from the scenario folder
+RASTER_EXTENSIONS = (".tif", ".tiff", ".asc", ".asc.gz", ".img", ".vrt")
+
+
+class ScenarioBatch(CircuitscapeAlgorithm):
+
+    RESISTANCE_MAP = "RESISTANCE_MAP"
+    SCENARIOS = "SCENARIOS"
+    SCENARIO_FOLDER = "SCENARIO_FOLDER"
+    IS_CONDUCTANCES = "IS_CONDUCTANCES"
+    MODE = "MODE"
+    FOCAL_NODE = "FOCAL_NODE"
+    WRITE_CURRENT_MAP = "WRITE_CURRENT_MAP"
+    WRITE_VOLTAGE_MAP = "WRITE_VOLTAGE_MAP"
+    MASK = "MASK"
+    SOLVER = "SOLVER"
+    MAX_PARALLEL = "MAX_PARALLEL"
+    BASENAME = "BASENAME"
+    DIRECTORY = "DIRECTORY"
+    SUMMARY = "SUMMARY"
+
+    ROI_PARAMETERS = (FOCAL_NODE, MASK)
+    INPUT_ROLES = {FOCAL_NODE: inputValidation.ROLE_FOCAL}
+
+    def name(self):
+        return "scenariobatch"
+
+    def displayName(self):
+        return self.tr("Scenario batch")
+
+    def group(self):
+        return self.tr("Circuitscape")
+
+    def groupId(self):
+        return "circuitscape"
+
+    def __init__(self):
+        super().__init__()
+
+    def initAlgorithm(self, config=None):
+        self.modes = ((self.tr("Pairwise"), "pairwise"),
+                      (self.tr("One-to-all"), "one-to-all"),
+                      (self.tr("All-to-one"), "all-to-one"))
+
+        self.addParameter(QgsProcessingParameterRasterLayer(self.RESISTANCE_MAP,
+                                                            self.tr("Base resistance map (first scenario, defines the grid)")))
+        self.addParameter(QgsProcessingParameterMultipleLayers(self.SCENARIOS,
+                                                               self.tr("Additional resistance maps"),
+                                                               QgsProcessing.TypeRaster,
+                                                               optional=True))
+        self.addParameter(QgsProcessingParameterFile(self.SCENARIO_FOLDER,
+                                                     self.tr("Folder with additional resistance maps"),
+                                                     QgsProcessingParameterFile.Folder,
+                                                     optional=True))
+        self.addParameter(QgsProcessingParameterBoolean(self.IS_CONDUCTANCES,
+                                                        self.tr("Data represent conductances instead of resistances"),
+                                                        False))
+        self.addParameter(QgsProcessingParameterEnum(self.MODE,
+                                                     self.tr("Mode"),
+                                                     options=[i[0] for i in self.modes],
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterRasterLayer(self.FOCAL_NODE,
+                                                            self.tr("Focal node location")))
+        self.addParameter(QgsProcessingParameterBoolean(self.WRITE_CURRENT_MAP,
+                                                        self.tr("Create current map"),
+                                                        True))
+        self.addParameter(QgsProcessingParameterBoolean(self.WRITE_VOLTAGE_MAP,
+                                                        self.tr("Create voltage map"),
+                                                        False))
+        self.addParameter(QgsProcessingParameterRasterLayer(self.MASK,
+                                                            self.tr("Mask raster"),
+                                                            optional=True))
+        self.addParameter(QgsProcessingParameterEnum(self.SOLVER,
+                                                     self.tr("Solver"),
+                                                     options=self.solvers(),
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterNumber(self.MAX_PARALLEL,
+                                                       self.tr("Maximum number of scenarios solved at once (0 = automatic)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       0,
+                                                       minValue=0))
+        self.addParameter(QgsProcessingParameterString(self.BASENAME,
+                                                       self.tr("Summary table basename"),
+                                                       "scenarios"))
+
+        self.addParameter(QgsProcessingParameterFolderDestination(self.DIRECTORY,
+                                                                  self.tr("Output directory")))
+
+        self.addOutput(QgsProcessingOutputFile(self.SUMMARY, self.tr("Scenario summary table")))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        useConductance = str(not self.parameterAsBool(parameters, self.IS_CONDUCTANCES, context))
+        mode = self.modes[self.parameterAsEnum(parameters, self.MODE, context)][1]
+        writeCurrent = str(self.parameterAsBool(parameters, self.WRITE_CURRENT_MAP, context))
+        writeVoltage = str(self.parameterAsBool(parameters, self.WRITE_VOLTAGE_MAP, context))
+        maxWorkers = self.parameterAsInt(parameters, self.MAX_PARALLEL, context)
+
+        baseName = self.parameterAsString(parameters, self.BASENAME, context)
+        directory = self.parameterAsString(parameters, self.DIRECTORY, context)
+
+        scenarios = self.scenarioLayers(parameters, context, feedback)
+        feedback.pushInfo(self.tr("Running {} scenario(s) against shared focal nodes{}").format(
+            len(scenarios), self.tr(" and mask") if self.parameterAsRasterLayer(parameters, self.MASK, context) else ""))
+
+        with self.createWorkspace(feedback) as workspace:
+            # focal nodes, mask and the base map are converted once
+            if not self.prepareInputs(parameters, context, feedback):
+                return {}
+            invalid = self.exportScenarios(scenarios[1:], parameters, context, feedback)
+            if invalid is None:
+                return {}
+
+            cfg = self.sharedConfiguration(mode, useConductance, writeCurrent, writeVoltage,
+                                           parameters, context, feedback)
+            runs = []
+            failures = {}
+            names = set()
+            for layer in scenarios:
+                name = scenarioName(layer.name(), names)
+                if layer.source() in invalid:
+                    failures[name] = invalid[layer.source()]
+                    runs.append((name, layer.source(), None))
+                    continue
+                runs.append((name, layer.source(),
+                             {"Habitat raster or graph": {"habitat_file": self.exportedLayers[layer.source()]}}))
+
+            return self.solveScenarios(cfg, runs, directory, baseName, maxWorkers,
+                                       scenarios[0].width() * scenarios[0].height(), feedback, failures)
+
+    def scenarioLayers(self, parameters, context, feedback):
+        layers = [self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context)]
+        layers.extend(self.parameterAsLayerList(parameters, self.SCENARIOS, context))
+
+        folder = self.parameterAsFile(parameters, self.SCENARIO_FOLDER, context)
+        if folder:
+            for entry in sorted(os.listdir(folder)):
+                path = os.path.join(folder, entry)
+                if not os.path.isfile(path) or not entry.lower().endswith(RASTER_EXTENSIONS):
+                    continue
+                layer = QgsRasterLayer(path, os.path.splitext(entry)[0], "gdal")
+                if not layer.isValid():
+                    feedback.reportError(self.tr("Skipping {}, not a valid raster").format(path))
+                    continue
+                layers.append(layer)
+
+        # the same map given twice would only be solved twice
+        unique = []
+        seen = set()
+        for layer in layers:
+            if layer.source() not in seen:
+                seen.add(layer.source())
+                unique.append(layer)
+        return unique
+
+    def exportScenarios(self, layers, parameters, context, feedback):
+        # converts additional resistance maps with the window and checks
+        # used for the shared inputs; returns reasons of scenarios which
+        # can not be solved by source, or None if canceled
+        reference = self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context)
+        validate = ProcessingConfig.getSetting(circuitscapeUtils.VALIDATE_INPUTS)
+        autoAlign = ProcessingConfig.getSetting(circuitscapeUtils.AUTO_ALIGN)
+        role = self.inputRole(self.RESISTANCE_MAP, parameters, context)
+        window = self.cropExtent
+
+        self.pendingExports = {}
+        jobs = []
+        invalid = {}
+        for i, layer in enumerate(layers):
+            if feedback.isCanceled():
+                return None
+            source = layer.source()
+            if source in self.exportedLayers:
+                continue
+
+            readFrom = None
+            problems = inputValidation.alignmentProblems(layer, reference)
+            if problems and autoAlign and layer.providerType() == "gdal":
+                readFrom = inputValidation.warpedView(source, reference,
+                                                      self.workspace.fileName("scenario_{}.vrt".format(i)))
+                feedback.pushInfo(self.tr("{} is resampled on the base resistance map grid: {}").format(
+                    layer.name(), "; ".join(problems)))
+            elif problems:
+                invalid[source] = "not aligned with the base resistance map: {}".format("; ".join(problems))
+                feedback.reportError(self.tr("{} is skipped, {}").format(layer.name(), invalid[source]))
+                continue
+
+            if validate:
+                problems = inputValidation.validateValues(readFrom or source, role, layer.name())
+                if problems:
+                    invalid[source] = "; ".join(problems)
+                    feedback.reportError(self.tr("{} is skipped: {}").format(layer.name(), invalid[source]))
+                    continue
+
+            if window is None and readFrom is None and self.isNativeFormat(layer):
+                self.exportedLayers[source] = source
+                continue
+
+            job = self.exportRasterLayer(source, window, readFrom)
+            if job is not None:
+                width, height = (window[2], window[3]) if window else (layer.width(), layer.height())
+                job.estimatedSize = rasterExporter.estimateSize(width, height, job.driver)
+                jobs.append(job)
+
+        try:
+            self.checkFreeSpace(jobs)
+            threads = int(ProcessingConfig.getSetting(circuitscapeUtils.EXPORT_THREADS) or 0)
+            completed = rasterExporter.exportRasters(jobs, feedback, threads)
+        except Exception:
+            self.discardExports()
+            raise
+
+        if not completed:
+            self.discardExports()
+            return None
+
+        self.commitExports(feedback)
+        return invalid
+
+    def sharedConfiguration(self, mode, useConductance, writeCurrent, writeVoltage, parameters, context, feedback):
+        iniPath = circuitscapeUtils.writeConfiguration(self.workspace.subdirectory("shared"))
+        cfg = configparser.ConfigParser()
+        cfg.read(iniPath)
+
+        cfg["Circuitscape mode"]["scenario"] = mode
+        cfg["Habitat raster or graph"]["habitat_map_is_resistances"] = useConductance
+
+        section = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+        section["point_file"] = self.exportedParameter(parameters, self.FOCAL_NODE, context)
+
+        mask = self.exportedParameter(parameters, self.MASK, context)
+        if mask is not None:
+            cfg["Mask file"]["mask_file"] = mask
+            cfg["Mask file"]["use_mask"] = "True"
+
+        cfg["Output options"]["write_cur_maps"] = writeCurrent
+        cfg["Output options"]["write_volt_maps"] = writeVoltage
+
+        self.configureSolver(cfg, parameters, context, feedback, 2)
+
+        # scenarios already keep the cores busy
+        cfg["Calculation options"]["parallelize"] = "False"
+        cfg["Calculation options"]["max_parallel"] = "0"
+        return cfg
+
+    def writeScenarioConfiguration(self, cfg, name, options, directory):
+        # every scenario writes its outputs into its own subdirectory
+        outputDirectory = os.path.join(directory, name)
+        os.makedirs(outputDirectory, exist_ok=True)
+
+        for section, values in options.items():
+            for key, value in values.items():
+                cfg[section][key] = value
+        cfg["Output options"]["output_file"] = os.path.join(outputDirectory, name)
+
+        iniPath = os.path.join(self.workspace.subdirectory(name), "{}.ini".format(name))
+        with open(iniPath, "w") as f:
+            cfg.write(f)
+        return iniPath
+
+    def solveScenarios(self, cfg, scenarios, directory, baseName, maxWorkers, cellCount, feedback, failures=None):
+        # scenarios are (name, description, options) tuples, options map
+        # configuration sections to values set for that scenario only;
+        # failures map names of scenarios which are not solved to the
+        # reason reported in the summary
+        failures = failures or {}
+        names = [name for name, description, options in scenarios if name not in failures]
+
+        # every scenario reserves memory of one job on the full grid
+        focalCount = len(rasterTools.uniqueValues(
+            cfg["Options for pairwise and one-to-all and all-to-one modes"]["point_file"]))
+        solveCount = focalCount
+        if cfg["Circuitscape mode"]["scenario"] == "pairwise":
+            solveCount = focalCount * (focalCount - 1) // 2
+        estimate = self.planRun(cfg, feedback, solveCount, cellCount)
+
+        iniPaths = [self.writeScenarioConfiguration(cfg, name, options, directory)
+                    for name, description, options in scenarios if name not in failures]
+
+        if maxWorkers == 0:
+            maxWorkers = int(ProcessingConfig.getSetting(circuitscapeUtils.MAX_PARALLEL) or 0)
+        workers, reason = circuitscapeUtils.parallelWorkers(circuitscapeUtils.PARALLEL_AUTO, maxWorkers, cellCount)
+        feedback.pushInfo(self.tr("Solving {} scenario(s), {} at a time: {}").format(len(iniPaths), workers, reason))
+
+        def queued(child, run):
+            return self.runQueued(estimate, child, run)
+
+        solved = parallelRuns.runSolvers(iniPaths, feedback, workers, names, keepGoing=True, queued=queued)
+        if solved is None:
+            return {}
+        solved = dict(zip(names, solved))
+        runs = [solved[name] if name in solved else failures[name] for name, description, options in scenarios]
+
+        summaryFile = os.path.join(directory, "{}_summary.csv".format(baseName))
+        failed = self.writeSummary(summaryFile, scenarios, runs, directory)
+        if failed:
+            feedback.reportError(self.tr("{} of {} scenario(s) failed, see {}").format(
+                failed, len(runs), summaryFile))
+        feedback.pushInfo(self.tr("Scenario summary written to {}").format(summaryFile))
+
+        return {self.DIRECTORY: directory,
+                self.SUMMARY: summaryFile,
+                circuitscapeUtils.TIMINGS: {name: run[circuitscapeUtils.TIMINGS]
+                                            for name, run in solved.items() if isinstance(run, dict)}}
+
+    def writeSummary(self, fileName, scenarios, runs, directory):
+        # one row per scenario with its status, wall time and outputs,
+        # returns number of failed scenarios
+        failed = 0
+        with open(fileName, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["scenario", "source", "status", "seconds", "outputs"])
+            for (name, description, options), run in zip(scenarios, runs):
+                if isinstance(run, dict):
+                    status = "ok"
+                    seconds = run[circuitscapeUtils.TIMINGS].get("wall", "")
+                else:
+                    status = "failed: {}".format(run)
+                    seconds = ""
+                    failed += 1
+
+                outputDirectory = os.path.join(directory, name)
+                outputs = []
+                if os.path.isdir(outputDirectory):
+                    outputs = sorted(os.path.join(outputDirectory, entry) for entry in os.listdir(outputDirectory))
+                writer.writerow([name, description, status, seconds, ";".join(outputs)])
+        return failed
+
+
+def scenarioName(label, taken):
+    # file-system safe name derived from the label, unique among taken
+    # names which it is added to
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_.") or "scenario"
+    candidate = name
+    i = 2
+    while candidate in taken:
+        candidate = "{}_{}".format(name, i)
+        i += 1
+    taken.add(candidate)
+    return candidate
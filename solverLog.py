@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    solverLog.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+import threading
+from collections import deque
+
+# console is updated when either limit is reached, whichever comes first
+FLUSH_INTERVAL = 0.5
+FLUSH_LINES = 500
+
+# number of most recent lines kept in memory
+TAIL_LINES = 1000
+
+# log file is rotated when it grows over MAX_LOG_SIZE bytes; logs of
+# earlier runs and rotated parts are kept as fileName.1 ... fileName.N
+MAX_LOG_SIZE = 64 * 1024 * 1024
+LOG_BACKUPS = 3
+
+
+class SolverLog:
+
+    def __init__(self, feedback, fileName=None, tailLines=TAIL_LINES, maxSize=MAX_LOG_SIZE, backups=LOG_BACKUPS):
+        self.feedback = feedback
+        self.fileName = fileName
+        self.maxSize = maxSize
+        self.backups = backups
+        self.lines = deque(maxlen=tailLines)
+        self.pending = []
+        self.lineCount = 0
+        self.lastFlush = time.monotonic()
+        self.lock = threading.RLock()
+        self.spool = None
+        self.spoolSize = 0
+        if fileName:
+            self.rotate()
+
+    def write(self, line):
+        with self.lock:
+            line = line.rstrip("\r\n")
+            self.lines.append(line)
+            self.pending.append(line)
+            self.lineCount += 1
+            if self.spool is not None:
+                if self.spoolSize > 0 and self.spoolSize + len(line) + 1 > self.maxSize:
+                    self.rotate()
+                self.spool.write(line)
+                self.spool.write("\n")
+                self.spoolSize += len(line) + 1
+
+            if len(self.pending) >= FLUSH_LINES:
+                self.flush()
+            else:
+                self.poll()
+
+    def poll(self):
+        # called periodically, so quiet solver does not keep last lines
+        # waiting in the buffer
+        with self.lock:
+            if self.pending and time.monotonic() - self.lastFlush >= FLUSH_INTERVAL:
+                self.flush()
+
+    def flush(self):
+        with self.lock:
+            if self.pending:
+                # one console update per batch instead of one per line
+                self.feedback.pushConsoleInfo("\n".join(self.pending))
+                self.pending = []
+            if self.spool is not None:
+                self.spool.flush()
+            self.lastFlush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            if self.spool is not None:
+                self.spool.close()
+                self.spool = None
+
+    def rotate(self):
+        # starts a new log file, shifting existing ones to numbered backups
+        with self.lock:
+            if self.spool is not None:
+                self.spool.close()
+
+            backups = ["{}.{}".format(self.fileName, i) for i in range(1, self.backups + 1)]
+            for source, destination in reversed(list(zip([self.fileName] + backups, backups))):
+                if os.path.exists(source):
+                    os.replace(source, destination)
+
+            self.spool = open(self.fileName, "w")
+            self.spoolSize = 0
+
+    def tail(self):
+        with self.lock:
+            return list(self.lines)
+
+    def summary(self):
+        text = "\n".join(self.tail())
+        if self.lineCount > len(self.lines):
+            text = "... {} earlier line(s) omitted, see {}\n{}".format(
+                self.lineCount - len(self.lines), self.fileName, text)
+        return text
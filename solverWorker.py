@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    solverWorker.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import time
+import queue
+import shlex
+import atexit
+import threading
+import subprocess
+
+from processing_circuitscape import processTools
+
+# Worker protocol: one command per line on the worker stdin, answered on
+# its stdout.
+#   PING        -> PONG
+#   RUN <ini>   -> solver output lines, then "@@CIRCUITSCAPE_DONE <code>"
+#   QUIT        -> worker exits
+# Worker prints READY once it is initialized and able to accept jobs.
+READY = "@@CIRCUITSCAPE_READY"
+DONE = "@@CIRCUITSCAPE_DONE"
+PONG = "PONG"
+
+START_TIMEOUT = 600
+PING_TIMEOUT = 10
+POLL_INTERVAL = 0.2
+
+sharedWorkerInstance = None
+sharedWorkerLock = threading.Lock()
+
+
+class WorkerError(Exception):
+    pass
+
+
+class SolverWorker:
+
+    def __init__(self, command, idleTimeout=0):
+        self.command = command
+        self.idleTimeout = idleTimeout
+        self.proc = None
+        self.lines = None
+        self.reader = None
+        self.idleTimer = None
+        self.lock = threading.RLock()
+
+    def isRunning(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        with self.lock:
+            if self.isRunning():
+                return
+
+            args = shlex.split(self.command) if isinstance(self.command, str) else list(self.command)
+            self.proc = subprocess.Popen(args,
+                                         stdin=subprocess.PIPE,
+                                         stdout=subprocess.PIPE,
+                                         stderr=subprocess.STDOUT,
+                                         universal_newlines=True,
+                                         bufsize=1,
+                                         **processTools.processGroupArgs())
+            self.lines = queue.Queue()
+            self.reader = threading.Thread(target=self.readOutput,
+                                           args=(self.proc, self.lines),
+                                           daemon=True)
+            self.reader.start()
+
+            # worker may spend a long time loading and compiling the solver,
+            # everything it prints meanwhile is just startup chatter
+            if not self.waitFor(lambda line: line.strip() == READY, START_TIMEOUT):
+                self.kill()
+                raise WorkerError("Solver worker did not start: {}".format(self.command))
+
+    def readOutput(self, proc, lines):
+        for line in iter(proc.stdout.readline, ""):
+            lines.put(line)
+        lines.put(None)
+
+    def waitFor(self, predicate, timeout, callback=None):
+        waited = 0.0
+        while waited < timeout:
+            try:
+                line = self.lines.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                waited += POLL_INTERVAL
+                continue
+
+            if line is None:
+                return False
+            if predicate(line):
+                return True
+            if callback is not None:
+                callback(line)
+        return False
+
+    def send(self, command):
+        self.proc.stdin.write("{}\n".format(command))
+        self.proc.stdin.flush()
+
+    def healthCheck(self):
+        with self.lock:
+            if not self.isRunning():
+                return False
+            try:
+                self.send("PING")
+            except OSError:
+                return False
+            return self.waitFor(lambda line: line.strip() == PONG, PING_TIMEOUT)
+
+    def run(self, iniPath, callback, isCanceled, timeout=0, idle=None):
+        with self.lock:
+            self.cancelIdleTimer()
+            if not self.healthCheck():
+                self.kill()
+                self.start()
+
+            self.send("RUN {}".format(iniPath))
+            started = time.monotonic()
+
+            returnCode = None
+            while returnCode is None:
+                if isCanceled():
+                    # there is no way to interrupt a solve in progress,
+                    # so throw the worker away, it will be restarted lazily
+                    self.kill()
+                    return None
+
+                if timeout > 0 and time.monotonic() - started > timeout:
+                    self.kill()
+                    raise WorkerError("Circuitscape did not finish in {} minute(s) "
+                                      "and solver worker was terminated".format(timeout // 60))
+
+                try:
+                    line = self.lines.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    if idle is not None:
+                        idle()
+                    continue
+
+                if line is None:
+                    self.kill()
+                    raise WorkerError("Solver worker exited unexpectedly")
+
+                if line.startswith(DONE):
+                    parts = line.split()
+                    returnCode = int(parts[1]) if len(parts) > 1 else 0
+                else:
+                    callback(line)
+
+            self.startIdleTimer()
+            return returnCode
+
+    def startIdleTimer(self):
+        if self.idleTimeout > 0:
+            self.idleTimer = threading.Timer(self.idleTimeout, self.shutdown)
+            self.idleTimer.daemon = True
+            self.idleTimer.start()
+
+    def cancelIdleTimer(self):
+        if self.idleTimer is not None:
+            self.idleTimer.cancel()
+            self.idleTimer = None
+
+    def shutdown(self):
+        with self.lock:
+            self.cancelIdleTimer()
+            if not self.isRunning():
+                return
+
+            try:
+                self.send("QUIT")
+                self.proc.wait(timeout=PING_TIMEOUT)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            self.kill()
+
+    def kill(self):
+        with self.lock:
+            self.cancelIdleTimer()
+            if self.proc is None:
+                return
+
+            processTools.killProcessTree(self.proc)
+            self.proc.stdin.close()
+            self.proc.stdout.close()
+            self.proc = None
+
+
+def sharedWorker(command, idleTimeout):
+    global sharedWorkerInstance
+
+    with sharedWorkerLock:
+        if sharedWorkerInstance is not None and sharedWorkerInstance.command != command:
+            sharedWorkerInstance.shutdown()
+            sharedWorkerInstance = None
+
+        if sharedWorkerInstance is None:
+            sharedWorkerInstance = SolverWorker(command, idleTimeout)
+
+        sharedWorkerInstance.idleTimeout = idleTimeout
+        return sharedWorkerInstance
+
+
+def shutdownSharedWorker():
+    global sharedWorkerInstance
+
+    with sharedWorkerLock:
+        if sharedWorkerInstance is not None:
+            sharedWorkerInstance.shutdown()
+            sharedWorkerInstance = None
+
+
+atexit.register(shutdownSharedWorker)
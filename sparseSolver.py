@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    sparseSolver.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import time
+
+import numpy
+
+from processing_circuitscape import focalPairs
+from processing_circuitscape import habitatCircuit
+from processing_circuitscape import networkGraph
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+
+def isAvailable():
+    return habitatCircuit.isAvailable()
+
+
+def unsupportedReason(cfg, maxCells):
+    # returns why the configuration needs the external solver, None when
+    # it can be solved in process
+    if not isAvailable():
+        return "SciPy is not available"
+
+    mode = cfg["Circuitscape mode"]
+    if mode.get("data_type", "raster") != "raster":
+        return "habitat is not a raster"
+    if mode.get("scenario") not in ("pairwise", "one-to-all"):
+        return "{} mode is not supported".format(mode.get("scenario"))
+
+    unsupported = (("Short circuit regions (aka polygons)", "use_polygons", "short-circuit regions"),
+                   ("Options for reclassification of habitat data", "use_reclass_table", "reclassification"),
+                   ("Options for one-to-all and all-to-one modes", "use_variable_source_strengths",
+                    "variable source strengths"),
+                   ("Output options", "log_transform_maps", "log-transformed maps"),
+                   ("Output options", "compress_grids", "compressed grids"))
+    for section, option, description in unsupported:
+        if cfg.getboolean(section, option, fallback=False):
+            return "{} are not supported".format(description)
+
+    options = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+    if mode["scenario"] == "one-to-all" and options.getboolean("use_included_pairs", fallback=False):
+        return "focal node pairs are not supported in one-to-all mode"
+    if options.get("point_file", "").lower().endswith(".txt"):
+        return "focal nodes are not a raster"
+
+    ds = rasterTools.openRaster(cfg["Habitat raster or graph"]["habitat_file"])
+    cells = ds.RasterXSize * ds.RasterYSize
+    if cells > maxCells:
+        return "{} cells exceed the limit of {}".format(cells, maxCells)
+    return None
+
+
+class OutputWriter:
+
+    def __init__(self, cfg, circuit, template):
+        options = cfg["Output options"]
+        self.basePath = options["output_file"]
+        self.writeCurrents = options.getboolean("write_cur_maps")
+        self.writeVoltages = options.getboolean("write_volt_maps")
+        self.cumulativeOnly = options.getboolean("write_cum_cur_map_only", fallback=False)
+        self.writeMaximum = options.getboolean("write_max_cur_maps", fallback=False)
+        self.zeroFocal = options.getboolean("set_focal_node_currents_to_zero", fallback=False)
+
+        self.circuit = circuit
+        self.template = template
+        nodes = circuit.graph.nodes
+        self.cells = nodes > 0
+        self.cellNodes = numpy.searchsorted(circuit.nodeIds, nodes[self.cells])
+        self.focalCells = self.cells & (nodes <= circuit.graph.focalIds.max(initial=0))
+
+        self.cumulative = numpy.zeros(circuit.size)
+        self.maximum = numpy.zeros(circuit.size)
+
+    def addSolve(self, suffix, voltages):
+        if not self.writeCurrents and not self.writeVoltages:
+            return
+
+        if self.writeCurrents:
+            currents = self.circuit.nodeCurrents(voltages)
+            self.cumulative += currents
+            numpy.maximum(self.maximum, currents, out=self.maximum)
+            if not self.cumulativeOnly:
+                self.writeMap("_curmap_{}.asc".format(suffix), currents, self.zeroFocal)
+
+        if self.writeVoltages:
+            self.writeMap("_voltmap_{}.asc".format(suffix), voltages)
+
+    def finish(self):
+        if self.writeCurrents:
+            self.writeMap("_cum_curmap.asc", self.cumulative, self.zeroFocal)
+            if self.writeMaximum:
+                self.writeMap("_max_curmap.asc", self.maximum, self.zeroFocal)
+
+    def writeMap(self, suffix, values, zeroFocal=False):
+        noData = rasterExporter.DEFAULT_NODATA
+        data = numpy.full(self.cells.shape, noData, dtype=numpy.float64)
+        data[self.cells] = values[self.cellNodes]
+        if zeroFocal:
+            data[self.focalCells] = 0.0
+        rasterTools.writeRaster(self.basePath + suffix, self.template, [(0, data)], noData)
+
+
+def solve(cfg, feedback, log):
+    # returns timings in the form reported for the external solver or
+    # None if execution was canceled
+    started = time.perf_counter()
+    habitat = cfg["Habitat raster or graph"]
+    connection = cfg["Connection scheme for raster habitat data"]
+    options = cfg["Options for pairwise and one-to-all and all-to-one modes"]
+    mask = cfg["Mask file"]["mask_file"] if cfg.getboolean("Mask file", "use_mask", fallback=False) else None
+
+    template, graph = networkGraph.buildGraph(habitat["habitat_file"],
+                                              options["point_file"],
+                                              not habitat.getboolean("habitat_map_is_resistances"),
+                                              connection.getboolean("connect_four_neighbors_only"),
+                                              connection.getboolean("connect_using_avg_resistances"),
+                                              mask)
+    circuit = habitatCircuit.Circuit(graph)
+    ids = rasterTools.uniqueValues(options["point_file"])
+    log.write("Graph has {} nodes, {} edges and {} components".format(
+        circuit.size, len(circuit.weights), circuit.componentCount))
+    phases = {"graph": time.perf_counter() - started}
+
+    writer = OutputWriter(cfg, circuit, template)
+    if cfg["Circuitscape mode"]["scenario"] == "pairwise":
+        if options.getboolean("use_included_pairs", fallback=False):
+            pairs = focalPairs.readIncludedPairs(options["included_pairs_file"], ids)
+        else:
+            pairs = focalPairs.allPairs(ids)
+        resistances = habitatCircuit.solvePairwise(circuit, pairs, writer, feedback, log, phases)
+        if resistances is None:
+            return None
+        writePairwiseResistances(cfg["Output options"]["output_file"], ids, resistances)
+        solves = len(pairs)
+    else:
+        resistances = habitatCircuit.solveOneToAll(circuit, ids, writer, feedback, log, phases)
+        if resistances is None:
+            return None
+        rows = [(i, resistances.get(i, habitatCircuit.NOT_CONNECTED)) for i in ids]
+        numpy.savetxt(cfg["Output options"]["output_file"] + "_resistances.out",
+                      numpy.array(rows, ndmin=2), fmt="%.12g", delimiter="\t")
+        solves = len(ids)
+
+    writer.finish()
+    phases["total"] = time.perf_counter() - started
+    log.write("Completed {} solve(s) in {:.3f} s".format(solves, phases["total"]))
+    return {"phases": {k: round(v, 3) for k, v in phases.items()},
+            "solver": {},
+            "solves": solves}
+
+
+def writePairwiseResistances(basePath, ids, resistances):
+    # matrix with focal IDs in the first row and column, and the three
+    # column list, as written by the external solver
+    index = {v: n for n, v in enumerate(ids)}
+    matrix = numpy.zeros((len(ids) + 1, len(ids) + 1))
+    matrix[0, 1:] = ids
+    matrix[1:, 0] = ids
+    values = matrix[1:, 1:]
+    values[:] = habitatCircuit.NOT_CONNECTED
+    numpy.fill_diagonal(values, 0.0)
+
+    rows = []
+    for (a, b), resistance in sorted(resistances.items()):
+        values[index[a], index[b]] = resistance
+        values[index[b], index[a]] = resistance
+        rows.append((a, b, resistance))
+
+    numpy.savetxt(basePath + "_resistances.out", matrix, fmt="%.12g", delimiter="\t")
+    numpy.savetxt(basePath + "_resistances_3columns.out", numpy.array(rows, ndmin=2), fmt="%.12g", delimiter=" ")
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    conftest.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import types
+
+# modules are imported from the plugin package under its installed name,
+# without running the package __init__ which needs a running QGIS
+pluginPath = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if "processing_circuitscape" not in sys.modules:
+    package = types.ModuleType("processing_circuitscape")
+    package.__path__ = [pluginPath]
+    sys.modules["processing_circuitscape"] = package
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_circuitscapeUtils.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+
+import pytest
+
+pytest.importorskip("qgis.core")
+
+from qgis.core import QgsProcessingException
+
+from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape.solverLog import SolverLog
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="jobs are shell scripts")
+
+
+class Feedback:
+
+    def __init__(self, cancelAfter=None):
+        self.cancelAfter = cancelAfter
+        self.started = time.monotonic()
+        self.output = []
+
+    def isCanceled(self):
+        return self.cancelAfter is not None and time.monotonic() - self.started > self.cancelAfter
+
+    def pushInfo(self, text):
+        pass
+
+    def pushCommandInfo(self, text):
+        pass
+
+    def pushConsoleInfo(self, text):
+        self.output.extend(text.splitlines())
+
+    def reportError(self, text, fatalError=False):
+        pass
+
+
+def jobFile(tmp_path, *commands):
+    return circuitscapeUtils.jobFileFromCommands(commands, str(tmp_path))
+
+
+def processExited(pidFile):
+    pid = int(pidFile.read_text())
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            with open("/proc/{}/stat".format(pid)) as f:
+                if f.read().rsplit(")", 1)[1].split()[0] == "Z":
+                    return True
+        except OSError:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def testOutputIsPassedOn(tmp_path):
+    feedback = Feedback()
+    log = SolverLog(feedback, str(tmp_path / "solver.log"))
+    assert circuitscapeUtils.execute(feedback, None, log, jobFile(tmp_path, "echo first", "echo second"))
+    assert feedback.output == ["first", "second"]
+    assert (tmp_path / "solver.log").read_text().splitlines() == ["first", "second"]
+
+
+def testNonZeroExitCode(tmp_path):
+    with pytest.raises(QgsProcessingException, match="exit code 3"):
+        circuitscapeUtils.execute(Feedback(), jobFile=jobFile(tmp_path, "echo failing", "sh -c 'exit 3'"))
+
+
+def testCancelKillsSolverAndChildren(tmp_path):
+    pidFile = tmp_path / "child.pid"
+    job = jobFile(tmp_path, "sleep 30 &", "echo $! > {}".format(pidFile), "wait")
+    started = time.monotonic()
+    assert circuitscapeUtils.execute(Feedback(cancelAfter=0.5), jobFile=job) is False
+    assert time.monotonic() - started < 10
+    assert processExited(pidFile)
+
+
+def testTimeoutKillsSolverAndChildren(tmp_path, monkeypatch):
+    monkeypatch.setattr(circuitscapeUtils, "solverTimeout", lambda: 1)
+    pidFile = tmp_path / "child.pid"
+    job = jobFile(tmp_path, "sleep 30 &", "echo $! > {}".format(pidFile), "wait")
+    with pytest.raises(QgsProcessingException, match="did not finish"):
+        circuitscapeUtils.execute(Feedback(), jobFile=job)
+    assert processExited(pidFile)
+
+
+def testBackgroundChildrenDoNotOutliveSolver(tmp_path):
+    # solver exits normally but forgets a helper process
+    pidFile = tmp_path / "child.pid"
+    job = jobFile(tmp_path, "sleep 30 > /dev/null 2>&1 &", "echo $! > {}".format(pidFile))
+    assert circuitscapeUtils.execute(Feedback(), jobFile=job)
+    assert processExited(pidFile)
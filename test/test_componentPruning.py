@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_componentPruning.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+import pytest
+
+pytest.importorskip("scipy")
+gdal = pytest.importorskip("osgeo.gdal")
+pytest.importorskip("qgis.core")
+
+from processing_circuitscape import componentPruning
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+GEOTRANSFORM = (0.0, 1.0, 0.0, 3.0, 0.0, -1.0)
+
+
+def writeByteRaster(fileName, data):
+    # no NODATA value, as often found in classified land cover rasters
+    ds = gdal.GetDriverByName("GTiff").Create(fileName, data.shape[1], data.shape[0], 1, gdal.GDT_Byte)
+    ds.SetGeoTransform(GEOTRANSFORM)
+    ds.GetRasterBand(1).WriteArray(data)
+    ds = None
+    return fileName
+
+
+def testRemovedCellsOfByteRasterBecomeNodata(tmp_path):
+    resistances = numpy.array([[1, 1, 0, 5],
+                               [1, 2, 0, 5],
+                               [0, 0, 0, 5]], dtype=numpy.uint8)
+    focal = numpy.array([[1, 0, 0, 0],
+                         [0, 0, 0, 0],
+                         [0, 0, 0, 0]], dtype=numpy.float64)
+    resistanceFile = writeByteRaster(str(tmp_path / "resistances.tif"), resistances)
+    focalFile = str(tmp_path / "focal.asc")
+    rasterTools.writeGrid(focalFile, 4, 3, GEOTRANSFORM, "", [(0, focal)], rasterExporter.DEFAULT_NODATA)
+    destination = str(tmp_path / "pruned.tif")
+
+    stats = componentPruning.pruneComponents(resistanceFile, [(focalFile, False)], destination, True)
+    assert (stats.components, stats.removedComponents, stats.removedCells) == (2, 1, 3)
+
+    ds = rasterTools.openRaster(destination)
+    band = ds.GetRasterBand(1)
+    assert band.DataType == gdal.GDT_Float32
+    assert band.GetNoDataValue() == rasterExporter.DEFAULT_NODATA
+    data = band.ReadAsArray()
+    assert (data[:, 3] == rasterExporter.DEFAULT_NODATA).all()
+    assert data[:2, :2].tolist() == [[1, 1], [1, 2]]
+
+
+def testNodataThatFitsKeepsType():
+    assert componentPruning.canHold(numpy.dtype(numpy.uint8), 255)
+    assert not componentPruning.canHold(numpy.dtype(numpy.uint16), -9999)
+    assert componentPruning.canHold(numpy.dtype(numpy.int16), -9999)
+    assert componentPruning.canHold(numpy.dtype(numpy.float32), -9999)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_corridors.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+import pytest
+
+pytest.importorskip("osgeo")
+pytest.importorskip("qgis.core")
+
+from processing_circuitscape import corridors
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+NODATA = -9999
+GEOTRANSFORM = (0.0, 1.0, 0.0, 5.0, 0.0, -1.0)
+
+
+def writeMap(fileName, data):
+    data = numpy.array(data, dtype=float)
+    rasterTools.writeGrid(fileName, data.shape[1], data.shape[0], GEOTRANSFORM, "", [(0, data)], NODATA)
+    return fileName
+
+
+def bruteDilate(mask, radius):
+    rows, columns = mask.shape
+    result = numpy.zeros(mask.shape, dtype=bool)
+    for row, column in zip(*numpy.nonzero(mask)):
+        result[max(0, row - radius):row + radius + 1, max(0, column - radius):column + radius + 1] = True
+    return result
+
+
+def testDilateIsSquare():
+    mask = numpy.zeros((5, 6), dtype=bool)
+    mask[2, 2] = True
+    dilated = corridors.dilate(mask, 1)
+    assert numpy.argwhere(dilated).tolist() == [[r, c] for r in (1, 2, 3) for c in (1, 2, 3)]
+    assert corridors.dilate(mask, 0) is mask
+
+
+@pytest.mark.parametrize("radius", [1, 2, 4, 10])
+def testDilateMatchesBruteForce(radius):
+    mask = numpy.random.default_rng(radius).random((13, 9)) < 0.1
+    assert (corridors.dilate(mask, radius) == bruteDilate(mask, radius)).all()
+
+
+def testAggregateIdsKeepsLargestId(tmp_path):
+    focal = writeMap(str(tmp_path / "focal.asc"), [[1, 0, 0, 0, 7],
+                                                   [0, 2, 0, 0, 0],
+                                                   [0, 0, NODATA, 0, 0],
+                                                   [0, 0, 0, 3, 0],
+                                                   [5, 0, 0, 0, 0]])
+
+    coarse, lost = corridors.aggregateIds(focal, 2)
+
+    # edges are padded up to whole blocks
+    assert coarse.tolist() == [[2, NODATA, 7], [NODATA, 3, NODATA], [5, NODATA, NODATA]]
+    assert lost == [1]
+
+
+def testAggregateValuesAveragesValidCells(tmp_path):
+    resistance = writeMap(str(tmp_path / "resistance.asc"), [[1, 3, 2],
+                                                             [NODATA, 2, 4],
+                                                             [NODATA, NODATA, 6]])
+
+    source, coarse = corridors.aggregateValues(resistance, 2)
+    assert coarse.tolist() == [[2, 3], [rasterExporter.DEFAULT_NODATA, 6]]
+
+
+@pytest.mark.parametrize("rows", [1, 2, 5, 100])
+@pytest.mark.parametrize("dilation", [0, 1, 3])
+@pytest.mark.parametrize("factor", [1, 2, 3])
+def testStripsMatchWholeGrid(factor, dilation, rows):
+    height, width = 11, 8
+    selected = numpy.random.default_rng(factor).random((-(-height // factor), -(-width // factor))) < 0.3
+    fine = numpy.repeat(numpy.repeat(selected, factor, axis=0), factor, axis=1)[:height, :width]
+    expected = corridors.dilate(fine, dilation)
+
+    strips = list(corridors.corridorStrips(selected, factor, dilation, width, height, rows))
+    assert [row for row, strip in strips] == list(range(0, height, rows))
+    assert (numpy.vstack([strip for row, strip in strips]) == expected).all()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_diskCache.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import json
+import threading
+import multiprocessing
+
+from processing_circuitscape import diskCache
+from processing_circuitscape.diskCache import DiskCache
+
+
+RUN = "run"
+
+
+def store(cache, key, content, owner=RUN):
+    path = cache.reserve(key, owner)
+    with open(os.path.join(path, "data.txt"), "w") as f:
+        f.write(content)
+    return path
+
+
+def testEntryIsHiddenUntilPut(tmp_path):
+    cache = DiskCache(str(tmp_path), 0)
+    store(cache, "key", "first")
+    assert cache.get("key", RUN) is None
+
+    entry = cache.put("key")
+    assert entry == cache.entryPath("key")
+    assert cache.get("key", RUN) == entry
+    with open(os.path.join(entry, "data.txt")) as f:
+        assert f.read() == "first"
+
+
+def testConcurrentReservationsDoNotClobber(tmp_path):
+    # second run exporting the same key must not remove files the first
+    # one is still writing, and finds the entry in place when it is done
+    first = DiskCache(str(tmp_path), 0)
+    second = DiskCache(str(tmp_path), 0)
+    firstPath = store(first, "key", "same")
+
+    reserved = threading.Event()
+    stored = threading.Event()
+    results = {}
+
+    def run():
+        results["path"] = store(second, "key", "same")
+        reserved.set()
+        stored.wait()
+        results["entry"] = second.put("key")
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    reserved.wait()
+    assert results["path"] != firstPath
+    assert os.path.isfile(os.path.join(firstPath, "data.txt"))
+
+    entry = first.put("key")
+    stored.set()
+    thread.join()
+
+    assert results["entry"] == entry
+    with open(os.path.join(entry, "data.txt")) as f:
+        assert f.read() == "same"
+    assert not os.path.exists(results["path"])
+    assert sorted(os.listdir(str(tmp_path))) == ["index.json", "key", "pins"]
+
+
+def testDiscardLeavesStoredEntry(tmp_path):
+    cache = DiskCache(str(tmp_path), 0)
+    store(cache, "key", "kept")
+    entry = cache.put("key")
+
+    pending = store(cache, "key", "dropped")
+    cache.discard("key")
+    assert not os.path.exists(pending)
+    assert cache.get("key", RUN) == entry
+
+
+def testEmptyReservationIsNotStored(tmp_path):
+    cache = DiskCache(str(tmp_path), 0)
+    cache.reserve("key", RUN)
+    assert cache.put("key") is None
+    assert cache.get("key", RUN) is None
+
+
+def testContentDigestIsReadOncePerVersion(tmp_path, monkeypatch):
+    fileName = str(tmp_path / "grid.asc")
+    with open(fileName, "w") as f:
+        f.write("1 2 3")
+
+    hashed = []
+    contentHash = diskCache.contentHash
+    monkeypatch.setattr(diskCache, "contentHash", lambda path: hashed.append(path) or contentHash(path))
+    monkeypatch.setattr(diskCache, "contentDigests", {})
+
+    first = diskCache.contentDigest(fileName)
+    assert diskCache.contentDigest(fileName) == first
+    assert len(hashed) == 1
+
+    with open(fileName, "w") as f:
+        f.write("1 2 3 4")
+    assert diskCache.contentDigest(fileName) != first
+    assert len(hashed) == 2
+
+    # same content elsewhere gives the same digest
+    copy = str(tmp_path / "copy.asc")
+    with open(copy, "w") as f:
+        f.write("1 2 3")
+    assert diskCache.contentDigest(copy) == first
+
+
+def testPinsBelongToRuns(tmp_path):
+    # an entry used by one run survives eviction while another run
+    # releases its own pins
+    cache = DiskCache(str(tmp_path), 1)
+    store(cache, "a", "first", "one")
+    cache.put("a")
+    store(cache, "b", "second", "two")
+    cache.put("b")
+
+    cache.release("two")
+    store(cache, "c", "third", "two")
+    cache.put("c")
+    assert cache.get("a", "one") is not None
+    assert cache.get("b", "one") is None
+
+    cache.release("one")
+    cache.release("two")
+    store(cache, "d", "fourth", "three")
+    cache.put("d")
+    assert cache.get("a", "three") is None
+
+
+def testPinsOfDeadProcessesAreIgnored(tmp_path):
+    cache = DiskCache(str(tmp_path), 1)
+    store(cache, "a", "first", "other")
+    cache.put("a")
+    # pin file of a process which no longer exists
+    with open(cache.pinFile("a", "other"), "w") as f:
+        json.dump({"pid": 2 ** 22 + 12345, "created": 1.0}, f)
+
+    store(cache, "b", "second")
+    cache.put("b")
+    assert cache.get("a", RUN) is None
+    assert not os.path.exists(cache.pinFile("a", "other"))
+
+
+def storeMany(directory, prefix, count):
+    cache = DiskCache(directory, 0)
+    for i in range(count):
+        key = "{}{}".format(prefix, i)
+        store(cache, key, key, prefix)
+        cache.put(key)
+    cache.release(prefix)
+
+
+def testIndexUpdatesFromProcessesAreKept(tmp_path):
+    processes = [multiprocessing.Process(target=storeMany, args=(str(tmp_path), prefix, 25))
+                 for prefix in ("p", "q", "r")]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    index = DiskCache(str(tmp_path), 0).readIndex()
+    assert sorted(index["entries"]) == sorted("{}{}".format(p, i) for p in "pqr" for i in range(25))
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_focalPairs.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+from processing_circuitscape import focalPairs
+
+IDS = [1.0, 2.0, 3.0, 4.0]
+
+
+def writeLines(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def testIncludeList(tmp_path):
+    fileName = writeLines(tmp_path / "pairs.txt", ["mode include", "1 2", "4 3", "", "2 9"])
+    # pairs are normalised and pairs of unknown nodes are dropped
+    assert focalPairs.readIncludedPairs(fileName, IDS) == [(1.0, 2.0), (3.0, 4.0)]
+
+
+def testExcludeList(tmp_path):
+    fileName = writeLines(tmp_path / "pairs.txt", ["MODE exclude", "2 1", "3 4"])
+    assert focalPairs.readIncludedPairs(fileName, IDS) == [(1.0, 3.0), (1.0, 4.0), (2.0, 3.0), (2.0, 4.0)]
+
+
+def testMatrix(tmp_path):
+    fileName = writeLines(tmp_path / "pairs.txt", ["min 1",
+                                                   "max 2",
+                                                   "0 1 2 3",
+                                                   "1 0 1 3",
+                                                   "2 0 0 2",
+                                                   "3 0 0 0"])
+    assert focalPairs.readIncludedPairs(fileName, IDS) == [(1.0, 2.0), (2.0, 3.0)]
+
+
+def testWrittenPairsRoundTrip(tmp_path):
+    fileName = str(tmp_path / "pairs.txt")
+    pairs = [(1.0, 3.0), (2.0, 4.0), (3.0, 4.0)]
+    focalPairs.writeIncludedPairs(fileName, IDS, pairs)
+    assert focalPairs.readIncludedPairs(fileName, IDS) == pairs
+
+
+def testAsymmetricMatrixSetsSourceRowsOnly(tmp_path):
+    fileName = str(tmp_path / "pairs.txt")
+    focalPairs.writeIncludedPairs(fileName, IDS, focalPairs.sourcePairs(IDS, [2.0]), False)
+    with open(fileName) as f:
+        rows = [line.split() for line in f.readlines()[3:]]
+    assert [row[0] for row in rows if "1" in row[1:]] == ["2"]
+    # read back as symmetric pairs all involve the source node
+    assert focalPairs.readIncludedPairs(fileName, IDS) == [(1.0, 2.0), (2.0, 3.0), (2.0, 4.0)]
+
+
+def testSplitPairsCoversEveryPairOnce():
+    pairs = focalPairs.allPairs(range(1, 8))
+    shards = focalPairs.splitPairs(pairs, 4)
+    assert len(shards) == 4
+    assert sorted(p for shard in shards for p in shard) == pairs
+    assert max(map(len, shards)) - min(map(len, shards)) <= 1
+
+
+def testSplitPairsDropsEmptyShards():
+    assert focalPairs.splitPairs([(1, 2), (1, 3)], 5) == [[(1, 2)], [(1, 3)]]
+
+
+def testSplitNodes():
+    assert focalPairs.splitNodes([1, 2, 3, 4, 5], 2) == [[1, 3, 5], [2, 4]]
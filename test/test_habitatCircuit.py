@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_habitatCircuit.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+import pytest
+
+pytest.importorskip("scipy")
+
+from processing_circuitscape import habitatCircuit
+
+SQRT2 = numpy.sqrt(2.0)
+
+
+class Feedback:
+
+    def isCanceled(self):
+        return False
+
+    def setProgress(self, value):
+        pass
+
+
+class Log:
+
+    def write(self, text):
+        pass
+
+
+class RecordingWriter:
+
+    def __init__(self):
+        self.voltages = {}
+
+    def addSolve(self, suffix, voltages):
+        self.voltages[suffix] = voltages.copy()
+
+
+def circuit(resistances, focal, fourNeighbours, averageResistances):
+    resistances = numpy.array(resistances, dtype=numpy.float64)
+    conductances = numpy.zeros(resistances.shape)
+    habitat = resistances > 0
+    conductances[habitat] = 1.0 / resistances[habitat]
+    graph = habitatCircuit.buildGraph(conductances, numpy.array(focal), fourNeighbours, averageResistances)
+    return habitatCircuit.Circuit(graph)
+
+
+def pairwise(c, pairs):
+    writer = RecordingWriter()
+    resistances = habitatCircuit.solvePairwise(c, pairs, writer, Feedback(), Log(), {})
+    return resistances, writer
+
+
+def oneToAll(c, ids):
+    writer = RecordingWriter()
+    resistances = habitatCircuit.solveOneToAll(c, ids, writer, Feedback(), Log(), {})
+    return resistances, writer
+
+
+def edgeConductance(a, b, averageResistances):
+    if averageResistances:
+        return 2.0 / (a + b)
+    return (1.0 / a + 1.0 / b) / 2.0
+
+
+def columnStrip(columns, rows, fourNeighbours, averageResistances):
+    # every column has one resistance, focal regions cover the end
+    # columns; rows stay at equal voltages, so columns are connected in
+    # series and each step is rows horizontal (and 2 * (rows - 1)
+    # diagonal) edges in parallel
+    resistances = [list(columns)] * rows
+    focal = numpy.zeros((rows, len(columns)), dtype=numpy.int64)
+    focal[:, 0] = 1
+    focal[:, -1] = 2
+
+    diagonals = 0 if fourNeighbours else 2 * (rows - 1)
+    expected = sum(1.0 / (edgeConductance(a, b, averageResistances) * (rows + diagonals / SQRT2))
+                   for a, b in zip(columns[:-1], columns[1:]))
+    return circuit(resistances, focal, fourNeighbours, averageResistances), expected
+
+
+@pytest.mark.parametrize("fourNeighbours", [True, False])
+@pytest.mark.parametrize("averageResistances", [True, False])
+@pytest.mark.parametrize("rows", [1, 2])
+def testSeriesStrip(rows, fourNeighbours, averageResistances):
+    c, expected = columnStrip([1.0, 2.0, 4.0, 1.0, 3.0], rows, fourNeighbours, averageResistances)
+
+    resistances, writer = pairwise(c, [(1, 2)])
+    assert resistances[(1, 2)] == pytest.approx(expected, rel=1e-10)
+
+    # with two focal nodes grounding the other one is the same circuit
+    resistances, writer = oneToAll(c, [1, 2])
+    assert resistances[1] == pytest.approx(expected, rel=1e-10)
+    assert resistances[2] == pytest.approx(expected, rel=1e-10)
+
+
+def testUniformStripAveragingDoesNotMatter():
+    # 2 x 5 cells of resistance 2: four steps of two edges and, with
+    # eight neighbours, two diagonals of conductance 1 / (2 * sqrt(2))
+    for averageResistances in (True, False):
+        c = columnStrip([2.0] * 5, 2, True, averageResistances)[0]
+        assert pairwise(c, [(1, 2)])[0][(1, 2)] == pytest.approx(4.0)
+        c = columnStrip([2.0] * 5, 2, False, averageResistances)[0]
+        assert pairwise(c, [(1, 2)])[0][(1, 2)] == pytest.approx(8.0 / (2.0 + SQRT2))
+
+
+@pytest.mark.parametrize("averageResistances", [True, False])
+def testParallelStrips(averageResistances):
+    # two rows joined only by the focal regions at both ends
+    top = [1.0, 2.0, 2.0, 3.0]
+    bottom = [1.0, 5.0, 1.0, 3.0]
+    resistances = [top, [1.0, 0.0, 0.0, 3.0], bottom]
+    focal = [[1, 0, 0, 2], [1, 0, 0, 2], [1, 0, 0, 2]]
+    c = circuit(resistances, focal, True, averageResistances)
+
+    strips = [sum(1.0 / edgeConductance(a, b, averageResistances) for a, b in zip(row[:-1], row[1:]))
+              for row in (top, bottom)]
+    expected = 1.0 / sum(1.0 / r for r in strips)
+    assert pairwise(c, [(1, 2)])[0][(1, 2)] == pytest.approx(expected, rel=1e-10)
+
+
+RESISTANCES = [[1.0, 3.0, 2.0, 0.0, 1.0],
+               [2.0, 1.0, 5.0, 1.0, 2.0],
+               [4.0, 1.0, 0.0, 2.0, 1.0],
+               [1.0, 2.0, 1.0, 3.0, 6.0]]
+FOCAL = [[1, 1, 0, 0, 0],
+         [0, 0, 0, 0, 2],
+         [0, 0, 0, 0, 0],
+         [3, 0, 0, 4, 0]]
+
+
+def branchCurrents(c, voltages):
+    return c.weights * (voltages[c.first] - voltages[c.second])
+
+
+@pytest.mark.parametrize("fourNeighbours", [True, False])
+@pytest.mark.parametrize("averageResistances", [True, False])
+def testPairwiseMatchesDenseSolution(fourNeighbours, averageResistances):
+    c = circuit(RESISTANCES, FOCAL, fourNeighbours, averageResistances)
+    laplacian = c.laplacian.toarray()
+    inverse = numpy.linalg.pinv(laplacian)
+
+    pairs = [(1, 2), (1, 3), (2, 4), (3, 4)]
+    resistances, writer = pairwise(c, pairs)
+    for a, b in pairs:
+        i, j = c.index(a), c.index(b)
+        currents = numpy.zeros(c.size)
+        currents[i] = 1.0
+        currents[j] = -1.0
+        expected = inverse @ currents
+        expected -= expected[j]
+
+        voltages = writer.voltages["{}_{}".format(a, b)]
+        assert resistances[(a, b)] == pytest.approx(expected[i], rel=1e-9)
+        numpy.testing.assert_allclose(voltages, expected, atol=1e-10)
+        numpy.testing.assert_allclose(branchCurrents(c, voltages), branchCurrents(c, expected), atol=1e-10)
+        numpy.testing.assert_allclose(laplacian @ voltages, currents, atol=1e-10)
+        numpy.testing.assert_allclose(c.nodeCurrents(voltages), c.nodeCurrents(expected), atol=1e-10)
+
+
+@pytest.mark.parametrize("fourNeighbours", [True, False])
+@pytest.mark.parametrize("averageResistances", [True, False])
+def testOneToAllMatchesDenseSolution(fourNeighbours, averageResistances):
+    # unit current into the source, every other focal node grounded:
+    # voltages of the remaining nodes solve the Laplacian reduced by the
+    # grounds, which the solver reaches through the Schur complement
+    c = circuit(RESISTANCES, FOCAL, fourNeighbours, averageResistances)
+    laplacian = c.laplacian.toarray()
+    ids = [1, 2, 3, 4]
+
+    resistances, writer = oneToAll(c, ids)
+    for source in ids:
+        i = c.index(source)
+        free = numpy.ones(c.size, dtype=bool)
+        free[[c.index(focalId) for focalId in ids if focalId != source]] = False
+
+        currents = numpy.zeros(c.size)
+        currents[i] = 1.0
+        expected = numpy.zeros(c.size)
+        expected[free] = numpy.linalg.pinv(laplacian[numpy.ix_(free, free)]) @ currents[free]
+
+        voltages = writer.voltages[str(source)]
+        assert resistances[source] == pytest.approx(expected[i], rel=1e-9)
+        numpy.testing.assert_allclose(voltages, expected, atol=1e-10)
+        numpy.testing.assert_allclose(branchCurrents(c, voltages), branchCurrents(c, expected), atol=1e-10)
+        # current entering the source leaves through the grounds
+        assert (laplacian @ voltages)[~free].sum() == pytest.approx(-1.0)
+
+
+def testDisconnectedFocalNodes():
+    c = circuit([[1.0, 1.0, 0.0, 1.0, 1.0]], [[1, 0, 0, 0, 2]], True, True)
+    assert c.componentCount == 2
+    assert pairwise(c, [(1, 2)])[0][(1, 2)] == habitatCircuit.NOT_CONNECTED
+    assert oneToAll(c, [1, 2])[0] == {1: habitatCircuit.NOT_CONNECTED, 2: habitatCircuit.NOT_CONNECTED}
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_networkGraph.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+import pytest
+
+pytest.importorskip("osgeo")
+qgisCore = pytest.importorskip("qgis.core")
+
+from processing_circuitscape import networkGraph
+from processing_circuitscape import rasterTools
+
+NODATA = -9999
+GEOTRANSFORM = (0.0, 1.0, 0.0, 2.0, 0.0, -1.0)
+
+
+def writeMap(fileName, data):
+    data = numpy.array(data, dtype=float)
+    rasterTools.writeGrid(fileName, data.shape[1], data.shape[0], GEOTRANSFORM, "", [(0, data)], NODATA)
+    return fileName
+
+
+def edges(graph):
+    return {(int(min(a, b)), int(max(a, b))): w for a, b, w in zip(graph.first, graph.second, graph.weights)}
+
+
+def testFocalRegionsCollapseAndParallelEdgesAddUp(tmp_path):
+    resistance = writeMap(str(tmp_path / "resistance.asc"), [[1, 2, 4],
+                                                            [1, NODATA, 4]])
+    focal = writeMap(str(tmp_path / "focal.asc"), [[1, 0, 0],
+                                                   [1, 0, 2]])
+
+    template, graph = networkGraph.buildGraph(resistance, focal, False, True, True)
+
+    # plain cells are numbered after the largest focal ID in row-major order
+    assert graph.nodes.tolist() == [[1, 4, 5], [1, 0, 2]]
+    assert graph.focalIds.tolist() == [1, 2]
+    assert graph.nodeCount() == 4
+    # resistances of neighbours are averaged, the focal region has one
+    # edge to cell 4 and the cells of region 2 and 5 join
+    assert edges(graph) == pytest.approx({(1, 4): 2.0 / 3.0, (4, 5): 1.0 / 3.0, (2, 5): 0.25})
+
+
+def testDiagonalsAndConductanceAveraging(tmp_path):
+    conductance = writeMap(str(tmp_path / "conductance.asc"), [[1, 3],
+                                                              [2, 4]])
+    focal = writeMap(str(tmp_path / "focal.asc"), [[1, 0],
+                                                   [0, 2]])
+
+    template, graph = networkGraph.buildGraph(conductance, focal, True, False, False)
+
+    assert graph.nodes.tolist() == [[1, 4], [5, 2]]
+    sqrt2 = numpy.sqrt(2.0)
+    assert edges(graph) == pytest.approx({(1, 4): 2.0, (1, 5): 1.5, (2, 4): 3.5, (2, 5): 3.0,
+                                          (1, 2): 2.5 / sqrt2, (4, 5): 2.5 / sqrt2})
+
+
+def testMaskRemovesCells(tmp_path):
+    resistance = writeMap(str(tmp_path / "resistance.asc"), [[1, 1, 1]])
+    focal = writeMap(str(tmp_path / "focal.asc"), [[1, 0, 2]])
+    mask = writeMap(str(tmp_path / "mask.asc"), [[1, 0, 1]])
+
+    template, graph = networkGraph.buildGraph(resistance, focal, False, True, True, mask)
+    assert graph.nodes.tolist() == [[1, 0, 2]]
+    assert len(graph.weights) == 0
+
+
+def testFractionalFocalIdsAreRejected(tmp_path):
+    resistance = writeMap(str(tmp_path / "resistance.asc"), [[1, 1]])
+    focal = writeMap(str(tmp_path / "focal.asc"), [[1.5, 2]])
+    with pytest.raises(qgisCore.QgsProcessingException):
+        networkGraph.buildGraph(resistance, focal, False, True, True)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_outputMerger.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+
+import numpy
+import pytest
+
+pytest.importorskip("osgeo")
+pytest.importorskip("qgis.core")
+
+from processing_circuitscape import outputMerger
+from processing_circuitscape import rasterTools
+
+NODATA = -9999
+GEOTRANSFORM = (0.0, 1.0, 0.0, 2.0, 0.0, -1.0)
+
+
+class Feedback:
+
+    def pushInfo(self, info):
+        pass
+
+
+def writeShard(directory, cumulative, maximum, rows):
+    os.makedirs(directory)
+    base = os.path.join(directory, "run")
+    for suffix, data in (("_cum_curmap.asc", cumulative), ("_max_curmap.asc", maximum)):
+        rasterTools.writeGrid(base + suffix, 2, 2, GEOTRANSFORM, "", [(0, numpy.array(data, dtype=float))], NODATA)
+    numpy.savetxt(base + "_resistances_3columns.out", numpy.array(rows, ndmin=2), fmt="%.12g", delimiter=" ")
+    return base
+
+
+def readGrid(fileName):
+    return numpy.loadtxt(fileName, skiprows=6)
+
+
+def testShardOutputsAreMerged(tmp_path):
+    first = writeShard(str(tmp_path / "0"), [[1, NODATA], [2, 3]], [[1, NODATA], [5, 1]],
+                       [(1, 2, 2.5), (1, 3, -1)])
+    second = writeShard(str(tmp_path / "1"), [[4, NODATA], [NODATA, 1]], [[2, NODATA], [NODATA, 4]],
+                        [(1, 3, 1.5)])
+    basePath = str(tmp_path / "merged")
+
+    outputMerger.mergeOutputs([first, second], basePath, Feedback())
+
+    # cumulative maps add up, NODATA stays only where no shard has a value
+    assert readGrid(basePath + "_cum_curmap.asc").tolist() == [[5, NODATA], [2, 4]]
+    assert readGrid(basePath + "_max_curmap.asc").tolist() == [[2, NODATA], [5, 4]]
+    # pairs not computed in one shard take the value of the other
+    assert numpy.loadtxt(basePath + "_resistances_3columns.out", ndmin=2).tolist() == [[1, 2, 2.5], [1, 3, 1.5]]
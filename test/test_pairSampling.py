@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_pairSampling.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+import pytest
+
+pytest.importorskip("osgeo")
+pytest.importorskip("qgis.core")
+
+from processing_circuitscape import focalPairs
+from processing_circuitscape import pairSampling
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+NODATA = -9999
+GEOTRANSFORM = (0.0, 1.0, 0.0, 2.0, 0.0, -1.0)
+PAIRS = focalPairs.allPairs(list(range(1, 21)))
+
+
+def testSampleSizeOfOneIsOnePair():
+    assert pairSampling.sampleSize(1.0, 190) == 1
+    assert pairSampling.sampleSize(1, 190) == 1
+
+
+def testSampleSizeFractionsAndCounts():
+    assert pairSampling.sampleSize(0.1, 190) == 19
+    assert pairSampling.sampleSize(0.001, 190) == 1
+    assert pairSampling.sampleSize(25, 190) == 25
+    assert pairSampling.sampleSize(1000, 190) == 190
+
+
+@pytest.mark.parametrize("size", [1, 7, 50, 190])
+def testSampleHasRequestedSizeWithoutDuplicates(size):
+    batches = pairSampling.samplePairs(PAIRS, size, 4, 42)
+    sampled = [pair for batch in batches for pair in batch]
+    assert len(sampled) == size
+    assert len(set(sampled)) == size
+    assert set(sampled) <= set(PAIRS)
+    assert max(len(b) for b in batches) - min(len(b) for b in batches) <= 1
+
+
+def testSampleDependsOnSeedOnly():
+    assert pairSampling.samplePairs(PAIRS, 30, 3, 7) == pairSampling.samplePairs(PAIRS, 30, 3, 7)
+    assert pairSampling.samplePairs(PAIRS, 30, 3, 7) != pairSampling.samplePairs(PAIRS, 30, 3, 8)
+
+
+@pytest.mark.parametrize("size", [5, 23, 61])
+def testStrataKeepTheirShare(size):
+    rng = numpy.random.default_rng(3)
+    centroids = {i: tuple(rng.uniform(0, 1000, 2)) for i in range(1, 21)}
+    batches = pairSampling.samplePairs(PAIRS, size, 3, 11, centroids)
+    sampled = [pair for batch in batches for pair in batch]
+    assert len(sampled) == size
+    assert len(set(sampled)) == size
+
+    def distances(pairs):
+        return numpy.array([numpy.hypot(centroids[a][0] - centroids[b][0], centroids[a][1] - centroids[b][1])
+                            for a, b in pairs])
+
+    everything = distances(PAIRS)
+    edges = numpy.quantile(everything, numpy.linspace(0, 1, pairSampling.DISTANCE_STRATA + 1)[1:-1])
+    total = numpy.bincount(numpy.searchsorted(edges, everything, side="right"),
+                           minlength=pairSampling.DISTANCE_STRATA)
+    drawn = numpy.bincount(numpy.searchsorted(edges, distances(sampled), side="right"),
+                           minlength=pairSampling.DISTANCE_STRATA)
+    shares = total * size / float(len(PAIRS))
+    assert (drawn >= numpy.floor(shares)).all()
+    assert (drawn <= numpy.ceil(shares)).all()
+
+
+def writeMap(fileName, data):
+    rasterTools.writeGrid(fileName, 3, 2, GEOTRANSFORM, "", [(0, numpy.array(data, dtype=float))], NODATA)
+    return fileName
+
+
+def testEstimateScalesSumToAllPairs(tmp_path):
+    maps = [writeMap(str(tmp_path / "batch1.asc"), [[1, 2, NODATA], [0, 4, 1]]),
+            writeMap(str(tmp_path / "batch2.asc"), [[3, 2, NODATA], [0, 2, 1]]),
+            writeMap(str(tmp_path / "batch3.asc"), [[1, 5, NODATA], [0, 3, 1]])]
+    sizes = [2, 2, 1]
+    totalPairs = 20
+    estimateFile = str(tmp_path / "estimate.tif")
+    errorFile = str(tmp_path / "error.tif")
+
+    convergence = pairSampling.writeEstimates(maps, sizes, totalPairs, estimateFile, errorFile)
+
+    values = numpy.array([[[1, 2, 0], [0, 4, 1]], [[3, 2, 0], [0, 2, 1]], [[1, 5, 0], [0, 3, 1]]], dtype=float)
+    batchEstimates = values * (totalPairs / numpy.array(sizes, dtype=float))[:, None, None]
+    expected = values.sum(axis=0) * totalPairs / sum(sizes)
+    expectedError = batchEstimates.std(axis=0, ddof=1) / numpy.sqrt(len(maps))
+
+    estimate = rasterTools.openRaster(estimateFile).GetRasterBand(1).ReadAsArray()
+    error = rasterTools.openRaster(errorFile).GetRasterBand(1).ReadAsArray()
+    valid = numpy.array([[True, True, False], [True, True, True]])
+    numpy.testing.assert_allclose(estimate[valid], expected[valid])
+    numpy.testing.assert_allclose(error[valid], expectedError[valid])
+    assert (estimate[~valid] == rasterExporter.DEFAULT_NODATA).all()
+    assert (error[~valid] == rasterExporter.DEFAULT_NODATA).all()
+
+    # cells without current are left out of the diagnostics
+    carrying = valid & (expected > 0)
+    assert convergence.cells == int(carrying.sum())
+    assert convergence.meanRelativeError() == pytest.approx(
+        (expectedError[carrying] / expected[carrying]).mean())
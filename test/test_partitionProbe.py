@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_partitionProbe.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import json
+import time
+
+import pytest
+
+pytest.importorskip("osgeo")
+pytest.importorskip("qgis.core")
+
+from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import partitionProbe
+
+
+class Feedback:
+
+    def pushInfo(self, text):
+        pass
+
+    def reportError(self, text, fatalError=False):
+        pass
+
+
+@pytest.fixture
+def probe(tmp_path, monkeypatch):
+    # fake solver installation and a probe counting its runs
+    solver = tmp_path / "csrun.py"
+    solver.write_text("#!/bin/sh\n")
+    verdicts = str(tmp_path / "verdicts.json")
+    runs = []
+    monkeypatch.setattr(circuitscapeUtils, "solverExecutable", lambda: str(solver))
+    monkeypatch.setattr(circuitscapeUtils, "partitionProbeFile", lambda: verdicts)
+    monkeypatch.setattr(partitionProbe, "runProbe", lambda mode, workspace, feedback: runs.append(mode) or True)
+    return solver, verdicts, runs
+
+
+def testVerdictIsCached(probe):
+    _, _, runs = probe
+    assert partitionProbe.partitionsMatch("one-to-all", None, Feedback())
+    assert partitionProbe.partitionsMatch("one-to-all", None, Feedback())
+    assert partitionProbe.partitionsMatch("all-to-one", None, Feedback())
+    assert runs == ["one-to-all", "all-to-one"]
+
+
+def testReinstalledSolverIsProbedAgain(probe):
+    solver, _, runs = probe
+    partitionProbe.partitionsMatch("one-to-all", None, Feedback())
+    solver.write_text("#!/bin/sh\n# upgraded\n")
+    partitionProbe.partitionsMatch("one-to-all", None, Feedback())
+    assert len(runs) == 2
+
+
+def testOldVerdictIsProbedAgain(probe):
+    _, verdicts, runs = probe
+    partitionProbe.partitionsMatch("one-to-all", None, Feedback())
+    with open(verdicts) as f:
+        entries = json.load(f)
+    for entry in entries.values():
+        entry["checked"] = time.time() - partitionProbe.PROBE_MAX_AGE - 1
+    with open(verdicts, "w") as f:
+        json.dump(entries, f)
+
+    partitionProbe.partitionsMatch("one-to-all", None, Feedback())
+    assert len(runs) == 2
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_processTools.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+import subprocess
+
+import pytest
+
+from processing_circuitscape import processTools
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="jobs are shell scripts")
+
+
+def state(pid):
+    try:
+        with open("/proc/{}/stat".format(pid)) as f:
+            return f.read().rsplit(")", 1)[1].split()[0]
+    except OSError:
+        return None
+
+
+def exited(pid):
+    # signals take a moment to be delivered, orphans may stay zombies
+    # until init reaps them
+    deadline = time.monotonic() + 5
+    while state(pid) not in (None, "Z"):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def startTree(tmp_path, script):
+    # shell leaving a background grandchild behind, its pid is written
+    # to a file once it runs
+    pidFile = tmp_path / "child.pid"
+    proc = subprocess.Popen(["/bin/sh", "-c", script.format(pidFile=pidFile)],
+                            stdout=subprocess.DEVNULL,
+                            **processTools.processGroupArgs())
+    deadline = time.monotonic() + 5
+    while not pidFile.exists() or not pidFile.read_text().strip():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    return proc, int(pidFile.read_text())
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def testKillProcessTreeTakesDownGrandchildren(tmp_path):
+    proc, child = startTree(tmp_path, "sleep 30 & echo $! > {pidFile}; wait")
+    processTools.killProcessTree(proc)
+    assert proc.returncode is not None
+    assert exited(child)
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def testKillProcessTreeAfterChildExited(tmp_path):
+    # shell is gone already, but left a process in its group
+    proc, child = startTree(tmp_path, "sleep 30 & echo $! > {pidFile}")
+    proc.wait()
+    assert state(child) not in (None, "Z")
+    processTools.killProcessTree(proc)
+    assert exited(child)
+
+
+def testKillProcessTreeIgnoresTermination(tmp_path):
+    proc, child = startTree(tmp_path, "trap '' TERM; echo $$ > {pidFile}; while true; do sleep 0.1; done")
+    processTools.TERMINATE_GRACE, grace = 0.5, processTools.TERMINATE_GRACE
+    try:
+        processTools.killProcessTree(proc)
+    finally:
+        processTools.TERMINATE_GRACE = grace
+    assert proc.returncode is not None
+    assert exited(child)
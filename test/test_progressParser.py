@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_progressParser.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import pytest
+
+from processing_circuitscape import progressParser
+from processing_circuitscape.progressParser import SolverProgressParser, formatDuration
+
+# output of a pairwise run of Circuitscape 4 (csrun.py)
+PYTHON_OUTPUT = """\
+Reading maps
+Resistance/conductance map has 10000 nodes
+Total number of pair solves = 6
+Processing pair 1 of 6
+Processing pair 2 of 6
+Processing pair 3 of 6
+Processing pair 4 of 6
+Processing pair 5 of 6
+Processing pair 6 of 6
+Writing output maps
+Time taken to complete job = 1.234 sec
+"""
+
+# the same run on Circuitscape 5 (Julia)
+JULIA_OUTPUT = """\
+[ Info: 2026-10-18 12:00:00 : Precision used: Double
+[ Info: 2026-10-18 12:00:01 : Reading maps
+[ Info: 2026-10-18 12:00:01 : Resistance/Conductance map has 10000 nodes
+[ Info: 2026-10-18 12:00:02 : Graph has 10000 nodes, 4 focal points and 1 connected components
+[ Info: 2026-10-18 12:00:02 : Total number of pair solves = 6
+[ Info: 2026-10-18 12:00:02 : Time taken to construct preconditioner = 0.1 seconds
+[ Info: 2026-10-18 12:00:02 : Solving pair 1 of 6
+[ Info: 2026-10-18 12:00:02 : Solving pair 2 of 6
+[ Info: 2026-10-18 12:00:02 : Solving pair 3 of 6
+[ Info: 2026-10-18 12:00:03 : Solving pair 4 of 6
+[ Info: 2026-10-18 12:00:03 : Solving pair 5 of 6
+[ Info: 2026-10-18 12:00:03 : Solving pair 6 of 6
+[ Info: 2026-10-18 12:00:03 : Time taken to complete job = 1.5 sec
+"""
+
+
+class Feedback:
+
+    def __init__(self):
+        self.progress = []
+        self.texts = []
+
+    def setProgress(self, progress):
+        self.progress.append(progress)
+
+    def setProgressText(self, text):
+        self.texts.append(text)
+
+
+def parse(output):
+    feedback = Feedback()
+    parser = SolverProgressParser(feedback)
+    phases = []
+    for line in output.splitlines(True):
+        parser.feed(line)
+        phases.append(parser.phase)
+    parser.finish()
+    return feedback, parser, phases
+
+
+@pytest.mark.parametrize("output", [PYTHON_OUTPUT, JULIA_OUTPUT], ids=["python", "julia"])
+def testProgressFollowsSolves(output):
+    feedback, parser, phases = parse(output)
+    assert feedback.progress == sorted(feedback.progress)
+    assert feedback.progress[-1] == 100
+    # progress of the last solve is reported before it is finished
+    start, end = progressParser.PHASE_RANGES[progressParser.PHASE_SOLVING]
+    assert start + (end - start) * 5 / 6 in feedback.progress
+
+    assert parser.total == 6
+    assert parser.solved == 6
+    assert [p for p in phases if p is not None][0] == progressParser.PHASE_GRAPH
+    assert progressParser.PHASE_SOLVING in phases
+
+    timings = parser.timings()
+    assert timings["solves"] == 6
+    assert set(timings["phases"]) <= set(progressParser.PHASE_RANGES)
+
+
+def testSolverTimingsAreCollected():
+    _, parser, phases = parse(JULIA_OUTPUT)
+    assert parser.timings()["solver"] == {"construct preconditioner": 0.1, "complete job": 1.5}
+    assert progressParser.PHASE_FACTORISATION in phases
+
+    _, parser, phases = parse(PYTHON_OUTPUT)
+    assert parser.timings()["solver"] == {"complete job": 1.234}
+    assert progressParser.PHASE_OUTPUT in phases
+
+
+def testUnrelatedLinesAreIgnored():
+    feedback, parser, phases = parse("Precision used: Double\nsome warning\n")
+    assert phases == [None, None]
+    assert parser.timings() == {"phases": {}, "solver": {}}
+    assert feedback.progress == [0, 100]
+
+
+def testEtaIsReported(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(progressParser.time, "monotonic", lambda: clock[0])
+    feedback = Feedback()
+    parser = SolverProgressParser(feedback)
+    for i in range(1, 5):
+        clock[0] = 1000.0 + 10.0 * i
+        parser.feed("Solving pair {} of 10".format(i))
+
+    # solve rate is measured from the first announcement
+    assert feedback.texts == ["Solving 2 of 10, 10.00 s per solve, about 1m 30s remaining"]
+
+
+@pytest.mark.parametrize("seconds, text", [(0, "0s"), (59.9, "59s"), (61, "1m 01s"), (3600, "1h 00m"),
+                                           (7322, "2h 02m")])
+def testFormatDuration(seconds, text):
+    assert formatDuration(seconds) == text
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_resistanceTransforms.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+import pytest
+
+gdal = pytest.importorskip("osgeo.gdal")
+pytest.importorskip("qgis.core")
+
+from processing_circuitscape import resistanceTransforms
+from processing_circuitscape.resistanceTransforms import TRANSFORM_EXPONENTIAL, TRANSFORM_POWER
+
+VALUES = numpy.linspace(0.0, 1.0, 11)
+
+
+def dataset(fileName, data, dataType, noData=None):
+    ds = gdal.GetDriverByName("GTiff").Create(str(fileName), data.shape[1], data.shape[0], 1, dataType)
+    band = ds.GetRasterBand(1)
+    if noData is not None:
+        band.SetNoDataValue(noData)
+    band.WriteArray(data)
+    return ds
+
+
+def testScale():
+    values = numpy.array([0.0, 5.0, 10.0, 20.0, -5.0])
+    assert resistanceTransforms.scale(values, 0.0, 10.0).tolist() == [0.0, 0.5, 1.0, 1.0, 0.0]
+    # constant suitability is best habitat everywhere
+    assert resistanceTransforms.scale(values, 3.0, 3.0).tolist() == [1.0] * 5
+
+
+@pytest.mark.parametrize("kind, shape", [(TRANSFORM_EXPONENTIAL, 0.0), (TRANSFORM_EXPONENTIAL, 4.0),
+                                         (TRANSFORM_EXPONENTIAL, -4.0), (TRANSFORM_POWER, 0.5),
+                                         (TRANSFORM_POWER, 1.0), (TRANSFORM_POWER, 8.0)])
+def testEndPoints(kind, shape):
+    # worst habitat gets the maximum resistance, best habitat resistance 1
+    resistances = resistanceTransforms.transform(VALUES, kind, shape, 100.0)
+    assert resistances[0] == pytest.approx(100.0)
+    assert resistances[-1] == pytest.approx(1.0)
+    assert (numpy.diff(resistances) < 0).all()
+
+
+def testExponentialApproachesLinear():
+    linear = 100.0 - 99.0 * VALUES
+    assert resistanceTransforms.transform(VALUES, TRANSFORM_EXPONENTIAL, 0.0, 100.0) == pytest.approx(linear)
+    for shape in (1e-6, -1e-6):
+        assert resistanceTransforms.transform(VALUES, TRANSFORM_EXPONENTIAL, shape, 100.0) == \
+            pytest.approx(linear, rel=1e-5)
+
+
+def testShapeBendsCurve():
+    # positive shape makes resistance drop quickly with suitability
+    middle = VALUES == 0.5
+    steep = resistanceTransforms.transform(VALUES, TRANSFORM_EXPONENTIAL, 4.0, 100.0)[middle]
+    flat = resistanceTransforms.transform(VALUES, TRANSFORM_EXPONENTIAL, -4.0, 100.0)[middle]
+    assert steep < 50.5 < flat
+    assert resistanceTransforms.transform(VALUES, TRANSFORM_POWER, 2.0, 100.0)[middle] == pytest.approx(25.75)
+    assert resistanceTransforms.transform(VALUES, TRANSFORM_POWER, 1.0, 100.0) == \
+        pytest.approx(100.0 - 99.0 * VALUES)
+
+
+def testClassValues(tmp_path):
+    data = numpy.array([[3, 1, 1], [7, -1, 3]], dtype=numpy.int32)
+    ds = dataset(tmp_path / "classes.tif", data, gdal.GDT_Int32, -1)
+    assert resistanceTransforms.classValues(ds).tolist() == [1.0, 3.0, 7.0]
+    assert resistanceTransforms.classValues(ds, limit=2) is None
+
+    # continuous rasters are never reclassified
+    assert resistanceTransforms.classValues(dataset(tmp_path / "continuous.tif", data.astype(numpy.float32),
+                                                      gdal.GDT_Float32)) is None
+
+
+def testWriteReclassTable(tmp_path):
+    fileName = str(tmp_path / "reclass.txt")
+    resistanceTransforms.writeReclassTable(fileName, numpy.array([1.0, 3.0, 7.0]),
+                                           numpy.array([100.0, 12.345678912345, 1.0]))
+    with open(fileName) as f:
+        assert f.read() == "1\t100\n3\t12.3456789\n7\t1\n"
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_resourcePlanner.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import json
+import time
+
+import pytest
+
+from processing_circuitscape import resourcePlanner
+from processing_circuitscape.resourcePlanner import MemoryQueue
+
+
+class Feedback:
+
+    def isCanceled(self):
+        return False
+
+    def pushInfo(self, text):
+        pass
+
+
+def writeReservation(directory, name, **reservation):
+    with open(os.path.join(directory, name), "w") as f:
+        json.dump(dict({"bytes": 100, "label": "", "started": time.time()}, **reservation), f)
+
+
+def testOwnReservationIsActive(tmp_path):
+    queue = MemoryQueue(str(tmp_path), 1000)
+    reservation = queue.acquire(100, Feedback(), "test")
+    active = queue.reservations()
+    assert len(active) == 1
+    assert active[0]["pid"] == os.getpid()
+
+    queue.release(reservation)
+    assert queue.reservations() == []
+
+
+def testReusedProcessIdIsStale(tmp_path):
+    # same pid, but the process was started long after the reservation
+    created = resourcePlanner.processStartTime(os.getpid())
+    if created is None:
+        pytest.skip("process start time is not available on this platform")
+    writeReservation(str(tmp_path), "reused.json", pid=os.getpid(), created=created - 3600)
+    writeReservation(str(tmp_path), "own.json", pid=os.getpid(), created=created)
+
+    active = MemoryQueue(str(tmp_path), 1000).reservations()
+    assert [r["created"] for r in active] == [created]
+    assert not os.path.exists(str(tmp_path / "reused.json"))
+
+
+def testReservationWithoutHeartbeatIsDropped(tmp_path):
+    writeReservation(str(tmp_path), "frozen.json", pid=os.getpid(), created=None)
+    writeReservation(str(tmp_path), "running.json", pid=os.getpid(), created=None)
+    stale = time.time() - resourcePlanner.HEARTBEAT_TIMEOUT - 1
+    os.utime(str(tmp_path / "frozen.json"), (stale, stale))
+
+    active = MemoryQueue(str(tmp_path), 1000).reservations()
+    assert len(active) == 1
+    assert not os.path.exists(str(tmp_path / "frozen.json"))
+
+
+def testHeartbeatKeepsLongJobReserved(tmp_path):
+    queue = MemoryQueue(str(tmp_path), 1000)
+    reservation = queue.acquire(100, Feedback(), "test")
+    stale = time.time() - resourcePlanner.HEARTBEAT_TIMEOUT - 1
+    os.utime(reservation, (stale, stale))
+
+    with resourcePlanner.Heartbeat(reservation, 0.01):
+        time.sleep(0.2)
+        assert len(queue.reservations()) == 1
+
+    queue.release(reservation)
+
+
+MODEL = {"baseMemory": 100.0, "bytesPerCell": 10.0, "setupSeconds": 1.0, "secondsPerCellSolve": 0.5}
+
+
+def testFitModelRecoversLinearModel():
+    samples = [(cells, solves, 2.0 + 0.01 * cells * solves, 1000.0 + 50.0 * cells)
+               for cells, solves in ((100, 1), (400, 3), (1000, 2), (2500, 6))]
+    model = resourcePlanner.fitModel(samples, MODEL)
+    assert model["secondsPerCellSolve"] == pytest.approx(0.01)
+    assert model["setupSeconds"] == pytest.approx(2.0)
+    assert model["bytesPerCell"] == pytest.approx(50.0)
+    assert model["baseMemory"] == pytest.approx(1000.0)
+
+
+def testFitModelKeepsDefaultsWithoutEvidence():
+    # single sample, memory not measured
+    assert resourcePlanner.fitModel([(100, 1, 5.0, None)], MODEL) == MODEL
+    # flat memory series comes from an earlier, bigger child process
+    samples = [(100, 1, 2.0, 5000.0), (200, 1, 3.0, 5000.0)]
+    model = resourcePlanner.fitModel(samples, MODEL)
+    assert model["bytesPerCell"] == MODEL["bytesPerCell"]
+    assert model["baseMemory"] == MODEL["baseMemory"]
+    assert model["secondsPerCellSolve"] == pytest.approx(0.01)
+
+
+def testFitModelClipsNegativeSetupTime():
+    samples = [(100, 1, 0.5, None), (200, 1, 1.5, None)]
+    model = resourcePlanner.fitModel(samples, MODEL)
+    assert model["secondsPerCellSolve"] == pytest.approx(0.01)
+    assert model["setupSeconds"] == 0.0
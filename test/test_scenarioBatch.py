@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_scenarioBatch.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import pytest
+
+pytest.importorskip("osgeo")
+pytest.importorskip("qgis.core")
+
+from processing_circuitscape.scenarioBatch import scenarioName
+
+
+def testNamesAreFileSystemSafe():
+    taken = set()
+    assert scenarioName("Roads 2030 / high traffic", taken) == "Roads_2030_high_traffic"
+    assert scenarioName("..hidden", taken) == "hidden"
+    assert scenarioName("v1.2-final", taken) == "v1.2-final"
+    assert scenarioName("", taken) == "scenario"
+    assert scenarioName("???", taken) == "scenario_2"
+
+
+def testNamesAreUnique():
+    taken = {"baseline"}
+    assert scenarioName("baseline", taken) == "baseline_2"
+    assert scenarioName("baseline", taken) == "baseline_3"
+    assert scenarioName("base line", taken) == "base_line"
+    assert taken == {"baseline", "baseline_2", "baseline_3", "base_line"}
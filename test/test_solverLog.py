@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_solverLog.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+
+from processing_circuitscape import solverLog
+from processing_circuitscape.solverLog import SolverLog
+
+
+class Feedback:
+
+    def __init__(self):
+        self.batches = []
+
+    def pushConsoleInfo(self, text):
+        self.batches.append(text)
+
+
+def read(fileName):
+    with open(fileName) as f:
+        return f.read().splitlines()
+
+
+def testConsoleUpdatesAreBatched(monkeypatch):
+    monkeypatch.setattr(solverLog, "FLUSH_LINES", 3)
+    feedback = Feedback()
+    log = SolverLog(feedback)
+    for i in range(7):
+        log.write("line {}\n".format(i))
+    assert feedback.batches == ["line 0\nline 1\nline 2", "line 3\nline 4\nline 5"]
+
+    log.close()
+    assert feedback.batches[-1] == "line 6"
+
+
+def testTailIsTruncated(tmp_path):
+    fileName = str(tmp_path / "solver.log")
+    log = SolverLog(Feedback(), fileName, tailLines=3)
+    for i in range(10):
+        log.write("line {}\r\n".format(i))
+    log.close()
+
+    assert log.tail() == ["line 7", "line 8", "line 9"]
+    assert log.summary().splitlines() == ["... 7 earlier line(s) omitted, see {}".format(fileName),
+                                          "line 7", "line 8", "line 9"]
+    # full output is kept on disk
+    assert read(fileName) == ["line {}".format(i) for i in range(10)]
+
+
+def testShortOutputIsNotTruncated():
+    log = SolverLog(Feedback(), tailLines=3)
+    log.write("only line")
+    log.close()
+    assert log.summary() == "only line"
+
+
+def testLogIsRotatedWhenTooBig(tmp_path):
+    fileName = str(tmp_path / "solver.log")
+    # each line takes 7 bytes, three fit into one part
+    log = SolverLog(Feedback(), fileName, maxSize=21, backups=2)
+    for i in range(10):
+        log.write("line {}".format(i))
+    log.close()
+
+    assert read(fileName) == ["line 9"]
+    assert read(fileName + ".1") == ["line 6", "line 7", "line 8"]
+    assert read(fileName + ".2") == ["line 3", "line 4", "line 5"]
+    assert not os.path.exists(fileName + ".3")
+
+
+def testLogOfPreviousRunIsKept(tmp_path):
+    fileName = str(tmp_path / "solver.log")
+    for run in range(3):
+        log = SolverLog(Feedback(), fileName, backups=1)
+        log.write("run {}".format(run))
+        log.close()
+
+    assert read(fileName) == ["run 2"]
+    assert read(fileName + ".1") == ["run 1"]
+    assert sorted(os.listdir(str(tmp_path))) == ["solver.log", "solver.log.1"]
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_solverWorker.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+
+import pytest
+
+from processing_circuitscape import solverWorker
+from processing_circuitscape.solverWorker import SolverWorker, WorkerError
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="jobs are shell scripts")
+
+# stand-in worker passing each job, here a shell script, to /bin/sh
+WORKER = [sys.executable,
+          os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "workers", "subprocessWorker.py"),
+          "/bin/sh"]
+
+
+@pytest.fixture
+def worker():
+    worker = SolverWorker(WORKER)
+    yield worker
+    worker.shutdown()
+
+
+def job(tmp_path, name, script):
+    path = tmp_path / "{}.sh".format(name)
+    path.write_text(script)
+    return str(path)
+
+
+def run(worker, iniPath, timeout=0):
+    lines = []
+    code = worker.run(iniPath, lambda line: lines.append(line.strip()), lambda: False, timeout)
+    return code, lines
+
+
+def testStartup(worker):
+    assert not worker.isRunning()
+    worker.start()
+    assert worker.isRunning()
+    assert worker.healthCheck()
+
+
+def testSolveRoundTrip(worker, tmp_path):
+    code, lines = run(worker, job(tmp_path, "ok", "echo 'Solving pair 1 of 3'\necho 'Job took 0.1 seconds'\n"))
+    assert code == 0
+    assert lines == ["Solving pair 1 of 3", "Job took 0.1 seconds"]
+
+    # worker stays up between jobs and reports their exit codes
+    proc = worker.proc
+    code, lines = run(worker, job(tmp_path, "failed", "echo failed\nexit 3\n"))
+    assert code == 3
+    assert lines == ["failed"]
+    assert worker.proc is proc
+
+
+def testCrashedWorkerIsRestarted(worker, tmp_path):
+    # job takes down the worker process it runs in
+    with pytest.raises(WorkerError):
+        run(worker, job(tmp_path, "crash", "kill -9 $PPID\nsleep 5\n"))
+    assert not worker.isRunning()
+
+    code, lines = run(worker, job(tmp_path, "ok", "echo done\n"))
+    assert code == 0
+    assert lines == ["done"]
+
+    # worker killed between jobs fails the health check
+    worker.proc.kill()
+    worker.proc.wait()
+    code, lines = run(worker, job(tmp_path, "again", "echo again\n"))
+    assert code == 0
+    assert lines == ["again"]
+
+
+def testCanceledJobKillsWorker(worker, tmp_path):
+    calls = []
+
+    def isCanceled():
+        calls.append(None)
+        return len(calls) > 3
+
+    assert worker.run(job(tmp_path, "slow", "sleep 30\n"), lambda line: None, isCanceled) is None
+    assert worker.proc is None
+
+
+def testTimeout(worker, tmp_path):
+    with pytest.raises(WorkerError):
+        run(worker, job(tmp_path, "slow", "sleep 30\n"), 1)
+    assert worker.proc is None
+
+
+def testShutdown(worker, tmp_path):
+    run(worker, job(tmp_path, "ok", "echo done\n"))
+    proc = worker.proc
+    worker.shutdown()
+    assert not worker.isRunning()
+    assert proc.poll() == 0
+
+
+def testSharedWorkerFollowsCommand():
+    first = solverWorker.sharedWorker(WORKER, 0)
+    assert solverWorker.sharedWorker(WORKER, 0) is first
+    assert solverWorker.sharedWorker(WORKER + ["-e"], 0) is not first
+    solverWorker.shutdownSharedWorker()
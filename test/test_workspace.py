@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_workspace.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import json
+import time
+
+import pytest
+
+pytest.importorskip("qgis.core")
+
+from processing_circuitscape import resourcePlanner
+from processing_circuitscape import workspace
+from processing_circuitscape.workspace import RunWorkspace
+
+DAY = 24 * 3600
+
+
+def age(path, seconds):
+    stamp = time.time() - seconds
+    for dirPath, dirNames, fileNames in os.walk(path):
+        for name in fileNames:
+            os.utime(os.path.join(dirPath, name), (stamp, stamp))
+    os.utime(path, (stamp, stamp))
+
+
+def testLiveWorkspaceIsNotPurged(tmp_path):
+    running = RunWorkspace(str(tmp_path))
+    with open(running.fileName("run.ini"), "w") as f:
+        f.write("[Circuitscape mode]\n")
+    age(running.path, 10 * DAY)
+
+    RunWorkspace(str(tmp_path), maxAge=DAY).cleanup()
+    assert os.path.exists(running.fileName("run.ini"))
+    running.cleanup()
+    assert not os.path.exists(running.path)
+
+
+def testRetainedAndAbandonedWorkspacesArePurged(tmp_path):
+    kept = RunWorkspace(str(tmp_path), workspace.KEEP_ALWAYS)
+    kept.cleanup()
+    assert os.path.isdir(kept.path)
+    assert not os.path.exists(kept.fileName(workspace.OWNER_FILE))
+
+    # owner died without cleaning up, its pid now belongs to this process
+    if resourcePlanner.processStartTime(os.getpid()) is None:
+        pytest.skip("process start time is not available on this platform")
+    crashed = RunWorkspace(str(tmp_path))
+    with open(crashed.fileName(workspace.OWNER_FILE), "w") as f:
+        json.dump({"pid": os.getpid(), "created": 1.0}, f)
+
+    recent = RunWorkspace(str(tmp_path), workspace.KEEP_ALWAYS)
+    recent.cleanup()
+
+    age(kept.path, 10 * DAY)
+    age(crashed.path, 10 * DAY)
+    RunWorkspace(str(tmp_path), maxAge=DAY).cleanup()
+    assert not os.path.exists(kept.path)
+    assert not os.path.exists(crashed.path)
+    assert os.path.isdir(recent.path)
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    tiled.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import configparser
+
+from qgis.core import (QgsProcessingParameterRasterLayer,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterString,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingOutputFile,
+                       QgsProcessingException
+                      )
+from processing.core.ProcessingConfig import ProcessingConfig
+
+from processing_circuitscape.circuitscapeAlgorithm import CircuitscapeAlgorithm
+from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import parallelRuns
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+from processing_circuitscape import tiling
+
+# extensions of grids the solver writes
+RASTER_OUTPUTS = (".asc", ".asc.gz", ".tif", ".tiff")
+
+
+class Tiled(CircuitscapeAlgorithm):
+
+    RESISTANCE_MAP = "RESISTANCE_MAP"
+    IS_CONDUCTANCES = "IS_CONDUCTANCES"
+    TILE_SIZE = "TILE_SIZE"
+    BUFFER = "BUFFER"
+    MAX_PARALLEL = "MAX_PARALLEL"
+    BASENAME = "BASENAME"
+    DIRECTORY = "DIRECTORY"
+    CURRENT_MAP = "CURRENT_MAP"
+    LOG_FILE = "LOG_FILE"
+
+    def name(self):
+        return "tiled"
+
+    def displayName(self):
+        return self.tr("Tiled wall-to-wall")
+
+    def group(self):
+        return self.tr("Circuitscape")
+
+    def groupId(self):
+        return "circuitscape"
+
+    def __init__(self):
+        super().__init__()
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterRasterLayer(self.RESISTANCE_MAP,
+                                                            self.tr("Resistance map")))
+        self.addParameter(QgsProcessingParameterBoolean(self.IS_CONDUCTANCES,
+                                                        self.tr("Data represent conductances instead of resistances"),
+                                                        False))
+        self.addParameter(QgsProcessingParameterNumber(self.TILE_SIZE,
+                                                       self.tr("Tile size (cells)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       512,
+                                                       minValue=16))
+        self.addParameter(QgsProcessingParameterNumber(self.BUFFER,
+                                                       self.tr("Tile buffer (cells)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       128,
+                                                       minValue=0))
+        self.addParameter(QgsProcessingParameterNumber(self.MAX_PARALLEL,
+                                                       self.tr("Maximum number of tiles solved at once (0 = automatic)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       0,
+                                                       minValue=0))
+        self.addParameter(QgsProcessingParameterString(self.BASENAME,
+                                                       self.tr("Output basename"),
+                                                       "csoutput"))
+
+        self.addParameter(QgsProcessingParameterFolderDestination(self.DIRECTORY,
+                                                                  self.tr("Output directory")))
+
+        self.addOutput(QgsProcessingOutputFile(self.CURRENT_MAP, self.tr("Cumulative current map")))
+        self.addOutput(QgsProcessingOutputFile(self.LOG_FILE, self.tr("Solver log")))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        layer = self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context)
+        resistance = layer.source()
+        useConductance = str(not self.parameterAsBool(parameters, self.IS_CONDUCTANCES, context))
+        tileSize = self.parameterAsInt(parameters, self.TILE_SIZE, context)
+        buffer = self.parameterAsInt(parameters, self.BUFFER, context)
+        maxWorkers = self.parameterAsInt(parameters, self.MAX_PARALLEL, context)
+
+        baseName = self.parameterAsString(parameters, self.BASENAME, context)
+        directory = self.parameterAsString(parameters, self.DIRECTORY, context)
+        basePath = os.path.join(directory, baseName)
+
+        with self.createWorkspace(feedback) as workspace:
+            if not self.prepareInputs(parameters, context, feedback):
+                return {}
+
+            habitat = rasterTools.openRaster(self.exportedLayers[resistance])
+            geoTransform = habitat.GetGeoTransform()
+            projection = habitat.GetProjection()
+
+            tiles = tiling.makeTiles(habitat.RasterXSize, habitat.RasterYSize, tileSize, buffer)
+            feedback.pushInfo(self.tr("Splitting {}x{} cells into {} tile(s) of {} cells with {} cells buffer").format(
+                habitat.RasterXSize, habitat.RasterYSize, len(tiles), tileSize, buffer))
+
+            # cut tile resistance maps from the converted input, in the
+            # same format as other solver inputs
+            driver, ext, options = circuitscapeUtils.exportFormat()
+            jobs = []
+            for tile in tiles:
+                fileName = os.path.join(workspace.subdirectory(tile.name()), "resistance.{}".format(ext))
+                jobs.append(rasterExporter.ExportJob(self.exportedLayers[resistance], fileName,
+                                                     driver, options, tile.window))
+            threads = int(ProcessingConfig.getSetting(circuitscapeUtils.EXPORT_THREADS) or 0)
+            if not rasterExporter.exportRasters(jobs, feedback, threads):
+                return {}
+
+            iniPaths = []
+            labels = []
+            outputs = {}
+            for tile, job in zip(tiles, jobs):
+                tileDirectory = os.path.dirname(job.destination)
+                outputs[tile.index] = []
+                for direction in tiling.DIRECTIONS:
+                    iniPath, outputBase = self.writeTileConfiguration(tile, direction, tileDirectory, job.destination,
+                                                                      useConductance, geoTransform, projection, ext)
+                    iniPaths.append(iniPath)
+                    labels.append("{} {}".format(tile.name(), direction))
+                    outputs[tile.index].append(outputBase)
+
+            tileCells = (tileSize + 2 * buffer) ** 2
+            workers, reason = circuitscapeUtils.parallelWorkers(circuitscapeUtils.PARALLEL_AUTO, maxWorkers, tileCells)
+            feedback.pushInfo(self.tr("Solving {} tile run(s), {} at a time: {}").format(len(iniPaths), workers, reason))
+
+            runs = parallelRuns.runSolvers(iniPaths, feedback, workers, labels)
+            if runs is None:
+                return {}
+
+            tileMaps = {index: [self.currentMap(base) for base in bases] for index, bases in outputs.items()}
+            currentMap = "{}_cum_curmap.tif".format(basePath)
+            feedback.pushInfo(self.tr("Mosaicking tile cores into {}").format(currentMap))
+            tiling.mosaic(tiles, tileMaps, habitat, currentMap)
+
+            logFile = "{}_solver.log".format(basePath)
+            with open(logFile, "w") as f:
+                for iniPath, label in zip(iniPaths, labels):
+                    f.write("==> {} <==\n".format(label))
+                    with open(circuitscapeUtils.solverLogFilename(iniPath)) as log:
+                        f.write(log.read())
+
+            return {self.DIRECTORY: directory,
+                    self.CURRENT_MAP: currentMap,
+                    self.LOG_FILE: logFile,
+                    circuitscapeUtils.TIMINGS: {"tiles": [r[circuitscapeUtils.TIMINGS] for r in runs]}}
+
+    def writeTileConfiguration(self, tile, direction, tileDirectory, habitatFile, useConductance, geoTransform,
+                               projection, ext):
+        sourceFile = os.path.join(tileDirectory, "sources_{}.{}".format(direction, ext))
+        groundFile = os.path.join(tileDirectory, "grounds_{}.{}".format(direction, ext))
+        tiling.writeEdgeGrids(tile, direction, geoTransform, projection, sourceFile, groundFile)
+
+        runDirectory = os.path.join(tileDirectory, direction)
+        os.makedirs(runDirectory, exist_ok=True)
+        iniPath = circuitscapeUtils.writeConfiguration(runDirectory)
+        cfg = configparser.ConfigParser()
+        cfg.read(iniPath)
+
+        cfg["Circuitscape mode"]["scenario"] = "advanced"
+
+        section = cfg["Habitat raster or graph"]
+        section["habitat_map_is_resistances"] = useConductance
+        section["habitat_file"] = habitatFile
+
+        section = cfg["Options for advanced mode"]
+        section["source_file"] = sourceFile
+        section["ground_file"] = groundFile
+        section["use_direct_grounds"] = "True"
+        section["use_unit_currents"] = "False"
+
+        # tiles are summed and mosaicked, keep plain current maps only
+        section = cfg["Output options"]
+        section["write_cur_maps"] = "True"
+        section["write_volt_maps"] = "False"
+        section["log_transform_maps"] = "False"
+        section["compress_grids"] = "False"
+        outputBase = os.path.join(runDirectory, "tile")
+        section["output_file"] = outputBase
+
+        # tiles already keep the cores busy
+        cfg["Calculation options"]["parallelize"] = "False"
+        cfg["Calculation options"]["max_parallel"] = "0"
+
+        with open(iniPath, "w") as f:
+            cfg.write(f)
+        return iniPath, outputBase
+
+    def currentMap(self, outputBase):
+        directory, name = os.path.split(outputBase)
+        for entry in sorted(os.listdir(directory)):
+            # solver writes grids in the format of its inputs
+            if entry.startswith(name) and "curmap" in entry and rasterTools.rasterExtension(entry) in RASTER_OUTPUTS:
+                return os.path.join(directory, entry)
+        raise QgsProcessingException(self.tr("Solver did not write current map for {}").format(outputBase))
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    tiling.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import numpy
+
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import rasterTools
+
+# current flow directions solved for every tile
+WEST_EAST = "we"
+NORTH_SOUTH = "ns"
+DIRECTIONS = (WEST_EAST, NORTH_SOUTH)
+
+
+class Tile:
+
+    def __init__(self, index, core, window):
+        self.index = index
+        # both windows are (xOff, yOff, xSize, ySize) in landscape cells
+        self.core = core
+        self.window = window
+
+    def coreOffset(self):
+        # position of the core inside the buffered window
+        return self.core[0] - self.window[0], self.core[1] - self.window[1]
+
+    def name(self):
+        return "tile_{}_{}".format(self.index[0], self.index[1])
+
+
+def makeTiles(width, height, size, buffer):
+    tiles = []
+    for row, yOff in enumerate(range(0, height, size)):
+        for column, xOff in enumerate(range(0, width, size)):
+            core = (xOff, yOff, min(size, width - xOff), min(size, height - yOff))
+            x0 = max(0, xOff - buffer)
+            y0 = max(0, yOff - buffer)
+            x1 = min(width, core[0] + core[2] + buffer)
+            y1 = min(height, core[1] + core[3] + buffer)
+            tiles.append(Tile((column, row), core, (x0, y0, x1 - x0, y1 - y0)))
+    return tiles
+
+
+def edgeGrids(tile, direction):
+    # unit current sources along one edge of the buffered window and
+    # grounds along the opposite one
+    xSize, ySize = tile.window[2], tile.window[3]
+    sources = numpy.zeros((ySize, xSize), dtype=numpy.float32)
+    grounds = numpy.zeros((ySize, xSize), dtype=numpy.float32)
+    if direction == WEST_EAST:
+        sources[:, 0] = 1
+        grounds[:, -1] = 1
+    else:
+        sources[0, :] = 1
+        grounds[-1, :] = 1
+    return sources, grounds
+
+
+def writeEdgeGrids(tile, direction, geoTransform, projection, sourceFile, groundFile):
+    tileTransform = rasterExporter.windowGeoTransform(geoTransform, tile.window)
+    sources, grounds = edgeGrids(tile, direction)
+    for fileName, data in ((sourceFile, sources), (groundFile, grounds)):
+        rasterTools.writeGrid(fileName, tile.window[2], tile.window[3], tileTransform, projection,
+                              [(0, data)], 0)
+
+
+def readCore(fileNames, tile):
+    # sum of tile current maps cropped to the tile core, NODATA where
+    # none of the maps has a value
+    xOff, yOff = tile.coreOffset()
+    xSize, ySize = tile.core[2], tile.core[3]
+    result = numpy.zeros((ySize, xSize), dtype=numpy.float64)
+    hasValue = numpy.zeros((ySize, xSize), dtype=bool)
+    for fileName in fileNames:
+        ds = rasterTools.openRaster(fileName)
+        band = ds.GetRasterBand(1)
+        data = band.ReadAsArray(xOff, yOff, xSize, ySize).astype(numpy.float64)
+        valid = rasterTools.validMask(data, band.GetNoDataValue())
+        result += numpy.where(valid, data, 0.0)
+        hasValue |= valid
+    return result, hasValue
+
+
+def mosaic(tiles, tileMaps, template, destination, noData=rasterExporter.DEFAULT_NODATA):
+    # writes tile cores into the landscape grid one tile at a time, so
+    # memory use depends on tile size only
+    dst = rasterTools.createRaster(destination, template.RasterXSize, template.RasterYSize,
+                                   template.GetGeoTransform(), template.GetProjection(), noData)
+    band = dst.GetRasterBand(1)
+    for tile in tiles:
+        data, hasValue = readCore(tileMaps[tile.index], tile)
+        band.WriteArray(numpy.where(hasValue, data, noData), tile.core[0], tile.core[1])
+    band.FlushCache()
+    dst = None
+    return destination
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    transformSweep.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+from qgis.core import (QgsProcessingParameterRasterLayer,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterString,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingOutputFile,
+                       QgsProcessingException
+                      )
+
+from processing_circuitscape.scenarioBatch import ScenarioBatch, scenarioName
+from processing_circuitscape import circuitscapeUtils
+from processing_circuitscape import inputValidation
+from processing_circuitscape import rasterExporter
+from processing_circuitscape import resistanceTransforms
+
+
+class TransformSweep(ScenarioBatch):
+    # scenarios are transforms of a single habitat suitability map, the
+    # transformed maps are computed while the map is read once
+
+    TRANSFORM = "TRANSFORM"
+    SHAPES = "SHAPES"
+    MAX_RESISTANCE = "MAX_RESISTANCE"
+    USE_RECLASS = "USE_RECLASS"
+
+    def name(self):
+        return "transformsweep"
+
+    def displayName(self):
+        return self.tr("Resistance transform sweep")
+
+    def initAlgorithm(self, config=None):
+        self.modes = ((self.tr("Pairwise"), "pairwise"),
+                      (self.tr("One-to-all"), "one-to-all"),
+                      (self.tr("All-to-one"), "all-to-one"))
+        self.transforms = ((self.tr("Exponential"), "exponential"),
+                           (self.tr("Power"), "power"))
+
+        self.addParameter(QgsProcessingParameterRasterLayer(self.RESISTANCE_MAP,
+                                                            self.tr("Habitat suitability map")))
+        self.addParameter(QgsProcessingParameterEnum(self.TRANSFORM,
+                                                     self.tr("Transform"),
+                                                     options=[i[0] for i in self.transforms],
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterString(self.SHAPES,
+                                                       self.tr("Shape parameters, comma separated"),
+                                                       "0.25, 0.5, 1, 2, 4, 8, 16"))
+        self.addParameter(QgsProcessingParameterNumber(self.MAX_RESISTANCE,
+                                                       self.tr("Resistance of the worst habitat"),
+                                                       QgsProcessingParameterNumber.Double,
+                                                       100.0,
+                                                       minValue=1.0))
+        self.addParameter(QgsProcessingParameterBoolean(self.USE_RECLASS,
+                                                        self.tr("Use reclassification tables for integer maps "
+                                                                "with few classes"),
+                                                        True))
+        self.addParameter(QgsProcessingParameterEnum(self.MODE,
+                                                     self.tr("Mode"),
+                                                     options=[i[0] for i in self.modes],
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterRasterLayer(self.FOCAL_NODE,
+                                                            self.tr("Focal node location")))
+        self.addParameter(QgsProcessingParameterBoolean(self.WRITE_CURRENT_MAP,
+                                                        self.tr("Create current map"),
+                                                        True))
+        self.addParameter(QgsProcessingParameterBoolean(self.WRITE_VOLTAGE_MAP,
+                                                        self.tr("Create voltage map"),
+                                                        False))
+        self.addParameter(QgsProcessingParameterRasterLayer(self.MASK,
+                                                            self.tr("Mask raster"),
+                                                            optional=True))
+        self.addParameter(QgsProcessingParameterEnum(self.SOLVER,
+                                                     self.tr("Solver"),
+                                                     options=self.solvers(),
+                                                     allowMultiple=False,
+                                                     defaultValue=0))
+        self.addParameter(QgsProcessingParameterNumber(self.MAX_PARALLEL,
+                                                       self.tr("Maximum number of scenarios solved at once (0 = automatic)"),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       0,
+                                                       minValue=0))
+        self.addParameter(QgsProcessingParameterString(self.BASENAME,
+                                                       self.tr("Summary table basename"),
+                                                       "sweep"))
+
+        self.addParameter(QgsProcessingParameterFolderDestination(self.DIRECTORY,
+                                                                  self.tr("Output directory")))
+
+        self.addOutput(QgsProcessingOutputFile(self.SUMMARY, self.tr("Scenario summary table")))
+
+    def inputRole(self, name, parameters, context):
+        # suitability is transformed before it reaches the solver
+        if name == self.RESISTANCE_MAP:
+            return inputValidation.ROLE_OTHER
+        return super().inputRole(name, parameters, context)
+
+    def processAlgorithm(self, parameters, context, feedback):
+        mode = self.modes[self.parameterAsEnum(parameters, self.MODE, context)][1]
+        kind = self.parameterAsEnum(parameters, self.TRANSFORM, context)
+        maxResistance = self.parameterAsDouble(parameters, self.MAX_RESISTANCE, context)
+        useReclass = self.parameterAsBool(parameters, self.USE_RECLASS, context)
+        writeCurrent = str(self.parameterAsBool(parameters, self.WRITE_CURRENT_MAP, context))
+        writeVoltage = str(self.parameterAsBool(parameters, self.WRITE_VOLTAGE_MAP, context))
+        maxWorkers = self.parameterAsInt(parameters, self.MAX_PARALLEL, context)
+
+        baseName = self.parameterAsString(parameters, self.BASENAME, context)
+        directory = self.parameterAsString(parameters, self.DIRECTORY, context)
+
+        shapes = self.shapeParameters(parameters, context, kind)
+        layer = self.parameterAsRasterLayer(parameters, self.RESISTANCE_MAP, context)
+        if layer.providerType() != "gdal":
+            raise QgsProcessingException(self.tr("Habitat suitability map must be a GDAL raster"))
+
+        ds = rasterExporter.openDataset(layer.source())
+        valueRange = resistanceTransforms.valueRange(ds)
+        if valueRange is None:
+            raise QgsProcessingException(self.tr("Habitat suitability map has no valid cells"))
+        low, high = valueRange
+        feedback.pushInfo(self.tr("Suitability from {:g} to {:g} is mapped to resistances from {:g} to 1").format(
+            low, high, maxResistance))
+
+        classes = resistanceTransforms.classValues(ds) if useReclass else None
+
+        with self.createWorkspace(feedback) as workspace:
+            # streamed suitability is never exported, reclassified one is
+            # exported once and shared by all scenarios
+            skip = () if classes is not None else (self.RESISTANCE_MAP,)
+            if not self.prepareInputs(parameters, context, feedback, skip):
+                return {}
+
+            cfg = self.sharedConfiguration(mode, "True", writeCurrent, writeVoltage, parameters, context, feedback)
+
+            names = set()
+            labels = [(scenarioName("{}_{:g}".format(self.transforms[kind][1], shape), names),
+                       self.tr("{} transform, shape {:g}, maximum resistance {:g}").format(
+                           self.transforms[kind][1], shape, maxResistance))
+                      for shape in shapes]
+
+            window = self.cropExtent or (0, 0, ds.RasterXSize, ds.RasterYSize)
+            if classes is not None:
+                scenarios = self.reclassScenarios(labels, shapes, kind, maxResistance, classes, low, high,
+                                                  layer.source(), feedback)
+            else:
+                scenarios = self.streamedScenarios(labels, shapes, kind, maxResistance, low, high, ds, window,
+                                                   feedback)
+                if scenarios is None:
+                    return {}
+
+            return self.solveScenarios(cfg, scenarios, directory, baseName, maxWorkers,
+                                       window[2] * window[3], feedback)
+
+    def shapeParameters(self, parameters, context, kind):
+        text = self.parameterAsString(parameters, self.SHAPES, context)
+        try:
+            shapes = [float(value) for value in text.replace(";", ",").split(",") if value.strip()]
+        except ValueError:
+            raise QgsProcessingException(self.tr("Shape parameters must be numbers separated by commas"))
+
+        if not shapes:
+            raise QgsProcessingException(self.tr("At least one shape parameter is required"))
+        if kind == resistanceTransforms.TRANSFORM_POWER and min(shapes) <= 0:
+            raise QgsProcessingException(self.tr("Shape parameters of the power transform must be positive"))
+        return shapes
+
+    def reclassScenarios(self, labels, shapes, kind, maxResistance, classes, low, high, source, feedback):
+        # integer suitability classes are mapped to resistances by the
+        # solver, only a small table is written per scenario
+        feedback.pushInfo(self.tr("Suitability map has {} classes, scenarios use reclassification tables").format(
+            len(classes)))
+
+        values = resistanceTransforms.scale(classes, low, high)
+        scenarios = []
+        for (name, description), shape in zip(labels, shapes):
+            reclassFile = self.workspace.fileName("{}_reclass.txt".format(name))
+            resistanceTransforms.writeReclassTable(reclassFile, classes,
+                                                   resistanceTransforms.transform(values, kind, shape, maxResistance))
+            scenarios.append((name, description,
+                              {"Habitat raster or graph": {"habitat_file": self.exportedLayers[source]},
+                               "Options for reclassification of habitat data": {"use_reclass_table": "True",
+                                                                                "reclass_file": reclassFile}}))
+        return scenarios
+
+    def streamedScenarios(self, labels, shapes, kind, maxResistance, low, high, ds, window, feedback):
+        # every block of the suitability map is read once and written
+        # transformed straight into all solver inputs
+        driver, ext, options = circuitscapeUtils.exportFormat()
+        outputs = [(self.workspace.fileName("{}.{}".format(name, ext)), kind, shape, maxResistance)
+                   for (name, description), shape in zip(labels, shapes)]
+
+        self.workspace.checkFreeSpace(rasterExporter.estimateSize(window[2], window[3], driver) * len(outputs))
+        feedback.pushInfo(self.tr("Writing {} transformed resistance map(s) in one pass").format(len(outputs)))
+        if not resistanceTransforms.writeTransformed(ds, window, outputs, driver, options, low, high, feedback):
+            return None
+
+        return [(name, description, {"Habitat raster or graph": {"habitat_file": output[0]}})
+                for (name, description), output in zip(labels, outputs)]
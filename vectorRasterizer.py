@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    vectorRasterizer.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+from osgeo import gdal, ogr, osr
+
+from qgis.core import (QgsFeatureRequest,
+                       QgsProcessingException
+                      )
+
+from processing_circuitscape import rasterExporter
+
+VALUE_FIELD = "value"
+
+# how features without value field are burned
+BURN_IDS = "ids"
+BURN_ONES = "ones"
+
+
+def referenceGrid(layer):
+    extent = layer.extent()
+    geoTransform = (extent.xMinimum(), layer.rasterUnitsPerPixelX(), 0.0,
+                    extent.yMaximum(), 0.0, -layer.rasterUnitsPerPixelY())
+    return layer.width(), layer.height(), geoTransform, layer.crs()
+
+
+def rasterizeFeatures(source, fieldName, reference, context, burn=BURN_IDS, feedback=None):
+    # burns features onto the grid of the reference raster layer into an
+    # in-memory dataset, values come from the field or are sequential IDs
+    # (or ones) in feature order
+    width, height, geoTransform, crs = referenceGrid(reference)
+
+    srs = osr.SpatialReference()
+    srs.ImportFromWkt(crs.toWkt())
+    vectors = ogr.GetDriverByName("Memory").CreateDataSource("features")
+    layer = vectors.CreateLayer("features", srs)
+    layer.CreateField(ogr.FieldDefn(VALUE_FIELD, ogr.OFTReal))
+    definition = layer.GetLayerDefn()
+
+    request = QgsFeatureRequest().setDestinationCrs(crs, context.transformContext())
+    count = 0
+    for i, feature in enumerate(source.getFeatures(request)):
+        if feedback is not None and feedback.isCanceled():
+            return None, 0
+        if not feature.hasGeometry():
+            continue
+
+        if fieldName:
+            value = feature[fieldName]
+            if not isinstance(value, (int, float)):
+                continue
+        else:
+            value = i + 1 if burn == BURN_IDS else 1
+
+        item = ogr.Feature(definition)
+        item.SetField(VALUE_FIELD, float(value))
+        item.SetGeometry(ogr.CreateGeometryFromWkb(bytes(feature.geometry().asWkb())))
+        layer.CreateFeature(item)
+        count += 1
+
+    # single precision keeps integer IDs exact up to 16 million and
+    # halves memory compared to doubles
+    dataset = gdal.GetDriverByName("MEM").Create("", width, height, 1, gdal.GDT_Float32)
+    dataset.SetGeoTransform(geoTransform)
+    dataset.SetProjection(crs.toWkt())
+    band = dataset.GetRasterBand(1)
+    band.SetNoDataValue(rasterExporter.DEFAULT_NODATA)
+    band.Fill(rasterExporter.DEFAULT_NODATA)
+
+    if count > 0 and gdal.RasterizeLayer(dataset, [1], layer, options=["ATTRIBUTE={}".format(VALUE_FIELD)]) != 0:
+        raise QgsProcessingException("Can not rasterize {}".format(source.sourceName()))
+
+    return dataset, count
@@ -0,0 +1,33 @@
+# Long-lived Circuitscape worker used by the Circuitscape Processing
+# provider. Keeps the Julia session, and therefore all compiled code,
+# alive between jobs. See solverWorker.py for the protocol description.
+
+using Circuitscape
+
+function main()
+    println("@@CIRCUITSCAPE_READY")
+    flush(stdout)
+
+    for line in eachline(stdin)
+        command = strip(line)
+        if command == "PING"
+            println("PONG")
+        elseif startswith(command, "RUN ")
+            code = 0
+            try
+                compute(String(strip(command[5:end])))
+            catch e
+                showerror(stdout, e, catch_backtrace())
+                println()
+                code = 1
+            end
+            flush(stderr)
+            println("@@CIRCUITSCAPE_DONE $code")
+        elseif command == "QUIT"
+            break
+        end
+        flush(stdout)
+    end
+end
+
+main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    subprocessWorker.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Solver worker speaking the same protocol as circuitscapeWorker.jl. Jobs
+are computed in-process when the Python Circuitscape package is importable,
+otherwise every job is passed to the command given on the command line,
+e.g. "python subprocessWorker.py csrun.py". Useful when Julia is not
+available and for exercising the worker machinery.
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import sys
+import subprocess
+
+
+def computeInProcess(iniPath):
+    from circuitscape.compute import Compute
+    Compute(iniPath, "Screen").compute()
+    return 0
+
+
+def computeInSubprocess(command, iniPath):
+    with subprocess.Popen(command + [iniPath],
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.STDOUT,
+                          stdin=subprocess.DEVNULL,
+                          universal_newlines=True) as proc:
+        for line in iter(proc.stdout.readline, ""):
+            sys.stdout.write(line)
+            sys.stdout.flush()
+    return proc.returncode
+
+
+def main():
+    command = sys.argv[1:]
+    if len(command) == 0:
+        try:
+            import circuitscape.compute
+        except ImportError:
+            command = ["csrun.py"]
+
+    print("@@CIRCUITSCAPE_READY", flush=True)
+    for line in sys.stdin:
+        line = line.strip()
+        if line == "PING":
+            print("PONG", flush=True)
+        elif line.startswith("RUN "):
+            iniPath = line[4:].strip()
+            try:
+                if command:
+                    code = computeInSubprocess(command, iniPath)
+                else:
+                    code = computeInProcess(iniPath)
+            except Exception as e:
+                print(e, flush=True)
+                code = 1
+            print("@@CIRCUITSCAPE_DONE {}".format(code), flush=True)
+        elif line == "QUIT":
+            break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    workspace.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2014-2026 by Alexander Bruy
+    Email                : alexander dot bruy at gmail dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Alexander Bruy'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2014-2026, Alexander Bruy'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import json
+import time
+import shutil
+import tempfile
+
+from qgis.core import QgsProcessingException
+
+from processing_circuitscape import resourcePlanner
+
+PREFIX = "circuitscape_"
+
+# marker naming the process using a workspace, removed when the run ends
+# and the workspace is kept
+OWNER_FILE = ".owner"
+
+KEEP_NEVER = 0
+KEEP_FAILED = 1
+KEEP_ALWAYS = 2
+
+# space left free on the scratch disk in addition to the estimated needs
+SPACE_RESERVE = 100 * 1024 * 1024
+
+
+class RunWorkspace:
+
+    def __init__(self, root, retention=KEEP_NEVER, maxAge=0):
+        os.makedirs(root, exist_ok=True)
+        if maxAge > 0:
+            purgeStale(root, maxAge)
+
+        self.root = root
+        self.retention = retention
+        self.exitCallbacks = []
+        self.path = tempfile.mkdtemp(prefix=PREFIX, dir=root)
+        with open(os.path.join(self.path, OWNER_FILE), "w") as f:
+            json.dump({"pid": os.getpid(), "created": resourcePlanner.processStartTime(os.getpid())}, f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        for callback in self.exitCallbacks:
+            callback()
+        self.cleanup(excType is not None)
+        return False
+
+    def atExit(self, callback):
+        # called when the run ends, before its files are removed
+        self.exitCallbacks.append(callback)
+
+    def fileName(self, name):
+        return os.path.join(self.path, name)
+
+    def subdirectory(self, name):
+        path = os.path.join(self.path, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def checkFreeSpace(self, requiredBytes, directory=None):
+        directory = directory or self.path
+        free = shutil.disk_usage(directory).free
+        if free < requiredBytes + SPACE_RESERVE:
+            raise QgsProcessingException(
+                "Not enough disk space in {}: about {:.1f} MB required, {:.1f} MB available".format(
+                    directory, requiredBytes / 1048576.0, free / 1048576.0))
+
+    def cleanup(self, failed=False):
+        if self.retention == KEEP_ALWAYS or (failed and self.retention == KEEP_FAILED):
+            try:
+                os.remove(os.path.join(self.path, OWNER_FILE))
+            except OSError:
+                pass
+            return
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def inUse(path):
+    # workspace whose owner process is still running; solver outputs go
+    # elsewhere, so a long run may leave its workspace untouched for days
+    try:
+        with open(os.path.join(path, OWNER_FILE)) as f:
+            owner = json.load(f)
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError):
+        # marker being written
+        return True
+    return resourcePlanner.processMatches(owner.get("pid", 0), owner.get("created"))
+
+
+def purgeStale(root, maxAge):
+    # remove workspaces kept by earlier runs or left by crashed ones once
+    # they are older than maxAge seconds
+    now = time.time()
+    for entry in os.scandir(root):
+        if not entry.name.startswith(PREFIX) or not entry.is_dir():
+            continue
+        try:
+            if not inUse(entry.path) and now - lastModified(entry.path) > maxAge:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def lastModified(path):
+    latest = os.path.getmtime(path)
+    for dirPath, dirNames, fileNames in os.walk(path):
+        for name in fileNames:
+            try:
+                latest = max(latest, os.path.getmtime(os.path.join(dirPath, name)))
+            except OSError:
+                pass
+    return latest